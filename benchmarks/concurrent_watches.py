@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""
+Compares the connections and memory used by many concurrent watches over
+the HTTP/1.1 (urllib3) and HTTP/2 (httpx) transports of the kubernetes
+clients against a live cluster:
+
+    python benchmarks/concurrent_watches.py -k ~/.kube/config -w 500
+
+Every transport is measured in its own process, the HTTP/2 one requires
+httpx[http2] to be installed.
+"""
+
+import optparse
+import os
+import subprocess  # nosec
+import sys
+import threading
+import time
+
+from kubernetes import watch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import kraken.kubernetes.client as kubecli  # noqa: E402
+from kraken.kubernetes import registry  # noqa: E402
+
+TRANSPORTS = ("http1", "http2")
+
+
+def count_sockets():
+    """Returns the number of sockets opened by the process"""
+    count = 0
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            if os.readlink("/proc/self/fd/%s" % fd).startswith("socket:"):
+                count += 1
+        except OSError:
+            pass
+    return count
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return 0
+
+
+def benchmark(transport, kubeconfig, watches, duration):
+    # Open every watch at once, without the client side rate limiter
+    registry.configure(
+        maxsize=watches,
+        max_qps=0,
+        http_transport=transport
+    )
+    kubecli.initialize_clients(kubeconfig, use_cache=False)
+    baseline_sockets = count_sockets()
+    baseline_rss = rss_mb()
+    opened = threading.Semaphore(0)
+    errors = []
+
+    def run_watch():
+        first_event = True
+        try:
+            for _ in watch.Watch().stream(
+                kubecli.cli.list_namespace,
+                timeout_seconds=duration
+            ):
+                if first_event:
+                    first_event = False
+                    opened.release()
+        except Exception as e:
+            errors.append(e)
+            if first_event:
+                opened.release()
+
+    start = time.time()
+    threads = [
+        threading.Thread(target=run_watch, daemon=True)
+        for _ in range(watches)
+    ]
+    for thread in threads:
+        thread.start()
+    for _ in range(watches):
+        opened.acquire(timeout=duration)
+    open_time = time.time() - start
+    print(
+        "%-8s %8s %8s %12.2f %12s %12.1f" % (
+            transport,
+            watches,
+            len(errors),
+            open_time,
+            count_sockets() - baseline_sockets,
+            rss_mb() - baseline_rss
+        )
+    )
+    sys.stdout.flush()
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == "__main__":
+    parser = optparse.OptionParser()
+    parser.add_option(
+        "-k",
+        "--kubeconfig",
+        dest="kubeconfig",
+        help="kubeconfig location",
+        default=os.path.expanduser("~/.kube/config"),
+    )
+    parser.add_option(
+        "-w",
+        "--watches",
+        dest="watches",
+        type="int",
+        help="number of concurrent watches on the namespaces",
+        default=500,
+    )
+    parser.add_option(
+        "-d",
+        "--duration",
+        dest="duration",
+        type="int",
+        help="number of seconds every watch stays open",
+        default=30,
+    )
+    parser.add_option(
+        "-t",
+        "--transport",
+        dest="transport",
+        help="transport to measure: %s, all of them if not set"
+        % ", ".join(TRANSPORTS),
+        default=None,
+    )
+    (options, args) = parser.parse_args()
+    if options.transport:
+        benchmark(
+            options.transport,
+            options.kubeconfig,
+            options.watches,
+            options.duration
+        )
+    else:
+        print(
+            "%-8s %8s %8s %12s %12s %12s" % (
+                "http", "watches", "errors", "open (s)", "sockets", "RSS (MB)"
+            )
+        )
+        sys.stdout.flush()
+        for transport in TRANSPORTS:
+            subprocess.run(  # nosec
+                [
+                    sys.executable,
+                    __file__,
+                    "-k", options.kubeconfig,
+                    "-w", str(options.watches),
+                    "-d", str(options.duration),
+                    "-t", transport,
+                ],
+                check=False
+            )
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Measures the cold start of run_kraken.py from the import times reported by
+python -X importtime, and checks that no cloud SDK is imported before a
+scenario uses it:
+
+    python benchmarks/startup_time.py -r 5 -b 1500
+
+Exits with 1 when the median import time exceeds the budget (in ms) or when
+a cloud SDK is imported at startup, so it can run as a regression check.
+"""
+
+import optparse
+import os
+import statistics
+import subprocess  # nosec
+import sys
+import time
+
+RUN_KRAKEN = os.path.join(os.path.dirname(__file__), "..", "run_kraken.py")
+
+# Top level packages of the cloud SDKs, imported only by the scenarios
+CLOUD_SDKS = (
+    "boto3",
+    "azure",
+    "googleapiclient",
+    "openstack",
+    "aliyunsdkcore",
+    "pyipmi",
+    "vmware",
+)
+
+
+def parse_importtime(stderr):
+    """
+    Returns the self and cumulative import times in microseconds of every
+    module from the -X importtime output
+    """
+
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # Header line
+            continue
+        modules[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return modules
+
+
+def measure(script):
+    start = time.time()
+    process = subprocess.run(  # nosec
+        [sys.executable, "-X", "importtime", script, "--help"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=False,
+    )
+    wall_time = time.time() - start
+    modules = parse_importtime(process.stderr)
+    if process.returncode != 0:
+        print(process.stderr.splitlines()[-1] if process.stderr else "")
+        sys.exit("%s --help exited with %s" % (script, process.returncode))
+    return wall_time, modules
+
+
+if __name__ == "__main__":
+    parser = optparse.OptionParser()
+    parser.add_option(
+        "-s",
+        "--script",
+        dest="script",
+        help="script to start",
+        default=RUN_KRAKEN,
+    )
+    parser.add_option(
+        "-r",
+        "--runs",
+        dest="runs",
+        type="int",
+        help="number of starts, the median is reported",
+        default=5,
+    )
+    parser.add_option(
+        "-b",
+        "--budget",
+        dest="budget",
+        type="float",
+        help="maximum median import time in ms, not checked if not set",
+        default=None,
+    )
+    parser.add_option(
+        "-t",
+        "--top",
+        dest="top",
+        type="int",
+        help="number of slowest top level imports to print",
+        default=15,
+    )
+    (options, args) = parser.parse_args()
+
+    wall_times = []
+    import_times = []
+    for _ in range(options.runs):
+        wall_time, modules = measure(options.script)
+        wall_times.append(wall_time * 1000)
+        import_times.append(sum(own for own, _ in modules.values()) / 1000.0)
+    import_time = statistics.median(import_times)
+    print("%-40s %12.1f" % ("wall time (ms)", statistics.median(wall_times)))
+    print("%-40s %12.1f" % ("import time (ms)", import_time))
+    print("%-40s %12s" % ("modules imported", len(modules)))
+    print()
+    print("%-40s %12s" % ("top level import", "cumul. (ms)"))
+    top_level = sorted(
+        (
+            (cumulative, name)
+            for name, (_, cumulative) in modules.items()
+            if "." not in name
+        ),
+        reverse=True,
+    )
+    for cumulative, name in top_level[:options.top]:
+        print("%-40s %12.1f" % (name, cumulative / 1000.0))
+
+    failed = False
+    imported_sdks = [
+        sdk for sdk in CLOUD_SDKS if sdk in modules
+    ]
+    if imported_sdks:
+        print("\nCloud SDKs imported at startup: %s" % ", ".join(imported_sdks))
+        failed = True
+    if options.budget is not None and import_time > options.budget:
+        print(
+            "\nImport time %.1f ms exceeds the budget of %.1f ms"
+            % (import_time, options.budget)
+        )
+        failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Compares the bytes on the wire and the decode time of the JSON and protobuf
+list paths of kraken.kubernetes.client against a live cluster:
+
+    python benchmarks/wire_format.py -k ~/.kube/config -r pods
+"""
+
+import json
+import optparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import kraken.kubernetes.client as kubecli  # noqa: E402
+from kraken.kubernetes import protobuf  # noqa: E402
+
+MODEL_TYPES = {
+    "pods": "V1PodList",
+    "nodes": "V1NodeList",
+    "namespaces": "V1NamespaceList",
+    "persistentvolumeclaims": "V1PersistentVolumeClaimList",
+}
+
+
+def fetch(resource, accept, limit):
+    start = time.time()
+    response = kubecli._request_metadata(
+        resource,
+        None,
+        [("limit", limit)] if limit else [],
+        accept
+    )
+    data = response.data
+    return data, time.time() - start
+
+
+def benchmark(resource, limit, rounds):
+    cases = [
+        (
+            "json full objects",
+            "application/json",
+            lambda data: kubecli.cli.api_client.deserialize(
+                SimpleNamespace(data=data),
+                MODEL_TYPES[resource]
+            ).items,
+        ),
+        (
+            "json metadata",
+            kubecli.PARTIAL_OBJECT_METADATA_LIST,
+            lambda data: [
+                kubecli._to_object_metadata(item["metadata"])
+                for item in json.loads(data)["items"]
+            ],
+        ),
+        (
+            "protobuf metadata",
+            protobuf.PROTOBUF_PARTIAL_OBJECT_METADATA_LIST,
+            lambda data: protobuf.decode_list_metadata(data)[0],
+        ),
+    ]
+    print(
+        "%-20s %8s %14s %12s %12s" % (
+            "path", "items", "bytes", "fetch (s)", "decode (s)"
+        )
+    )
+    for name, accept, decode in cases:
+        fetch_time = 0
+        decode_time = 0
+        for _ in range(rounds):
+            data, elapsed = fetch(resource, accept, limit)
+            fetch_time += elapsed
+            start = time.time()
+            items = decode(data)
+            decode_time += time.time() - start
+        print(
+            "%-20s %8s %14s %12.4f %12.4f" % (
+                name,
+                len(items),
+                len(data),
+                fetch_time / rounds,
+                decode_time / rounds
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = optparse.OptionParser()
+    parser.add_option(
+        "-k",
+        "--kubeconfig",
+        dest="kubeconfig",
+        help="kubeconfig location",
+        default=os.path.expanduser("~/.kube/config"),
+    )
+    parser.add_option(
+        "-r",
+        "--resource",
+        dest="resource",
+        help="resource to list: %s" % ", ".join(MODEL_TYPES),
+        default="pods",
+    )
+    parser.add_option(
+        "-l",
+        "--limit",
+        dest="limit",
+        type="int",
+        help="maximum number of objects per list, 0 for no limit",
+        default=0,
+    )
+    parser.add_option(
+        "-n",
+        "--rounds",
+        dest="rounds",
+        type="int",
+        help="number of lists per path",
+        default=3,
+    )
+    (options, args) = parser.parse_args()
+    kubecli.initialize_clients(options.kubeconfig, use_cache=False)
+    benchmark(options.resource, options.limit, options.rounds)
@@ -0,0 +1,497 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+
+from kubernetes_asyncio import client, config, watch
+from kubernetes_asyncio.client.rest import ApiException
+from kubernetes_asyncio.stream import WsApiClient
+
+from ..kubernetes import instrumentation, registry, throttle
+from ..kubernetes.resources import ExecResult
+
+
+# Maximum number of requests in flight at the same time on the event loop,
+# every fan-out operation of this module is bounded by it. Defaults to the
+# max_in_flight of the registry
+max_in_flight = None
+
+kubeconfig = None
+api_client = None
+ws_client = None
+cli = None
+batch_cli = None
+
+_loop = None
+_loop_lock = threading.Lock()
+_clients_lock = None
+_semaphore = None
+
+
+def configure(kubeconfig_path=None, max_requests=None):
+    """
+    Sets the kubeconfig and the concurrency of the asyncio clients. The
+    clients are created on the first call which needs them, with the
+    KUBECONFIG environment variable and the settings of the registry when
+    this is not called
+    """
+
+    global kubeconfig
+    global max_in_flight
+    kubeconfig = kubeconfig_path
+    if max_requests is not None:
+        max_in_flight = int(max_requests)
+
+
+def get_loop():
+    """
+    Returns the event loop of the module, running in a daemon thread so the
+    synchronous wrappers can be called from any thread, including the worker
+    threads of a ThreadPoolExecutor
+    """
+
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever,
+                name="kraken-asyncio",
+                daemon=True
+            ).start()
+        return _loop
+
+
+def run(coroutine, timeout=None):
+    """Runs a coroutine on the event loop of the module, returns its result"""
+    return asyncio.run_coroutine_threadsafe(coroutine, get_loop()).result(
+        timeout
+    )
+
+
+def blocking(coroutine_function):
+    """
+    Returns a synchronous version of a coroutine function of this module,
+    blocking the calling thread until the coroutine returns
+    """
+
+    @functools.wraps(coroutine_function)
+    def wrapper(*args, **kwargs):
+        return run(coroutine_function(*args, **kwargs))
+
+    return wrapper
+
+
+async def _initialize_clients():
+    global api_client
+    global ws_client
+    global cli
+    global batch_cli
+    global _clients_lock
+    global _semaphore
+    limit = max_in_flight or registry.max_in_flight
+    if _clients_lock is None:
+        _clients_lock = asyncio.Lock()
+        _semaphore = asyncio.Semaphore(limit)
+    async with _clients_lock:
+        if api_client is not None:
+            return
+        kubeconfig_path = kubeconfig or os.environ.get("KUBECONFIG")
+        client_config = client.Configuration()
+        await config.load_kube_config(
+            config_file=kubeconfig_path and os.path.expanduser(
+                kubeconfig_path
+            ),
+            client_configuration=client_config
+        )
+        client_config.connection_pool_maxsize = limit
+        api_client = client.ApiClient(configuration=client_config)
+        instrumentation.install_async(api_client.rest_client, ApiException)
+        throttle.install_async(
+            api_client.rest_client,
+            registry.get_governor(),
+            ApiException
+        )
+        ws_client = WsApiClient(configuration=client_config)
+        cli = client.CoreV1Api(api_client)
+        batch_cli = client.BatchV1Api(api_client)
+
+
+async def _bounded(coroutine):
+    async with _semaphore:
+        return await coroutine
+
+
+async def gather(coroutines):
+    """
+    Runs the coroutines concurrently, at most max_in_flight at a time, and
+    returns their results in order. Exceptions are returned, not raised
+    """
+
+    await _initialize_clients()
+    return await asyncio.gather(
+        *[_bounded(coroutine) for coroutine in coroutines],
+        return_exceptions=True
+    )
+
+
+async def list_pods(namespace=None, label_selector=None, page_size=500):
+    """
+    Lists the pods page by page using limit/continue chunking
+
+    Args:
+        namespace (string)
+            - Namespace to list the pods from, all the namespaces if not set
+
+        label_selector (string)
+            - Kubernetes label selector for the pods
+
+        page_size (int)
+            - Maximum number of pods requested per page
+
+    Returns:
+        List of V1Pod objects
+    """
+
+    await _initialize_clients()
+    pods = []
+    _continue = None
+    while True:
+        if namespace:
+            ret = await cli.list_namespaced_pod(
+                namespace,
+                label_selector=label_selector,
+                limit=page_size,
+                _continue=_continue
+            )
+        else:
+            ret = await cli.list_pod_for_all_namespaces(
+                label_selector=label_selector,
+                limit=page_size,
+                _continue=_continue
+            )
+        pods.extend(ret.items)
+        _continue = ret.metadata._continue
+        if not _continue:
+            return pods
+
+
+async def watch_pods(names, namespace, is_done, timeout=120):
+    """
+    Waits until a condition holds for every pod of a batch, using a single
+    watch stream on the namespace, see kraken.kubernetes.client.watch_pods
+
+    Returns:
+        Set of the names of the pods that did not reach the expected state
+        before the timeout
+    """
+
+    await _initialize_clients()
+    pending = set(names)
+    if not pending:
+        return pending
+    field_selector = None
+    if len(pending) == 1:
+        field_selector = "metadata.name=%s" % next(iter(pending))
+    end_time = time.time() + timeout
+
+    ret = await cli.list_namespaced_pod(
+        namespace,
+        field_selector=field_selector
+    )
+    listed = {pod.metadata.name: pod for pod in ret.items}
+    for name in list(pending):
+        pod = listed.get(name)
+        if is_done("ADDED" if pod else "DELETED", pod):
+            pending.discard(name)
+    resource_version = ret.metadata.resource_version
+
+    while pending and time.time() < end_time:
+        try:
+            async with watch.Watch() as pod_watch:
+                async for event in pod_watch.stream(
+                    cli.list_namespaced_pod,
+                    namespace,
+                    field_selector=field_selector,
+                    resource_version=resource_version,
+                    timeout_seconds=max(1, int(end_time - time.time()))
+                ):
+                    pod = event["object"]
+                    name = pod.metadata.name
+                    if name in pending and is_done(event["type"], pod):
+                        pending.discard(name)
+                    if not pending:
+                        pod_watch.stop()
+                        break
+                resource_version = (
+                    pod_watch.resource_version or resource_version
+                )
+        except ApiException as e:
+            if e.status != 410:
+                raise e
+            # The resourceVersion expired, start over with the remaining time
+            return await watch_pods(
+                pending,
+                namespace,
+                is_done,
+                max(0, end_time - time.time())
+            )
+    return pending
+
+
+async def exec_cmd_in_pod(
+    command,
+    pod_name,
+    namespace,
+    container=None,
+    base_command="bash",
+    timeout=60
+):
+    """Runs a command in a container, returns its output"""
+
+    await _initialize_clients()
+    kwargs = {}
+    if container:
+        kwargs["container"] = container
+    return await asyncio.wait_for(
+        client.CoreV1Api(ws_client).connect_get_namespaced_pod_exec(
+            pod_name,
+            namespace,
+            command=[base_command, "-c", command],
+            stderr=True,
+            stdin=False,
+            stdout=True,
+            tty=False,
+            **kwargs
+        ),
+        timeout
+    )
+
+
+async def exec_cmd_in_pods(command, targets, base_command="bash", timeout=60):
+    """
+    Runs a command in many containers concurrently over the event loop
+
+    Args:
+        command (string)
+            - Command to run, passed to the base command with -c
+
+        targets (list)
+            - List of (pod name, namespace, container name) tuples, the
+              container name can be None to use the default container
+
+        base_command (string)
+            - Shell used to run the command
+
+        timeout (int)
+            - Timeout in seconds of each command
+
+    Returns:
+        List of ExecResult data class objects, in the order of the targets
+    """
+
+    async def run_one(target):
+        pod_name, namespace, container = target
+        start_time = time.time()
+        try:
+            output = await exec_cmd_in_pod(
+                command,
+                pod_name,
+                namespace,
+                container,
+                base_command,
+                timeout
+            )
+            success = True
+            error = ""
+        except Exception as e:
+            output = ""
+            success = False
+            error = str(e) or type(e).__name__
+        return ExecResult(
+            pod=pod_name,
+            namespace=namespace,
+            container=container,
+            success=success,
+            output=output,
+            error=error,
+            duration=time.time() - start_time
+        )
+
+    return await gather([run_one(target) for target in targets])
+
+
+async def delete_pods(names, namespace, timeout=120):
+    """
+    Deletes a batch of pods concurrently and waits for all of them to be
+    gone over a single watch. Returns the set of pods still present after
+    the timeout
+    """
+
+    async def delete(name):
+        try:
+            await cli.delete_namespaced_pod(name=name, namespace=namespace)
+        except ApiException as e:
+            if e.status != 404:
+                raise e
+            logging.info("Pod %s already deleted" % name)
+
+    for result in await gather([delete(name) for name in names]):
+        if isinstance(result, Exception):
+            logging.error("Failed to delete pod %s" % result)
+            raise result
+    remaining = await watch_pods(
+        names,
+        namespace,
+        lambda event_type, pod: event_type == "DELETED",
+        timeout
+    )
+    if remaining:
+        logging.error(
+            "Pods %s in namespace %s still exist after %ss" % (
+                ", ".join(sorted(remaining)),
+                namespace,
+                timeout
+            )
+        )
+    return remaining
+
+
+async def create_job(body, namespace="default"):
+    await _initialize_clients()
+    try:
+        return await batch_cli.create_namespaced_job(
+            body=body,
+            namespace=namespace
+        )
+    except ApiException as api:
+        logging.warning(
+            "Exception when calling BatchV1Api->create_job: %s" % api
+        )
+        if api.status != 409:
+            raise api
+        logging.warning("Job already present")
+
+
+async def get_job_status(name, namespace="default"):
+    await _initialize_clients()
+    return await batch_cli.read_namespaced_job_status(
+        name=name,
+        namespace=namespace
+    )
+
+
+async def wait_for_jobs(names, namespace="default", timeout=300):
+    """
+    Waits over a single watch until every job of the batch succeeded or
+    failed
+
+    Returns:
+        Dictionary mapping each job to "Succeeded", "Failed" or None for the
+        jobs still running after the timeout
+    """
+
+    await _initialize_clients()
+    results = {name: None for name in names}
+    end_time = time.time() + timeout
+
+    def observe(job):
+        name = job.metadata.name
+        if name not in results or results[name] is not None:
+            return
+        if job.status.succeeded:
+            results[name] = "Succeeded"
+        elif job.status.failed:
+            results[name] = "Failed"
+
+    ret = await batch_cli.list_namespaced_job(namespace)
+    for job in ret.items:
+        observe(job)
+    resource_version = ret.metadata.resource_version
+    while None in results.values() and time.time() < end_time:
+        try:
+            async with watch.Watch() as job_watch:
+                async for event in job_watch.stream(
+                    batch_cli.list_namespaced_job,
+                    namespace,
+                    resource_version=resource_version,
+                    timeout_seconds=max(1, int(end_time - time.time()))
+                ):
+                    observe(event["object"])
+                    if None not in results.values():
+                        job_watch.stop()
+                        break
+                resource_version = (
+                    job_watch.resource_version or resource_version
+                )
+        except ApiException as e:
+            if e.status != 410:
+                raise e
+            ret = await batch_cli.list_namespaced_job(namespace)
+            for job in ret.items:
+                observe(job)
+            resource_version = ret.metadata.resource_version
+    return results
+
+
+async def delete_jobs(label_selector, namespace="default"):
+    """
+    Deletes all the jobs matching the label selector, and their pods, with
+    a single delete collection request
+    """
+
+    await _initialize_clients()
+    try:
+        await batch_cli.delete_collection_namespaced_job(
+            namespace,
+            label_selector=label_selector,
+            propagation_policy="Foreground",
+            grace_period_seconds=0
+        )
+    except ApiException as api:
+        logging.warning(
+            "Exception when calling "
+            "BatchV1Api->delete_collection_namespaced_job: %s" % api
+        )
+
+
+async def _close():
+    global api_client
+    global ws_client
+    if api_client is not None:
+        await api_client.close()
+        await ws_client.close()
+        api_client = None
+        ws_client = None
+
+
+def close():
+    """Closes the asyncio clients and stops the event loop"""
+
+    global _loop
+    global _clients_lock
+    global _semaphore
+    with _loop_lock:
+        if _loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(_close(), _loop).result()
+        _loop.call_soon_threadsafe(_loop.stop)
+        _loop = None
+        _clients_lock = None
+        _semaphore = None
+
+
+# Synchronous wrappers, to be called from the scenarios which are not
+# asynchronous. Every call is run on the event loop of the module, so
+# concurrent calls from several threads share its connections
+list_pods_sync = blocking(list_pods)
+watch_pods_sync = blocking(watch_pods)
+exec_cmd_in_pod_sync = blocking(exec_cmd_in_pod)
+exec_cmd_in_pods_sync = blocking(exec_cmd_in_pods)
+delete_pods_sync = blocking(delete_pods)
+create_job_sync = blocking(create_job)
+get_job_status_sync = blocking(get_job_status)
+wait_for_jobs_sync = blocking(wait_for_jobs)
+delete_jobs_sync = blocking(delete_jobs)
@@ -0,0 +1,518 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+
+HTTP_STATUS_GONE = 410
+SNAPSHOT_VERSION = 1
+# Snapshots older than this number of seconds are not loaded
+SNAPSHOT_MAX_AGE = 24 * 60 * 60
+
+
+def parse_label_selector(label_selector):
+    """
+    Parses a Kubernetes label selector string into a list of requirements
+
+    Args:
+        label_selector (string)
+            - Label selector, for example "app=etcd,tier!=frontend,env in (a,b)"
+
+    Returns:
+        List of (key, operator, values) tuples. Supported operators are
+        "=", "!=", "in", "notin", "exists" and "!exists"
+    """
+
+    requirements = []
+    if not label_selector:
+        return requirements
+    # Split on commas that are not inside a set, e.g. "env in (a,b)"
+    for term in re.split(r",(?![^()]*\))", label_selector):
+        term = term.strip()
+        if not term:
+            continue
+        set_match = re.match(r"^(\S+)\s+(in|notin)\s+\((.*)\)$", term)
+        if set_match:
+            values = set(
+                value.strip()
+                for value in set_match.group(3).split(",")
+                if value.strip()
+            )
+            requirements.append(
+                (set_match.group(1), set_match.group(2), values)
+            )
+        elif "!=" in term:
+            key, value = term.split("!=", 1)
+            requirements.append((key.strip(), "!=", {value.strip()}))
+        elif "==" in term:
+            key, value = term.split("==", 1)
+            requirements.append((key.strip(), "=", {value.strip()}))
+        elif "=" in term:
+            key, value = term.split("=", 1)
+            requirements.append((key.strip(), "=", {value.strip()}))
+        elif term.startswith("!"):
+            requirements.append((term[1:].strip(), "!exists", set()))
+        else:
+            requirements.append((term, "exists", set()))
+    return requirements
+
+
+def match_label_selector(requirements, labels):
+    """
+    Returns True if the labels satisfy every parsed selector requirement
+    """
+
+    labels = labels or {}
+    for key, operator, values in requirements:
+        if operator == "exists":
+            if key not in labels:
+                return False
+        elif operator == "!exists":
+            if key in labels:
+                return False
+        elif operator in ("=", "in"):
+            if labels.get(key) not in values:
+                return False
+        elif operator in ("!=", "notin"):
+            if key in labels and labels[key] in values:
+                return False
+    return True
+
+
+class Informer:
+    """
+    Keeps a local copy of a single resource type in sync with the cluster
+    by performing one LIST followed by a WATCH started from the
+    resourceVersion returned by that LIST
+    """
+
+    def __init__(self, name, list_func, watch_timeout=300, retry_backoff=5):
+        self.name = name
+        self.list_func = list_func
+        self.watch_timeout = watch_timeout
+        self.retry_backoff = retry_backoff
+        self.resource_version = None
+        self._objects = {}
+        self._lock = threading.RLock()
+        self._synced = threading.Event()
+        self._stopped = threading.Event()
+        self._watch = None
+        self._thread = None
+        self._handlers = []
+
+    @staticmethod
+    def _key(obj):
+        return (obj.metadata.namespace, obj.metadata.name)
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="kraken-informer-%s" % self.name,
+            daemon=True
+        )
+        self._thread.start()
+
+    def add_handler(self, handler):
+        """
+        Registers a function called with the event type and the object on
+        every change of the cache. A relist calls it with ("RELISTED", None)
+        followed by one ADDED event per listed object
+        """
+        with self._lock:
+            self._handlers.append(handler)
+            for obj in self._objects.values():
+                handler("ADDED", obj)
+
+    def _notify(self, event_type, obj):
+        for handler in self._handlers:
+            handler(event_type, obj)
+
+    def stop(self):
+        self._stopped.set()
+        if self._watch:
+            self._watch.stop()
+
+    def wait_for_sync(self, timeout=None):
+        return self._synced.wait(timeout)
+
+    @property
+    def synced(self):
+        return self._synced.is_set()
+
+    def items(self):
+        """Returns a snapshot of the cached objects"""
+        with self._lock:
+            return list(self._objects.values())
+
+    def snapshot(self):
+        """Returns the resourceVersion and the objects of the cache"""
+        with self._lock:
+            return self.resource_version, list(self._objects.values())
+
+    def restore(self, objects, resource_version):
+        """
+        Fills the cache with previously saved objects. The informer then
+        starts with a watch from the resourceVersion instead of a list, and
+        falls back to a list if that resourceVersion expired
+        """
+        with self._lock:
+            self._objects = {self._key(obj): obj for obj in objects}
+            self.resource_version = resource_version
+            self._notify("RELISTED", None)
+            for obj in objects:
+                self._notify("ADDED", obj)
+        self._synced.set()
+
+    def _list(self):
+        ret = self.list_func()
+        with self._lock:
+            self._objects = {self._key(obj): obj for obj in ret.items}
+            self.resource_version = ret.metadata.resource_version
+            self._notify("RELISTED", None)
+            for obj in ret.items:
+                self._notify("ADDED", obj)
+        self._synced.set()
+        logging.debug(
+            "Cache %s listed %s objects at resourceVersion %s" % (
+                self.name,
+                len(ret.items),
+                self.resource_version
+            )
+        )
+
+    def _handle_event(self, event):
+        event_type = event["type"]
+        raw_object = event["raw_object"]
+        resource_version = raw_object.get("metadata", {}).get(
+            "resourceVersion"
+        )
+        # BOOKMARK events only carry the latest resourceVersion, they keep
+        # it fresh on quiet resources so a resumed watch does not expire
+        with self._lock:
+            if event_type in ("ADDED", "MODIFIED"):
+                self._objects[self._key(event["object"])] = event["object"]
+                self._notify(event_type, event["object"])
+            elif event_type == "DELETED":
+                self._objects.pop(self._key(event["object"]), None)
+                self._notify(event_type, event["object"])
+            if resource_version:
+                self.resource_version = resource_version
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                if self.resource_version is None:
+                    self._list()
+                self._watch = watch.Watch()
+                for event in self._watch.stream(
+                    self.list_func,
+                    resource_version=self.resource_version,
+                    allow_watch_bookmarks=True,
+                    timeout_seconds=self.watch_timeout
+                ):
+                    self._handle_event(event)
+                    if self._stopped.is_set():
+                        break
+            except ApiException as e:
+                if e.status == HTTP_STATUS_GONE:
+                    logging.debug(
+                        "Cache %s resourceVersion %s expired, relisting" % (
+                            self.name,
+                            self.resource_version
+                        )
+                    )
+                    self.resource_version = None
+                else:
+                    logging.error(
+                        "Cache %s failed to watch: %s\n" % (self.name, e)
+                    )
+                    self._stopped.wait(self.retry_backoff)
+            except Exception as e:
+                logging.error(
+                    "Cache %s failed to watch: %s\n" % (self.name, e)
+                )
+                self._stopped.wait(self.retry_backoff)
+
+
+class VolumeIndex:
+    """
+    Reverse index from each PersistentVolumeClaim to the pods mounting it
+    and from each PersistentVolume to the claim bound to it, so looking up
+    the consumers of a claim does not require scanning every pod
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pod_claims = {}
+        self._claim_pods = {}
+        self._claims = {}
+        self._volume_claims = {}
+
+    def set_pod(self, namespace, name, claims):
+        """Records the names of the claims mounted by a pod"""
+        with self._lock:
+            self.delete_pod(namespace, name)
+            claims = set(claims)
+            if not claims:
+                return
+            self._pod_claims[(namespace, name)] = claims
+            for claim in claims:
+                self._claim_pods.setdefault((namespace, claim), set()).add(
+                    name
+                )
+
+    def delete_pod(self, namespace, name):
+        with self._lock:
+            for claim in self._pod_claims.pop((namespace, name), ()):
+                pods = self._claim_pods.get((namespace, claim))
+                if pods is not None:
+                    pods.discard(name)
+                    if not pods:
+                        del self._claim_pods[(namespace, claim)]
+
+    def clear_pods(self):
+        with self._lock:
+            self._pod_claims.clear()
+            self._claim_pods.clear()
+
+    def set_claim(self, namespace, name, capacity, volume_name):
+        """Records the capacity and the bound volume of a claim"""
+        with self._lock:
+            self.delete_claim(namespace, name)
+            self._claims[(namespace, name)] = {
+                "capacity": capacity,
+                "volumeName": volume_name,
+            }
+            if volume_name:
+                self._volume_claims[volume_name] = (namespace, name)
+
+    def delete_claim(self, namespace, name):
+        with self._lock:
+            claim = self._claims.pop((namespace, name), None)
+            if claim and claim["volumeName"]:
+                self._volume_claims.pop(claim["volumeName"], None)
+
+    def clear_claims(self):
+        with self._lock:
+            self._claims.clear()
+            self._volume_claims.clear()
+
+    def claim(self, namespace, name):
+        """
+        Returns a dictionary with the capacity and volumeName of the claim,
+        None if the claim does not exist
+        """
+        with self._lock:
+            claim = self._claims.get((namespace, name))
+            return dict(claim) if claim else None
+
+    def pods_for_claim(self, namespace, name):
+        """Returns the sorted names of the pods mounting the claim"""
+        with self._lock:
+            return sorted(self._claim_pods.get((namespace, name), ()))
+
+    def claim_for_volume(self, volume_name):
+        """
+        Returns the (namespace, name) of the claim bound to the
+        PersistentVolume, None if it is not bound
+        """
+        with self._lock:
+            return self._volume_claims.get(volume_name)
+
+    def handle_pod(self, event_type, pod):
+        """Informer handler keeping the index in sync with the pods"""
+        if event_type == "RELISTED":
+            self.clear_pods()
+        elif event_type == "DELETED":
+            self.delete_pod(pod.metadata.namespace, pod.metadata.name)
+        else:
+            self.set_pod(
+                pod.metadata.namespace,
+                pod.metadata.name,
+                [
+                    volume.persistent_volume_claim.claim_name
+                    for volume in (pod.spec and pod.spec.volumes) or []
+                    if volume.persistent_volume_claim is not None
+                ]
+            )
+
+    def handle_claim(self, event_type, pvc):
+        """Informer handler keeping the index in sync with the claims"""
+        if event_type == "RELISTED":
+            self.clear_claims()
+        elif event_type == "DELETED":
+            self.delete_claim(pvc.metadata.namespace, pvc.metadata.name)
+        else:
+            capacity = None
+            if pvc.status and pvc.status.capacity:
+                capacity = pvc.status.capacity.get("storage")
+            self.set_claim(
+                pvc.metadata.namespace,
+                pvc.metadata.name,
+                capacity,
+                pvc.spec.volume_name if pvc.spec else None
+            )
+
+
+class ClusterCache:
+    """
+    In-memory cache of the nodes, pods, namespaces and persistent volume
+    claims of the cluster, shared by the helpers in kraken.kubernetes.client
+    """
+
+    # OpenAPI models of the cached objects, used to load snapshots
+    MODELS = {
+        "nodes": "V1Node",
+        "pods": "V1Pod",
+        "namespaces": "V1Namespace",
+        "persistentvolumeclaims": "V1PersistentVolumeClaim",
+    }
+
+    def __init__(self, cli, watch_timeout=300):
+        self.api_client = cli.api_client
+        self.informers = {
+            "nodes": Informer("nodes", cli.list_node, watch_timeout),
+            "pods": Informer(
+                "pods",
+                cli.list_pod_for_all_namespaces,
+                watch_timeout
+            ),
+            "namespaces": Informer(
+                "namespaces",
+                cli.list_namespace,
+                watch_timeout
+            ),
+            "persistentvolumeclaims": Informer(
+                "persistentvolumeclaims",
+                cli.list_persistent_volume_claim_for_all_namespaces,
+                watch_timeout
+            ),
+        }
+        self.volumes = VolumeIndex()
+        self.informers["pods"].add_handler(self.volumes.handle_pod)
+        self.informers["persistentvolumeclaims"].add_handler(
+            self.volumes.handle_claim
+        )
+
+    def start(self):
+        for informer in self.informers.values():
+            informer.start()
+
+    def stop(self):
+        for informer in self.informers.values():
+            informer.stop()
+
+    def wait_for_sync(self, timeout=None):
+        """
+        Waits until every informer completed its initial LIST. Returns
+        False if the timeout expired before that
+        """
+
+        deadline = None if timeout is None else time.time() + timeout
+        for informer in self.informers.values():
+            remaining = None
+            if deadline is not None:
+                remaining = max(0, deadline - time.time())
+            if not informer.wait_for_sync(remaining):
+                return False
+        return True
+
+    def synced(self, resource):
+        return self.informers[resource].synced
+
+    def save_snapshot(self, path):
+        """
+        Writes the synced informers and their resourceVersion to a JSON
+        file, so a later run can resume watching instead of listing
+        """
+
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "host": self.api_client.configuration.host,
+            "time": time.time(),
+            "informers": {},
+        }
+        for name, informer in self.informers.items():
+            if not informer.synced:
+                continue
+            resource_version, objects = informer.snapshot()
+            snapshot["informers"][name] = {
+                "resourceVersion": resource_version,
+                "items": self.api_client.sanitize_for_serialization(objects),
+            }
+        tmp_path = "%s.tmp" % path
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+        logging.info("Saved the cluster cache snapshot to %s" % path)
+
+    def load_snapshot(self, path, max_age=SNAPSHOT_MAX_AGE):
+        """
+        Restores the informers from a snapshot written by save_snapshot.
+        Must be called before start. Snapshots of another cluster or older
+        than max_age seconds are ignored
+
+        Returns:
+            True if the snapshot was loaded
+        """
+
+        if not os.path.isfile(path):
+            return False
+        try:
+            with open(path, "r") as f:
+                snapshot = json.load(f)
+        except Exception as e:
+            logging.warning(
+                "Ignoring unreadable cluster cache snapshot %s: %s" % (path, e)
+            )
+            return False
+        if (
+            snapshot.get("version") != SNAPSHOT_VERSION
+            or snapshot.get("host") != self.api_client.configuration.host
+            or time.time() - snapshot.get("time", 0) > max_age
+        ):
+            logging.info("Ignoring stale cluster cache snapshot %s" % path)
+            return False
+        for name, saved in snapshot["informers"].items():
+            if name not in self.informers:
+                continue
+            objects = [
+                self.api_client.deserialize(
+                    SimpleNamespace(data=json.dumps(item)),
+                    self.MODELS[name]
+                )
+                for item in saved["items"]
+            ]
+            self.informers[name].restore(objects, saved["resourceVersion"])
+        logging.info(
+            "Loaded the cluster cache snapshot %s, resuming the watches" % path
+        )
+        return True
+
+    def resource_version(self, resource):
+        return self.informers[resource].resource_version
+
+    def _select(self, resource, label_selector=None, namespace=None):
+        requirements = parse_label_selector(label_selector)
+        return [
+            obj
+            for obj in self.informers[resource].items()
+            if (namespace is None or obj.metadata.namespace == namespace)
+            and match_label_selector(requirements, obj.metadata.labels)
+        ]
+
+    def nodes(self, label_selector=None):
+        return self._select("nodes", label_selector)
+
+    def pods(self, namespace=None, label_selector=None):
+        return self._select("pods", label_selector, namespace)
+
+    def namespaces(self, label_selector=None):
+        return self._select("namespaces", label_selector)
@@ -1,40 +1,206 @@
+import json
 import logging
+import os
 import re
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from kubernetes import client, config, utils, watch
+from kubernetes import client, utils
 from kubernetes.client.rest import ApiException
-from kubernetes.dynamic.client import DynamicClient
 from kubernetes.stream import stream
+from kubernetes.watch.watch import iter_resp_lines
 
+from ..kubernetes import (discovery, instrumentation, inventory,
+                          node_status, pod_status, protobuf, registry)
+from ..kubernetes.cache import ClusterCache, VolumeIndex
+from ..kubernetes.projection import list_projected, read_projected
 from ..kubernetes.resources import (PVC, ChaosEngine, ChaosResult, Container,
-                                    LitmusChaosObject, Pod, Volume,
-                                    VolumeMount)
+                                    ExecResult, LitmusChaosObject,
+                                    ObjectMetadata, OwnerReference, Pod,
+                                    Volume, VolumeMount)
 
 kraken_node_name = ""
+dyn_client = None
+dyn_client_lock = threading.Lock()
+SERVICE_ACCOUNT_NAMESPACE = (
+    "/var/run/secrets/kubernetes.io/serviceaccount/namespace"
+)
+cluster_cache = None
+wire_format = "json"
+
+PARTIAL_OBJECT_METADATA_LIST = (
+    "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1"
+)
+PARTIAL_OBJECT_METADATA = (
+    "application/json;as=PartialObjectMetadata;g=meta.k8s.io;v=v1"
+)
+
+# Fields read from the raw JSON responses, see kraken.kubernetes.projection
+KILLABLE_NODE_FIELDS = {
+    "name": "metadata.name",
+    "conditions": "status.conditions",
+}
+NODE_INVENTORY_FIELDS = {
+    "name": "metadata.name",
+    "uid": "metadata.uid",
+    "labels": "metadata.labels",
+    "conditions": "status.conditions",
+}
+POD_INVENTORY_FIELDS = {
+    "name": "metadata.name",
+    "namespace": "metadata.namespace",
+    "uid": "metadata.uid",
+    "labels": "metadata.labels",
+    "phase": "status.phase",
+    "nodeName": "spec.nodeName",
+}
+POD_INFO_FIELDS = {
+    "name": "metadata.name",
+    "namespace": "metadata.namespace",
+    "podIP": "status.podIP",
+    "nodeName": "spec.nodeName",
+    "containers": "spec.containers",
+    "containerStatuses": "status.containerStatuses",
+    "volumes": "spec.volumes",
+}
+PVC_INFO_FIELDS = {
+    "name": "metadata.name",
+    "namespace": "metadata.namespace",
+    "capacity": "status.capacity.storage",
+    "volumeName": "spec.volumeName",
+}
+POD_VOLUMES_FIELDS = {
+    "name": "metadata.name",
+    "namespace": "metadata.namespace",
+    "volumes": "spec.volumes",
+}
+
+# Cluster wide and namespaced API paths of the resources that can be
+# listed in metadata-only mode
+METADATA_RESOURCE_PATHS = {
+    "pods": ("/api/v1/pods", "/api/v1/namespaces/{namespace}/pods"),
+    "nodes": ("/api/v1/nodes", None),
+    "namespaces": ("/api/v1/namespaces", None),
+    "persistentvolumeclaims": (
+        "/api/v1/persistentvolumeclaims",
+        "/api/v1/namespaces/{namespace}/persistentvolumeclaims",
+    ),
+}
+
+# Kinds of workloads checked by sweep_workload_availability, with the
+# desired and available replicas of a workload
+WORKLOAD_REPLICAS = (
+    (
+        "deployment",
+        lambda workload: (
+            1 if workload.spec.replicas is None else workload.spec.replicas,
+            workload.status.available_replicas
+        )
+    ),
+    (
+        "stateful_set",
+        lambda workload: (
+            1 if workload.spec.replicas is None else workload.spec.replicas,
+            workload.status.ready_replicas
+        )
+    ),
+    (
+        "daemon_set",
+        lambda workload: (
+            workload.status.desired_number_scheduled,
+            workload.status.number_available
+        )
+    ),
+)
 
 
 # Load kubeconfig and initialize kubernetes python client
-def initialize_clients(kubeconfig_path):
+def initialize_clients(
+    kubeconfig_path,
+    use_cache=True,
+    wire="json",
+    snapshot_path=None
+):
+    global wire_format
     global cli
     global batch_cli
-    global watch_resource
+    global apps_cli
     global api_client
     global dyn_client
     global custom_object_client
+    global cluster_cache
     try:
-        config.load_kube_config(kubeconfig_path)
-        cli = client.CoreV1Api()
-        batch_cli = client.BatchV1Api()
-        watch_resource = watch.Watch()
-        api_client = client.ApiClient()
-        custom_object_client = client.CustomObjectsApi()
-        k8s_client = config.new_client_from_config()
-        dyn_client = DynamicClient(k8s_client)
+        api_client = registry.get_api_client(kubeconfig_path)
+        client.Configuration.set_default(api_client.configuration)
+        cli = client.CoreV1Api(api_client)
+        batch_cli = client.BatchV1Api(api_client)
+        apps_cli = client.AppsV1Api(api_client)
+        custom_object_client = client.CustomObjectsApi(api_client)
+        dyn_client = None
     except ApiException as e:
         logging.error("Failed to initialize kubernetes client: %s\n" % e)
         sys.exit(1)
+    if wire not in ("json", "protobuf"):
+        logging.error("Unsupported wire format %s, using json" % wire)
+        wire = "json"
+    wire_format = wire
+    if cluster_cache:
+        cluster_cache.stop()
+        cluster_cache = None
+    if use_cache:
+        cluster_cache = ClusterCache(cli)
+        if snapshot_path:
+            cluster_cache.load_snapshot(snapshot_path)
+        cluster_cache.start()
+
+
+def save_cache_snapshot(snapshot_path):
+    """
+    Persists the cluster cache and its resourceVersions, so the next run
+    started with the same snapshot_path resumes the watches instead of
+    listing the whole cluster
+    """
+
+    if cluster_cache is None:
+        return
+    try:
+        cluster_cache.save_snapshot(snapshot_path)
+    except Exception as e:
+        logging.error(
+            "Failed to save the cluster cache snapshot to %s: %s" % (
+                snapshot_path,
+                e
+            )
+        )
+
+
+def get_dynamic_client():
+    """
+    Returns the DynamicClient, created on first use so that runs which do
+    not need it skip the API discovery
+    """
+
+    global dyn_client
+    with dyn_client_lock:
+        if dyn_client is None:
+            dyn_client = discovery.create_dynamic_client(api_client)
+        return dyn_client
+
+
+def get_cache(resource, consistent=False):
+    """
+    Returns the cluster cache if it can serve reads of the given resource
+    type, None when the caller asked for a strongly consistent read or the
+    cache is disabled or not synced yet
+    """
+
+    if consistent or cluster_cache is None:
+        return None
+    if not cluster_cache.synced(resource):
+        return None
+    return cluster_cache
 
 
 def get_host() -> str:
@@ -65,25 +231,211 @@ def get_clusterversion_string() -> str:
             raise
 
 
-# List all namespaces
-def list_namespaces(label_selector=None):
-    namespaces = []
-    try:
+def _request_metadata(resource, namespace, query_params, accept):
+    cluster_path, namespaced_path = METADATA_RESOURCE_PATHS[resource]
+    path_params = {}
+    path = cluster_path
+    if namespace:
+        if namespaced_path is None:
+            raise Exception("Resource %s is not namespaced" % resource)
+        path = namespaced_path
+        path_params["namespace"] = namespace
+    return cli.api_client.call_api(
+        path,
+        "GET",
+        path_params,
+        query_params,
+        {"Accept": accept},
+        response_type=None,
+        auth_settings=["BearerToken"],
+        _return_http_data_only=True,
+        _preload_content=False
+    )
+
+
+def _to_object_metadata(metadata):
+    return ObjectMetadata(
+        name=metadata.get("name"),
+        namespace=metadata.get("namespace"),
+        labels=metadata.get("labels") or {},
+        ownerReferences=[
+            OwnerReference(
+                kind=owner.get("kind"),
+                name=owner.get("name"),
+                uid=owner.get("uid"),
+                controller=owner.get("controller", False)
+            )
+            for owner in metadata.get("ownerReferences") or []
+        ],
+        resourceVersion=metadata.get("resourceVersion")
+    )
+
+
+def _is_protobuf(response):
+    content_type = response.getheader("Content-Type") or ""
+    return content_type.startswith(protobuf.PROTOBUF)
+
+
+def list_metadata(
+    resource,
+    namespace=None,
+    label_selector=None,
+    field_selector=None,
+    page_size=500,
+    wire=None
+):
+    """
+    Generator that lists objects in metadata-only mode: the API server is
+    asked for a PartialObjectMetadataList, so specs and statuses are never
+    sent over the wire nor decoded
+
+    Args:
+        resource (string)
+            - One of pods, nodes, namespaces or persistentvolumeclaims
+
+        namespace (string)
+            - Namespace to list the objects from, all the namespaces if
+              not set
+
+        label_selector (string)
+            - Kubernetes label selector for the objects
+
+        field_selector (string)
+            - Kubernetes field selector for the objects
+
+        page_size (int)
+            - Maximum number of objects requested per page
+
+        wire (string)
+            - Wire format to negotiate, json or protobuf. Defaults to the
+              format set by initialize_clients. The API server may still
+              answer in JSON, which is then decoded as such
+
+    Yields:
+        ObjectMetadata data class objects
+    """
+
+    accept = PARTIAL_OBJECT_METADATA_LIST
+    if (wire or wire_format) == "protobuf":
+        accept = "%s,%s" % (
+            protobuf.PROTOBUF_PARTIAL_OBJECT_METADATA_LIST,
+            PARTIAL_OBJECT_METADATA_LIST
+        )
+    _continue = None
+    while True:
+        query_params = [("limit", page_size)]
         if label_selector:
-            ret = cli.list_namespace(
-                pretty=True,
-                label_selector=label_selector
-                )
+            query_params.append(("labelSelector", label_selector))
+        if field_selector:
+            query_params.append(("fieldSelector", field_selector))
+        if _continue:
+            query_params.append(("continue", _continue))
+        try:
+            response = _request_metadata(
+                resource,
+                namespace,
+                query_params,
+                accept
+            )
+        except ApiException as e:
+            logging.error(
+                "Exception when listing %s metadata: %s\n" % (resource, e)
+            )
+            raise e
+        if _is_protobuf(response):
+            items, _, _continue = protobuf.decode_list_metadata(
+                response.data
+            )
+            for item in items:
+                yield item
         else:
-            ret = cli.list_namespace(pretty=True)
-    except ApiException as e:
-        logging.error(
-            "Exception when calling CoreV1Api->list_namespaced_pod: %s\n" % e
+            object_list = json.loads(response.data)
+            for item in object_list.get("items") or []:
+                yield _to_object_metadata(item.get("metadata", {}))
+            _continue = object_list.get("metadata", {}).get("continue")
+        if not _continue:
+            break
+
+
+def watch_metadata(
+    resource,
+    namespace=None,
+    label_selector=None,
+    field_selector=None,
+    resource_version=None,
+    timeout_seconds=None,
+    wire=None
+):
+    """
+    Generator that watches objects in metadata-only mode, see list_metadata
+    for the wire format negotiation
+
+    Yields:
+        Tuples of the event type (ADDED, MODIFIED or DELETED) and the
+        ObjectMetadata of the object
+    """
+
+    query_params = [("watch", True)]
+    if label_selector:
+        query_params.append(("labelSelector", label_selector))
+    if field_selector:
+        query_params.append(("fieldSelector", field_selector))
+    if resource_version:
+        query_params.append(("resourceVersion", resource_version))
+    if timeout_seconds:
+        query_params.append(("timeoutSeconds", timeout_seconds))
+    accept = PARTIAL_OBJECT_METADATA
+    if (wire or wire_format) == "protobuf":
+        accept = "%s,%s" % (
+            protobuf.PROTOBUF_PARTIAL_OBJECT_METADATA,
+            PARTIAL_OBJECT_METADATA
         )
-        raise e
-    for namespace in ret.items:
-        namespaces.append(namespace.metadata.name)
-    return namespaces
+    response = _request_metadata(resource, namespace, query_params, accept)
+    try:
+        if _is_protobuf(response):
+            for frame in protobuf.iter_frames(response):
+                event_type, raw_object = protobuf.decode_watch_event(frame)
+                if event_type == "ERROR":
+                    code, message = protobuf.decode_status(raw_object)
+                    raise ApiException(status=code, reason=message)
+                if event_type == "BOOKMARK":
+                    continue
+                yield event_type, protobuf.decode_object_metadata(
+                    raw_object
+                )
+            return
+        for line in iter_resp_lines(response):
+            event = json.loads(line)
+            if event["type"] == "ERROR":
+                raise ApiException(
+                    status=event["object"].get("code"),
+                    reason=event["object"].get("message")
+                )
+            if event["type"] == "BOOKMARK":
+                continue
+            yield event["type"], _to_object_metadata(
+                event["object"].get("metadata", {})
+            )
+    finally:
+        response.close()
+        response.release_conn()
+
+
+# List all namespaces
+def list_namespaces(label_selector=None, consistent=False):
+    cache = get_cache("namespaces", consistent)
+    if cache:
+        return [
+            namespace.metadata.name
+            for namespace in cache.namespaces(label_selector)
+        ]
+    return [
+        namespace.name
+        for namespace in list_metadata(
+            "namespaces",
+            label_selector=label_selector
+        )
+    ]
 
 
 def get_namespace_status(namespace_name):
@@ -114,10 +466,10 @@ def delete_namespace(namespace):
         )
 
 
-def check_namespaces(namespaces, label_selectors=None):
+def check_namespaces(namespaces, label_selectors=None, consistent=False):
     """Check if all the watch_namespaces are valid"""
     try:
-        valid_namespaces = list_namespaces(label_selectors)
+        valid_namespaces = list_namespaces(label_selectors, consistent)
         regex_namespaces = set(namespaces) - set(valid_namespaces)
         final_namespaces = set(namespaces) - set(regex_namespaces)
         valid_regex = set()
@@ -141,76 +493,202 @@ def check_namespaces(namespaces, label_selectors=None):
 
 
 # List nodes in the cluster
-def list_nodes(label_selector=None):
-    nodes = []
-    try:
-        if label_selector:
-            ret = cli.list_node(pretty=True, label_selector=label_selector)
-        else:
-            ret = cli.list_node(pretty=True)
-    except ApiException as e:
-        logging.error("Exception when calling CoreV1Api->list_node: %s\n" % e)
-        raise e
-    for node in ret.items:
-        nodes.append(node.metadata.name)
-    return nodes
+def list_nodes(label_selector=None, consistent=False):
+    cache = get_cache("nodes", consistent)
+    if cache:
+        return [node.metadata.name for node in cache.nodes(label_selector)]
+    return [
+        node.name
+        for node in list_metadata("nodes", label_selector=label_selector)
+    ]
 
 
 # List nodes in the cluster that can be killed
-def list_killable_nodes(label_selector=None):
+def list_killable_nodes(label_selector=None, consistent=False):
     nodes = []
+    cache = get_cache("nodes", consistent)
+    if cache:
+        nodes_info = [
+            {
+                "name": node.metadata.name,
+                "conditions": [
+                    {"type": cond.type, "status": cond.status}
+                    for cond in node.status.conditions or []
+                ],
+            }
+            for node in cache.nodes(label_selector)
+        ]
+    else:
+        try:
+            nodes_info = list_projected(
+                cli.list_node,
+                KILLABLE_NODE_FIELDS,
+                label_selector=label_selector
+            )
+        except ApiException as e:
+            logging.error(
+                "Exception when calling CoreV1Api->list_node: %s\n" % e
+            )
+            raise e
+    for node in nodes_info:
+        if kraken_node_name != node["name"]:
+            for cond in node["conditions"] or []:
+                if cond["type"] == "Ready" and cond["status"] == "True":
+                    nodes.append(node["name"])
+    return nodes
+
+
+def get_node_inventory(consistent=False):
+    """
+    Returns a columnar inventory of the nodes with their labels, zone and
+    readiness, see kraken.kubernetes.inventory
+
+    Args:
+        consistent (bool)
+            - List the nodes from the API server even if the cluster cache
+              is synced
+
+    Returns:
+        Inventory object
+    """
+
+    nodes = inventory.Inventory()
+    cache = get_cache("nodes", consistent)
+    if cache:
+        for node in cache.nodes():
+            labels = node.metadata.labels or {}
+            nodes.add(
+                node.metadata.name,
+                labels=labels,
+                zone=inventory.get_zone(labels),
+                ready=node_status.get_ready_status(node) == "True",
+                uid=node.metadata.uid
+            )
+        return nodes
     try:
-        if label_selector:
-            ret = cli.list_node(pretty=True, label_selector=label_selector)
-        else:
-            ret = cli.list_node(pretty=True)
+        nodes_info = list_projected(cli.list_node, NODE_INVENTORY_FIELDS)
     except ApiException as e:
         logging.error("Exception when calling CoreV1Api->list_node: %s\n" % e)
         raise e
-    for node in ret.items:
-        if kraken_node_name != node.metadata.name:
-            for cond in node.status.conditions:
-                if str(cond.type) == "Ready" and str(cond.status) == "True":
-                    nodes.append(node.metadata.name)
+    for node in nodes_info:
+        labels = node["labels"] or {}
+        nodes.add(
+            node["name"],
+            labels=labels,
+            zone=inventory.get_zone(labels),
+            ready=any(
+                cond["type"] == "Ready" and cond["status"] == "True"
+                for cond in node["conditions"] or []
+            ),
+            uid=node["uid"]
+        )
     return nodes
 
 
-# List pods in the given namespace
-def list_pods(namespace, label_selector=None):
-    pods = []
+def get_pod_inventory(namespace=None, consistent=False):
+    """
+    Returns a columnar inventory of the pods with their labels, phase and
+    node, see kraken.kubernetes.inventory
+
+    Args:
+        namespace (string)
+            - Namespace of the pods, all the namespaces if not set
+
+        consistent (bool)
+            - List the pods from the API server even if the cluster cache
+              is synced
+
+    Returns:
+        Inventory object
+    """
+
+    pods = inventory.Inventory()
+    cache = get_cache("pods", consistent)
+    if cache:
+        for pod in cache.pods(namespace):
+            pods.add(
+                pod.metadata.name,
+                pod.metadata.namespace,
+                labels=pod.metadata.labels,
+                phase=pod.status.phase if pod.status else None,
+                node=pod.spec.node_name if pod.spec else None,
+                uid=pod.metadata.uid
+            )
+        return pods
     try:
-        if label_selector:
-            ret = cli.list_namespaced_pod(
-                namespace,
-                pretty=True,
-                label_selector=label_selector
+        if namespace:
+            pods_info = list_projected(
+                cli.list_namespaced_pod,
+                POD_INVENTORY_FIELDS,
+                namespace
             )
         else:
-            ret = cli.list_namespaced_pod(namespace, pretty=True)
+            pods_info = list_projected(
+                cli.list_pod_for_all_namespaces,
+                POD_INVENTORY_FIELDS
+            )
     except ApiException as e:
-        logging.error(
-            "Exception when calling \
-                       CoreV1Api->list_namespaced_pod: %s\n"
-            % e
-        )
+        logging.error("Exception when calling CoreV1Api->list_pod: %s\n" % e)
         raise e
-    for pod in ret.items:
-        pods.append(pod.metadata.name)
+    for pod in pods_info:
+        pods.add(
+            pod["name"],
+            pod["namespace"],
+            labels=pod["labels"],
+            phase=pod["phase"],
+            node=pod["nodeName"],
+            uid=pod["uid"]
+        )
     return pods
 
 
-def get_all_pods(label_selector=None):
-    pods = []
-    if label_selector:
-        ret = cli.list_pod_for_all_namespaces(
-            pretty=True,
+# List pods in the given namespace
+def list_pods(namespace, label_selector=None, consistent=False):
+    cache = get_cache("pods", consistent)
+    if cache:
+        return [
+            pod.metadata.name
+            for pod in cache.pods(namespace, label_selector)
+        ]
+    return [
+        pod.name
+        for pod in list_metadata(
+            "pods",
+            namespace,
             label_selector=label_selector
         )
-    else:
-        ret = cli.list_pod_for_all_namespaces(pretty=True)
-    for pod in ret.items:
-        pods.append([pod.metadata.name, pod.metadata.namespace])
-    return pods
+    ]
+
+
+def get_all_pods(label_selector=None, consistent=False):
+    cache = get_cache("pods", consistent)
+    if cache:
+        return [
+            [pod.metadata.name, pod.metadata.namespace]
+            for pod in cache.pods(label_selector=label_selector)
+        ]
+    return [
+        [pod.name, pod.namespace]
+        for pod in list_metadata("pods", label_selector=label_selector)
+    ]
+
+
+def _exec(command, pod_name, namespace, container, base_command, timeout):
+    kwargs = {}
+    if container:
+        kwargs["container"] = container
+    return stream(
+        registry.get_exec_api(api_client).connect_get_namespaced_pod_exec,
+        pod_name,
+        namespace,
+        command=[base_command, "-c", command],
+        stderr=True,
+        stdin=False,
+        stdout=True,
+        tty=False,
+        _request_timeout=timeout,
+        **kwargs
+    )
 
 
 # Execute command in pod
@@ -219,67 +697,206 @@ def exec_cmd_in_pod(
     pod_name,
     namespace,
     container=None,
-    base_command="bash"
+    base_command="bash",
+    timeout=60
 ):
-
-    exec_command = [base_command, "-c", command]
     try:
-        if container:
-            ret = stream(
-                cli.connect_get_namespaced_pod_exec,
+        ret = _exec(
+            command,
+            pod_name,
+            namespace,
+            container,
+            base_command,
+            timeout
+        )
+    except Exception:
+        return False
+    return ret
+
+
+def exec_cmd_in_pods(
+    command,
+    targets,
+    base_command="bash",
+    max_workers=20,
+    timeout=60
+):
+    """
+    Runs a command in many containers concurrently, one websocket per
+    target, with at most max_workers commands in flight at a time
+
+    Args:
+        command (string)
+            - Command to run, passed to the base command with -c
+
+        targets (list)
+            - List of (pod name, namespace, container name) tuples, the
+              container name can be None to use the default container
+
+        base_command (string)
+            - Shell used to run the command
+
+        max_workers (int)
+            - Maximum number of commands running at the same time
+
+        timeout (int)
+            - Timeout in seconds of each command
+
+    Returns:
+        List of ExecResult data class objects, in the order of the targets
+    """
+
+    def run(target):
+        pod_name, namespace, container = target
+        start_time = time.time()
+        try:
+            output = _exec(
+                command,
                 pod_name,
                 namespace,
-                container=container,
-                command=exec_command,
-                stderr=True,
-                stdin=False,
-                stdout=True,
-                tty=False,
+                container,
+                base_command,
+                timeout
             )
-        else:
-            ret = stream(
-                cli.connect_get_namespaced_pod_exec,
-                pod_name,
+            success = True
+            error = ""
+        except Exception as e:
+            output = ""
+            success = False
+            error = str(e)
+        return ExecResult(
+            pod=pod_name,
+            namespace=namespace,
+            container=container,
+            success=success,
+            output=output,
+            error=error,
+            duration=time.time() - start_time
+        )
+
+    if not targets:
+        return []
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(targets))
+    ) as executor:
+        return list(
+            executor.map(instrumentation.bind_scenario(run), targets)
+        )
+
+
+def watch_pods(names, namespace, is_done, timeout=120):
+    """
+    Waits until a condition holds for every pod of a batch, using a single
+    watch stream on the namespace. The current state of the pods is listed
+    first, then the watch starts from the resourceVersion of that list so
+    no event is missed.
+
+    Args:
+        names (list)
+            - Names of the pods to wait for
+
+        namespace (string)
+            - Namespace of the pods
+
+        is_done (function)
+            - Called with the event type (ADDED, MODIFIED or DELETED) and the
+              V1Pod, or None for pods absent from the initial list. Returns
+              True once the pod reached the expected state
+
+        timeout (int)
+            - Number of seconds to wait for
+
+    Returns:
+        Set of the names of the pods that did not reach the expected state
+        before the timeout
+    """
+
+    return pod_status.wait_for_pods(
+        cli,
+        names,
+        is_done,
+        timeout,
+        namespace=namespace
+    )
+
+
+def wait_for_pods_running(names, namespace, timeout=120):
+    """
+    Waits over a single watch until all the pods are Running. Returns the
+    set of pods which are not running after the timeout
+    """
+
+    return watch_pods(
+        names,
+        namespace,
+        lambda event_type, pod: (
+            pod is not None and
+            event_type != "DELETED" and
+            pod.status.phase == "Running"
+        ),
+        timeout
+    )
+
+
+def wait_for_pods_deleted(names, namespace, timeout=120):
+    """
+    Waits over a single watch until all the pods are deleted. Returns the
+    set of pods which still exist after the timeout
+    """
+
+    return watch_pods(
+        names,
+        namespace,
+        lambda event_type, pod: event_type == "DELETED",
+        timeout
+    )
+
+
+def delete_pods(names, namespace, timeout=120):
+    """
+    Deletes a batch of pods and waits for all of them to be gone over a
+    single watch. Returns the set of pods still present after the timeout
+    """
+
+    for name in names:
+        try:
+            cli.delete_namespaced_pod(name=name, namespace=namespace)
+        except ApiException as e:
+            if e.status == 404:
+                logging.info("Pod %s already deleted" % name)
+            else:
+                logging.error("Failed to delete pod %s" % e)
+                raise e
+    remaining = wait_for_pods_deleted(names, namespace, timeout)
+    if remaining:
+        logging.error(
+            "Pods %s in namespace %s still exist after %ss" % (
+                ", ".join(sorted(remaining)),
                 namespace,
-                command=exec_command,
-                stderr=True,
-                stdin=False,
-                stdout=True,
-                tty=False,
+                timeout
             )
-    except Exception:
-        return False
-    return ret
+        )
+    return remaining
 
 
-def delete_pod(name, namespace):
-    try:
-        cli.delete_namespaced_pod(name=name, namespace=namespace)
-        while cli.read_namespaced_pod(name=name, namespace=namespace):
-            time.sleep(1)
-    except ApiException as e:
-        if e.status == 404:
-            logging.info("Pod already deleted")
-        else:
-            logging.error("Failed to delete pod %s" % e)
-            raise e
+def delete_pod(name, namespace, timeout=120):
+    delete_pods([name], namespace, timeout)
 
 
 def create_pod(body, namespace, timeout=120):
     try:
         pod_stat = None
         pod_stat = cli.create_namespaced_pod(body=body, namespace=namespace)
-        end_time = time.time() + timeout
-        while True:
+        if wait_for_pods_running(
+            [body["metadata"]["name"]],
+            namespace,
+            timeout
+        ):
             pod_stat = cli.read_namespaced_pod(
                 name=body["metadata"]["name"],
                 namespace=namespace
             )
-            if pod_stat.status.phase == "Running":
-                break
-            if time.time() > end_time:
-                raise Exception("Starting pod failed")
-            time.sleep(1)
+            raise Exception("Starting pod failed")
     except Exception as e:
         logging.error("Pod creation failed %s" % e)
         if pod_stat:
@@ -338,6 +955,48 @@ def delete_job(name, namespace="default"):
         sys.exit(1)
 
 
+def delete_jobs(label_selector, namespace="default"):
+    """
+    Deletes all the jobs matching the label selector, and their pods, with
+    a single delete collection request
+
+    Args:
+        label_selector (string)
+            - Label selector of the jobs to delete
+
+        namespace (string)
+            - Namespace of the jobs
+    """
+
+    try:
+        batch_cli.delete_collection_namespaced_job(
+            namespace,
+            label_selector=label_selector,
+            propagation_policy="Foreground",
+            grace_period_seconds=0
+        )
+        logging.debug(
+            "Jobs matching %s deleted in namespace %s" % (
+                label_selector,
+                namespace
+            )
+        )
+    except ApiException as api:
+        logging.warn(
+            "Exception when calling \
+                       BatchV1Api->delete_collection_namespaced_job: %s"
+            % api
+        )
+
+
+def list_jobs(label_selector, namespace="default"):
+    """Returns the V1JobList of the jobs matching the label selector"""
+    return batch_cli.list_namespaced_job(
+        namespace,
+        label_selector=label_selector
+    )
+
+
 def create_job(body, namespace="default"):
     try:
         api_response = batch_cli.create_namespaced_job(
@@ -377,68 +1036,211 @@ def get_job_status(name, namespace="default"):
         raise
 
 
-# Monitor the status of the cluster nodes and set the status to true or false
-def monitor_nodes():
-    nodes = list_nodes()
-    notready_nodes = []
-    node_kerneldeadlock_status = "False"
-    for node in nodes:
+def sweep_node_health(label_selector=None, consistent=False):
+    """
+    Computes the health of every node from a single list of the nodes,
+    served by the cluster cache when available. A node is unhealthy when
+    it is not Ready or reports a KernelDeadlock
+
+    Args:
+        label_selector (string)
+            - Only check the nodes matching the label selector
+
+        consistent (bool)
+            - Bypass the cluster cache and list the nodes from the API server
+
+    Returns:
+        Tuple of the overall status and the list of unhealthy node names
+    """
+
+    cache = get_cache("nodes", consistent)
+    if cache:
+        nodes = cache.nodes(label_selector)
+    else:
         try:
-            node_info = cli.read_node_status(node, pretty=True)
+            if label_selector:
+                ret = cli.list_node(label_selector=label_selector)
+            else:
+                ret = cli.list_node()
         except ApiException as e:
             logging.error(
-                "Exception when calling \
-                           CoreV1Api->read_node_status: %s\n"
-                % e
+                "Exception when calling CoreV1Api->list_node: %s\n" % e
             )
             raise e
-        for condition in node_info.status.conditions:
+        nodes = ret.items
+    notready_nodes = []
+    for node in nodes:
+        node_kerneldeadlock_status = "False"
+        node_ready_status = "Unknown"
+        for condition in node.status.conditions or []:
             if condition.type == "KernelDeadlock":
                 node_kerneldeadlock_status = condition.status
             elif condition.type == "Ready":
                 node_ready_status = condition.status
-            else:
-                continue
-        if node_kerneldeadlock_status != "False" or node_ready_status != "True":  # noqa  # noqa
-            notready_nodes.append(node)
-    if len(notready_nodes) != 0:
-        status = False
-    else:
-        status = True
-    return status, notready_nodes
+        if node_kerneldeadlock_status != "False" or node_ready_status != "True":  # noqa
+            notready_nodes.append(node.metadata.name)
+    return len(notready_nodes) == 0, notready_nodes
 
 
-# Monitor the status of the pods in the specified namespace
-# and set the status to true or false
-def monitor_namespace(namespace):
-    pods = list_pods(namespace)
-    notready_pods = []
-    for pod in pods:
+def sweep_pod_health(namespace=None, label_selector=None, consistent=False):
+    """
+    Computes the health of the pods of a namespace, or of the whole cluster,
+    from a single list of the pods, served by the cluster cache when
+    available. A pod is healthy when it is Running, Completed or Succeeded
+
+    Args:
+        namespace (string)
+            - Namespace to check, all the namespaces when not set
+
+        label_selector (string)
+            - Only check the pods matching the label selector
+
+        consistent (bool)
+            - Bypass the cluster cache and list the pods from the API server
+
+    Returns:
+        Tuple of the overall status and the unhealthy pods, as pod names
+        when a namespace is given or as [name, namespace] pairs otherwise
+    """
+
+    cache = get_cache("pods", consistent)
+    if cache:
+        pods = cache.pods(namespace, label_selector)
+    else:
         try:
-            pod_info = cli.read_namespaced_pod_status(
-                pod,
-                namespace,
-                pretty=True
-            )
+            if namespace:
+                ret = cli.list_namespaced_pod(
+                    namespace,
+                    label_selector=label_selector
+                )
+            else:
+                ret = cli.list_pod_for_all_namespaces(
+                    label_selector=label_selector
+                )
         except ApiException as e:
             logging.error(
                 "Exception when calling \
-                           CoreV1Api->read_namespaced_pod_status: %s\n"
+                           CoreV1Api->list_namespaced_pod: %s\n"
                 % e
             )
             raise e
-        pod_status = pod_info.status.phase
+        pods = ret.items
+    notready_pods = []
+    for pod in pods:
+        pod_status = pod.status.phase
         if (
             pod_status != "Running" and
             pod_status != "Completed" and
             pod_status != "Succeeded"
         ):
-            notready_pods.append(pod)
-    if len(notready_pods) != 0:
-        status = False
+            if namespace:
+                notready_pods.append(pod.metadata.name)
+            else:
+                notready_pods.append(
+                    [pod.metadata.name, pod.metadata.namespace]
+                )
+    return len(notready_pods) == 0, notready_pods
+
+
+def sweep_namespace_status(namespaces=None, consistent=False):
+    """
+    Computes the phase of the namespaces from a single list of the
+    namespaces, served by the cluster cache when available
+
+    Args:
+        namespaces (list)
+            - Names of the namespaces which must be Active, all the
+              namespaces when not set. A missing namespace is not Active
+
+        consistent (bool)
+            - Bypass the cluster cache and list the namespaces from the API
+              server
+
+    Returns:
+        Tuple of the overall status and the names of the namespaces which
+        are not Active
+    """
+
+    cache = get_cache("namespaces", consistent)
+    if cache:
+        items = cache.namespaces()
     else:
-        status = True
-    return status, notready_pods
+        try:
+            items = cli.list_namespace().items
+        except ApiException as e:
+            logging.error(
+                "Exception when calling CoreV1Api->list_namespace: %s\n" % e
+            )
+            raise e
+    phases = {
+        namespace.metadata.name:
+            namespace.status.phase if namespace.status else None
+        for namespace in items
+    }
+    if namespaces is None:
+        namespaces = list(phases)
+    not_active = [
+        namespace for namespace in namespaces
+        if phases.get(namespace) != "Active"
+    ]
+    return len(not_active) == 0, not_active
+
+
+def sweep_workload_availability(namespace=None):
+    """
+    Computes the availability of the deployments, statefulsets and
+    daemonsets of a namespace, or of the whole cluster. A workload is
+    available when all its desired replicas are available
+
+    Args:
+        namespace (string)
+            - Namespace to check, all the namespaces when not set
+
+    Returns:
+        Tuple of the overall status and the unavailable workloads as
+        <kind>/<namespace>/<name> strings
+    """
+
+    unavailable = []
+    for kind, replicas in WORKLOAD_REPLICAS:
+        try:
+            if namespace:
+                workloads = getattr(
+                    apps_cli,
+                    "list_namespaced_%s" % kind
+                )(namespace).items
+            else:
+                workloads = getattr(
+                    apps_cli,
+                    "list_%s_for_all_namespaces" % kind
+                )().items
+        except ApiException as e:
+            logging.error(
+                "Exception when calling AppsV1Api->list_%s: %s\n" % (kind, e)
+            )
+            raise e
+        for workload in workloads:
+            desired, available = replicas(workload)
+            if (available or 0) < (desired or 0):
+                unavailable.append(
+                    "%s/%s/%s" % (
+                        kind.replace("_", ""),
+                        workload.metadata.namespace,
+                        workload.metadata.name
+                    )
+                )
+    return len(unavailable) == 0, unavailable
+
+
+# Monitor the status of the cluster nodes and set the status to true or false
+def monitor_nodes():
+    return sweep_node_health()
+
+
+# Monitor the status of the pods in the specified namespace
+# and set the status to true or false
+def monitor_namespace(namespace):
+    return sweep_pod_health(namespace)
 
 
 # Monitor component namespace
@@ -496,52 +1298,57 @@ def get_pod_info(name: str, namespace: str = 'default') -> Pod:
     """
     pod_exists = check_if_pod_exists(name=name, namespace=namespace)
     if pod_exists:
-        response = cli.read_namespaced_pod(
+        response = read_projected(
+            cli.read_namespaced_pod,
+            POD_INFO_FIELDS,
             name=name,
-            namespace=namespace,
-            pretty='true'
+            namespace=namespace
         )
         container_list = []
 
         # Create a list of containers present in the pod
-        for container in response.spec.containers:
+        for container in response["containers"] or []:
             volume_mount_list = []
-            for volume_mount in container.volume_mounts:
+            for volume_mount in container.get("volumeMounts") or []:
                 volume_mount_list.append(
                     VolumeMount(
-                        name=volume_mount.name,
-                        mountPath=volume_mount.mount_path
+                        name=volume_mount["name"],
+                        mountPath=volume_mount["mountPath"]
                     )
                 )
             container_list.append(
                 Container(
-                    name=container.name,
-                    image=container.image,
+                    name=container["name"],
+                    image=container["image"],
                     volumeMounts=volume_mount_list
                 )
             )
 
-        for i, container in enumerate(response.status.container_statuses):
-            container_list[i].ready = container.ready
+        ready_containers = {
+            container["name"]: container["ready"]
+            for container in response["containerStatuses"] or []
+        }
+        for container in container_list:
+            container.ready = ready_containers.get(container.name, False)
 
         # Create a list of volumes associated with the pod
         volume_list = []
-        for volume in response.spec.volumes:
-            volume_name = volume.name
+        for volume in response["volumes"] or []:
+            volume_name = volume["name"]
             pvc_name = (
-                volume.persistent_volume_claim.claim_name
-                if volume.persistent_volume_claim is not None
+                volume["persistentVolumeClaim"]["claimName"]
+                if volume.get("persistentVolumeClaim") is not None
                 else None
             )
             volume_list.append(Volume(name=volume_name, pvcName=pvc_name))
 
         # Create the Pod data class object
         pod_info = Pod(
-            name=response.metadata.name,
-            podIP=response.status.pod_ip,
-            namespace=response.metadata.namespace,
+            name=response["name"],
+            podIP=response["podIP"],
+            namespace=response["namespace"],
             containers=container_list,
-            nodeName=response.spec.node_name,
+            nodeName=response["nodeName"],
             volumes=volume_list
         )
         return pod_info
@@ -647,7 +1454,13 @@ def check_if_namespace_exists(name: str) -> bool:
         Boolean value indicating whether the namespace exists or not
     """
 
-    v1_projects = dyn_client.resources.get(
+    cache = get_cache("namespaces")
+    if cache:
+        return any(
+            namespace.metadata.name == name
+            for namespace in cache.namespaces()
+        )
+    v1_projects = get_dynamic_client().resources.get(
         api_version='project.openshift.io/v1',
         kind='Project'
     )
@@ -679,10 +1492,79 @@ def check_if_pod_exists(name: str, namespace: str) -> bool:
     return False
 
 
-def check_if_pvc_exists(name: str, namespace: str) -> bool:
+def get_volume_index(namespace=None, consistent=False):
     """
-    Function that checks if a namespace exists by parsing through
-    the list of projects.
+    Returns the index from the persistent volume claims to the pods mounting
+    them and from the persistent volumes to their claims. The index of the
+    cluster cache is returned when it is synced, otherwise a new index is
+    built from one list of the claims and one list of the pods
+
+    Args:
+        namespace (string)
+            - Namespace to index when the cache is not used, all the
+              namespaces when not set
+
+        consistent (bool)
+            - Build the index from the API server even if the cache is
+              enabled
+
+    Returns:
+        VolumeIndex object
+    """
+
+    cache = get_cache("pods", consistent)
+    if cache and cache.synced("persistentvolumeclaims"):
+        return cache.volumes
+
+    index = VolumeIndex()
+    if namespace:
+        claims = list_projected(
+            cli.list_namespaced_persistent_volume_claim,
+            PVC_INFO_FIELDS,
+            namespace=namespace
+        )
+        pods = list_projected(
+            cli.list_namespaced_pod,
+            POD_VOLUMES_FIELDS,
+            namespace=namespace
+        )
+    else:
+        claims = list_projected(
+            cli.list_persistent_volume_claim_for_all_namespaces,
+            PVC_INFO_FIELDS
+        )
+        pods = list_projected(
+            cli.list_pod_for_all_namespaces,
+            POD_VOLUMES_FIELDS
+        )
+    for claim in claims:
+        index.set_claim(
+            claim["namespace"],
+            claim["name"],
+            claim["capacity"],
+            claim["volumeName"]
+        )
+    for pod in pods:
+        index.set_pod(
+            pod["namespace"],
+            pod["name"],
+            [
+                volume["persistentVolumeClaim"]["claimName"]
+                for volume in pod["volumes"] or []
+                if volume.get("persistentVolumeClaim") is not None
+            ]
+        )
+    return index
+
+
+def check_if_pvc_exists(
+    name: str,
+    namespace: str,
+    consistent: bool = False
+) -> bool:
+    """
+    Function that checks if a persistent volume claim exists in the
+    given namespace
     Args:
         name (string)
             - PVC name
@@ -690,24 +1572,34 @@ def check_if_pvc_exists(name: str, namespace: str) -> bool:
         namespace (string)
             - Namespace name
 
+        consistent (bool)
+            - Read from the API server even if the cache is enabled
+
     Returns:
         Boolean value indicating whether the Persistent Volume Claim
         exists or not.
     """
+    cache = get_cache("persistentvolumeclaims", consistent)
+    if cache:
+        return cache.volumes.claim(namespace, name) is not None
     namespace_exists = check_if_namespace_exists(namespace)
     if namespace_exists:
         response = cli.list_namespaced_persistent_volume_claim(
-            namespace=namespace
+            namespace=namespace,
+            field_selector="metadata.name=%s" % name
         )
-        pvc_list = [pvc.metadata.name for pvc in response.items]
-        if name in pvc_list:
+        if response.items:
             return True
     else:
         logging.error("Namespace '%s' doesn't exist" % str(namespace))
     return False
 
 
-def get_pvc_info(name: str, namespace: str) -> PVC:
+def get_pvc_info(
+    name: str,
+    namespace: str,
+    consistent: bool = False
+) -> PVC:
     """
     Function to retrieve information about a Persistent Volume Claim in a
     given namespace
@@ -719,43 +1611,18 @@ def get_pvc_info(name: str, namespace: str) -> PVC:
         namespace (string)
             - Namespace where the persistent volume claim is present
 
+        consistent (bool)
+            - Read from the API server even if the cache is enabled
+
     Returns:
         - A PVC data class containing the name, capacity, volume name,
           namespace and associated pod names of the PVC if the PVC exists
         - Returns None if the PVC doesn't exist
     """
 
-    pvc_exists = check_if_pvc_exists(name=name, namespace=namespace)
-    if pvc_exists:
-        pvc_info_response = cli.read_namespaced_persistent_volume_claim(
-            name=name,
-            namespace=namespace,
-            pretty=True
-        )
-        pod_list_response = cli.list_namespaced_pod(namespace=namespace)
-
-        capacity = pvc_info_response.status.capacity['storage']
-        volume_name = pvc_info_response.spec.volume_name
-
-        # Loop through all pods in the namespace to find associated PVCs
-        pvc_pod_list = []
-        for pod in pod_list_response.items:
-            for volume in pod.spec.volumes:
-                if (
-                    volume.persistent_volume_claim is not None
-                    and volume.persistent_volume_claim.claim_name == name
-                ):
-                    pvc_pod_list.append(pod.metadata.name)
-
-        pvc_info = PVC(
-            name=name,
-            capacity=capacity,
-            volumeName=volume_name,
-            podNames=pvc_pod_list,
-            namespace=namespace
-        )
-        return pvc_info
-    else:
+    index = get_volume_index(namespace, consistent)
+    claim = index.claim(namespace, name)
+    if claim is None:
         logging.error(
             "PVC '%s' doesn't exist in namespace '%s'" % (
                 str(name),
@@ -763,57 +1630,154 @@ def get_pvc_info(name: str, namespace: str) -> PVC:
             )
         )
         return None
+    return PVC(
+        name=name,
+        capacity=claim["capacity"],
+        volumeName=claim["volumeName"],
+        podNames=index.pods_for_claim(namespace, name),
+        namespace=namespace
+    )
+
+
+def get_pvc_for_volume(volume_name: str, consistent: bool = False) -> PVC:
+    """
+    Function to retrieve the Persistent Volume Claim bound to a
+    Persistent Volume
+
+    Args:
+        volume_name (string)
+            - Name of the persistent volume
+
+        consistent (bool)
+            - Read from the API server even if the cache is enabled
+
+    Returns:
+        - A PVC data class of the claim bound to the volume
+        - Returns None if the volume is not bound to any claim
+    """
+
+    index = get_volume_index(consistent=consistent)
+    bound = index.claim_for_volume(volume_name)
+    if bound is None:
+        return None
+    namespace, name = bound
+    claim = index.claim(namespace, name)
+    return PVC(
+        name=name,
+        capacity=claim["capacity"],
+        volumeName=claim["volumeName"],
+        podNames=index.pods_for_claim(namespace, name),
+        namespace=namespace
+    )
 
 
 # Find the node kraken is deployed on
 # Set global kraken node to not delete
-def find_kraken_node():
-    pods = get_all_pods()
-    kraken_pod_name = None
-    for pod in pods:
-        if "kraken-deployment" in pod[0]:
-            kraken_pod_name = pod[0]
-            kraken_project = pod[1]
-            break
-    # have to switch to proper project
+def find_kraken_node(label_selector="tool=Kraken"):
+    """
+    Finds the node Kraken is running on, so that it is never picked as a
+    chaos target. The node is resolved, in this order, from:
+        - the KRAKEN_NODE_NAME environment variable, set from spec.nodeName
+          with the downward API
+        - the pod Kraken runs in, named by the POD_NAME and POD_NAMESPACE
+          environment variables (or the hostname and the service account
+          namespace when running in a pod)
+        - the first pod matching the label selector
 
-    if kraken_pod_name:
-        # get kraken-deployment pod, find node name
-        try:
-            node_name = get_pod_info(kraken_pod_name, kraken_project).nodeName
-            global kraken_node_name
-            kraken_node_name = node_name
-        except Exception as e:
-            logging.info("%s" % (e))
-            sys.exit(1)
+    Args:
+        label_selector (string)
+            - Label selector of the Kraken pod, used as a fallback
+    """
+
+    global kraken_node_name
+    node_name = os.environ.get("KRAKEN_NODE_NAME")
+    try:
+        if not node_name:
+            node_name = _find_kraken_node_from_pod()
+        if not node_name and label_selector:
+            pods = list_projected(
+                cli.list_pod_for_all_namespaces,
+                {"nodeName": "spec.nodeName"},
+                label_selector=label_selector,
+                field_selector="status.phase=Running",
+                limit=1
+            )
+            if pods:
+                node_name = pods[0]["nodeName"]
+    except Exception as e:
+        logging.info("%s" % (e))
+        sys.exit(1)
+    if node_name:
+        logging.info("Kraken is running on node %s" % node_name)
+        kraken_node_name = node_name
+
+
+def _find_kraken_node_from_pod():
+    pod_name = os.environ.get("POD_NAME")
+    namespace = os.environ.get("POD_NAMESPACE")
+    if not namespace and os.path.isfile(SERVICE_ACCOUNT_NAMESPACE):
+        with open(SERVICE_ACCOUNT_NAMESPACE, "r") as f:
+            namespace = f.read().strip()
+        pod_name = pod_name or os.environ.get("HOSTNAME")
+    if not pod_name or not namespace:
+        return None
+    try:
+        pod = read_projected(
+            cli.read_namespaced_pod,
+            {"nodeName": "spec.nodeName"},
+            name=pod_name,
+            namespace=namespace
+        )
+    except ApiException as e:
+        if e.status == 404:
+            return None
+        raise e
+    return pod["nodeName"]
 
 
 # Watch for a specific node status
 def watch_node_status(node, status, timeout, resource_version):
-    count = timeout
-    for event in watch_resource.stream(
-        cli.list_node,
-        field_selector=f"metadata.name={node}",
-        timeout_seconds=timeout,
-        resource_version=f"{resource_version}"
-    ):
-        conditions = [
-            status
-            for status in event["object"].status.conditions
-            if status.type == "Ready"
-        ]
-        if conditions[0].status == status:
-            watch_resource.stop()
-            break
-        else:
-            count -= 1
-            logging.info(
-                "Status of node " + node + ": " + str(conditions[0].status)
-            )
-        if not count:
-            watch_resource.stop()
+    return watch_nodes_status([node], status, timeout, resource_version)
+
+
+def watch_nodes_status(nodes, status, timeout, resource_version=None):
+    """
+    Waits over a single watch until the Ready condition of all the nodes
+    reaches the status. Safe to call from several threads
+
+    Args:
+        nodes (list)
+            - Names of the nodes to wait for
+
+        status (string)
+            - Expected status of the Ready condition: "True", "False" or
+              "Unknown"
+
+        timeout (int)
+            - Number of seconds to wait for
+
+        resource_version (string)
+            - Only consider the changes after this resourceVersion
+
+    Returns:
+        Dictionary mapping each node to the time at which it reached the
+        status, None for the nodes which did not reach it in time
+    """
+
+    return node_status.wait_for_nodes_status(
+        cli,
+        nodes,
+        status,
+        timeout,
+        resource_version
+    )
 
 
 # Get the resource version for the specified node
 def get_node_resource_version(node):
     return cli.read_node(name=node).metadata.resource_version
+
+
+# Get the current resource version of the node list
+def get_node_list_resource_version():
+    return cli.list_node(limit=1).metadata.resource_version
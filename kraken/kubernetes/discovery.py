@@ -0,0 +1,52 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+
+from kubernetes import client
+from kubernetes.dynamic.client import DynamicClient
+
+
+# Directory of the API discovery documents cached between runs
+cache_dir = os.path.join(tempfile.gettempdir(), "kraken-discovery")
+# Number of seconds after which a cached discovery document is refreshed
+cache_ttl = 6 * 60 * 60
+
+
+def get_cache_file(api_client):
+    """
+    Returns the path of the discovery cache of the cluster. The path depends
+    on the server version, so upgrading the cluster invalidates the cache
+    """
+
+    version = client.VersionApi(api_client).get_code().git_version
+    key = "%s %s" % (api_client.configuration.host, version)
+    return os.path.join(
+        cache_dir,
+        "discovery-%s.json" % hashlib.sha256(key.encode("utf-8")).hexdigest()
+    )
+
+
+def create_dynamic_client(api_client):
+    """
+    Creates a DynamicClient whose discovery document is persisted on disk,
+    so API discovery runs at most once per cluster version and TTL
+
+    Args:
+        api_client (ApiClient)
+            - Client used for the discovery and the requests
+
+    Returns:
+        DynamicClient object
+    """
+
+    cache_file = get_cache_file(api_client)
+    if (
+        os.path.exists(cache_file)
+        and time.time() - os.path.getmtime(cache_file) > cache_ttl
+    ):
+        logging.debug("Discovery cache %s expired" % cache_file)
+        os.remove(cache_file)
+    os.makedirs(cache_dir, exist_ok=True)
+    return DynamicClient(api_client, cache_file=cache_file)
@@ -0,0 +1,248 @@
+import io
+import json
+import logging
+import re
+import ssl
+
+import certifi
+from kubernetes.client.rest import (ApiException, RESTClientObject,
+                                    RESTResponse)
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+# Size of the chunks read from streamed responses, e.g. watches
+CHUNK_SIZE = 65536
+
+
+def available():
+    """
+    Returns whether the HTTP/2 transport can be used, i.e. whether httpx is
+    installed with its HTTP/2 support
+    """
+
+    if httpx is None:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class Http2Response(io.IOBase):
+    """
+    Response of the HTTP/2 transport exposing the subset of the interface
+    of urllib3.HTTPResponse used by the kubernetes client: status, reason,
+    data, headers, read() and stream() for watches
+    """
+
+    def __init__(self, response):
+        self._response = response
+        self._chunks = response.iter_bytes(CHUNK_SIZE)
+        self._data = None
+        self.status = response.status_code
+        self.reason = response.reason_phrase
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = self.read()
+        return self._data
+
+    @property
+    def headers(self):
+        return self._response.headers
+
+    def getheaders(self):
+        return self._response.headers
+
+    def getheader(self, name, default=None):
+        return self._response.headers.get(name, default)
+
+    def read(self, amt=None, decode_content=None):
+        """
+        Reads the whole remaining body, or the next chunk of at most
+        CHUNK_SIZE bytes when amt is set
+        """
+
+        if amt is None:
+            return b"".join(self._chunks)
+        return next(self._chunks, b"")
+
+    def stream(self, amt=CHUNK_SIZE, decode_content=None):
+        while True:
+            chunk = self.read(amt or CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+    def close(self):
+        self._response.close()
+        super().close()
+
+    def release_conn(self):
+        self._response.close()
+
+
+def _ssl_context(configuration):
+    context = ssl.create_default_context(
+        cafile=configuration.ssl_ca_cert or certifi.where()
+    )
+    if configuration.cert_file:
+        context.load_cert_chain(
+            configuration.cert_file,
+            configuration.key_file
+        )
+    if not configuration.verify_ssl:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif configuration.assert_hostname is False:
+        context.check_hostname = False
+    return context
+
+
+def _timeout(request_timeout):
+    if isinstance(request_timeout, tuple) and len(request_timeout) == 2:
+        return httpx.Timeout(
+            None,
+            connect=request_timeout[0],
+            read=request_timeout[1]
+        )
+    if request_timeout:
+        return httpx.Timeout(request_timeout)
+    # Watches stay open for as long as the server keeps them
+    return httpx.Timeout(None)
+
+
+class Http2RESTClient(RESTClientObject):
+    """
+    Drop-in replacement of kubernetes.client.rest.RESTClientObject sending
+    the requests over HTTP/2 with httpx, the GET, POST... helpers of the
+    parent class all go through request(). Every request and watch of the
+    ApiClient is multiplexed as a stream over a single TLS connection to the
+    API server, instead of one connection per concurrent request
+
+    Args:
+        configuration (kubernetes.client.Configuration)
+            - Configuration of the ApiClient
+
+        maxsize (int)
+            - Maximum number of connections, only used when the API server
+              refuses new streams on the existing connection
+    """
+
+    def __init__(self, configuration, maxsize=None):
+        if not available():
+            raise Exception(
+                "The HTTP/2 transport requires httpx with HTTP/2 support, "
+                "install it with: pip install 'httpx[http2]'"
+            )
+        self.client = httpx.Client(
+            http2=True,
+            verify=_ssl_context(configuration),
+            proxy=configuration.proxy or None,
+            limits=httpx.Limits(
+                max_connections=maxsize,
+                max_keepalive_connections=maxsize
+            ),
+            timeout=httpx.Timeout(None),
+        )
+
+    def request(
+        self,
+        method,
+        url,
+        query_params=None,
+        headers=None,
+        body=None,
+        post_params=None,
+        _preload_content=True,
+        _request_timeout=None
+    ):
+        """Sends a request, see RESTClientObject.request"""
+
+        method = method.upper()
+        headers = dict(headers or {})
+        kwargs = {}
+        if "Content-Type" not in headers:
+            headers["Content-Type"] = "application/json"
+        content_type = headers["Content-Type"]
+        if method in ("GET", "HEAD"):
+            pass
+        elif (
+            re.search("json", content_type, re.IGNORECASE) or
+            content_type == "application/apply-patch+yaml"
+        ):
+            if (
+                content_type == "application/json-patch+json" and
+                not isinstance(body, list)
+            ):
+                headers["Content-Type"] = (
+                    "application/strategic-merge-patch+json"
+                )
+            if body is not None:
+                kwargs["content"] = json.dumps(body)
+        elif content_type == "application/x-www-form-urlencoded":
+            kwargs["data"] = dict(post_params or {})
+        elif content_type == "multipart/form-data":
+            # httpx generates the Content-Type with the boundary
+            del headers["Content-Type"]
+            kwargs["files"] = dict(post_params or {})
+        elif isinstance(body, (str, bytes)):
+            kwargs["content"] = body
+        else:
+            raise ApiException(
+                status=0,
+                reason="Cannot prepare a request message for provided "
+                       "arguments. Please check that your arguments match "
+                       "declared content type."
+            )
+
+        request = self.client.build_request(
+            method,
+            url,
+            params=query_params or None,
+            headers=headers,
+            timeout=_timeout(_request_timeout),
+            **kwargs
+        )
+        try:
+            response = self.client.send(request, stream=True)
+        except httpx.TransportError as e:
+            raise ApiException(
+                status=0,
+                reason="%s\n%s" % (type(e).__name__, e)
+            )
+        r = Http2Response(response)
+        if _preload_content:
+            r = RESTResponse(r)
+            r.data = r.data.decode("utf8")
+            response.close()
+        if not 200 <= r.status <= 299:
+            raise ApiException(http_resp=r)
+        return r
+
+    def close(self):
+        self.client.close()
+
+
+def install(api_client, maxsize=None):
+    """
+    Replaces the urllib3 REST client of the ApiClient with the HTTP/2
+    transport. Returns False, keeping urllib3, when httpx is not installed
+    """
+
+    if not available():
+        logging.error(
+            "The HTTP/2 transport requires httpx[http2], using HTTP/1.1"
+        )
+        return False
+    api_client.rest_client = Http2RESTClient(
+        api_client.configuration,
+        maxsize
+    )
+    return True
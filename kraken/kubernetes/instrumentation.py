@@ -0,0 +1,279 @@
+import contextvars
+import functools
+import json
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from kubernetes.client.rest import ApiException
+
+
+# Scenario of the API calls made outside of any scenario, e.g. by the
+# cluster cache
+DEFAULT_SCENARIO = "kraken"
+# Number of latency samples kept per scenario, verb and resource, the
+# percentiles of longer runs are computed on a uniform sample of the calls
+max_samples = 10000
+
+_stats = {}
+_lock = threading.Lock()
+# Scenario of the calls made by a thread, scenarios running in parallel set
+# it from their own thread. The coroutines run on the event loop of the
+# asyncio client inherit it from the thread which submitted them
+_scenario = contextvars.ContextVar("scenario", default=DEFAULT_SCENARIO)
+
+
+class CallStats:
+    """Latency, volume and status codes of the calls of one kind"""
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+        self.codes = {}
+        self.latencies = []
+
+    def add(self, latency, code):
+        self.count += 1
+        self.codes[code] = self.codes.get(code, 0) + 1
+        if len(self.latencies) < max_samples:
+            self.latencies.append(latency)
+        else:
+            index = random.randrange(self.count)  # nosec
+            if index < max_samples:
+                self.latencies[index] = latency
+
+
+def set_scenario(name):
+    """
+    Attributes the API calls made from now on by the calling thread to the
+    scenario. The worker threads started by the scenario do not inherit it,
+    the functions they run are wrapped with bind_scenario
+    """
+
+    _scenario.set(name)
+
+
+def get_scenario():
+    return _scenario.get()
+
+
+def bind_scenario(func):
+    """
+    Returns a function running func with the scenario of the calling
+    thread, to submit to the worker threads of a scenario so that their API
+    calls are attributed to it and not to the scenarios running in parallel
+    """
+
+    scenario = get_scenario()
+
+    @functools.wraps(func)
+    def bound(*args, **kwargs):
+        token = _scenario.set(scenario)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _scenario.reset(token)
+
+    return bound
+
+
+def parse_request(method, url, query_params=None):
+    """
+    Returns the verb and the resource of a request of the REST client, for
+    example ("LIST", "pods") for GET /api/v1/namespaces/default/pods or
+    ("POST", "pods/exec") for an exec in a pod
+    """
+
+    segments = [s for s in urlparse(url).path.split("/") if s]
+    if segments[:1] == ["api"]:
+        segments = segments[2:]
+    elif segments[:1] == ["apis"]:
+        segments = segments[3:]
+    else:
+        return method, "/".join(segments) or "/"
+    if len(segments) >= 3 and segments[0] == "namespaces":
+        segments = segments[2:]
+    if not segments:
+        return method, "/"
+    resource = segments[0]
+    if len(segments) >= 3:
+        resource = "%s/%s" % (resource, segments[2])
+    verb = method
+    if method == "GET":
+        params = dict(query_params or [])
+        if str(params.get("watch", "")).lower() == "true":
+            verb = "WATCH"
+        elif len(segments) == 1:
+            verb = "LIST"
+    return verb, resource
+
+
+def _record(key, latency, code):
+    with _lock:
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _stats[key] = CallStats()
+        stats.add(latency, code)
+        return stats
+
+
+def _count_bytes(stats, length):
+    with _lock:
+        stats.bytes += length
+
+
+def _count_streamed_bytes(response, stats):
+    # Responses which are not preloaded are read later by the caller, count
+    # the bytes as they are read
+    read = response.read
+
+    def counting_read(*args, **kwargs):
+        data = read(*args, **kwargs)
+        if data:
+            _count_bytes(stats, len(data))
+        return data
+
+    response.read = counting_read
+    read_chunked = getattr(response, "read_chunked", None)
+    if read_chunked is None:
+        return
+
+    def counting_read_chunked(*args, **kwargs):
+        for chunk in read_chunked(*args, **kwargs):
+            if chunk:
+                _count_bytes(stats, len(chunk))
+            yield chunk
+
+    response.read_chunked = counting_read_chunked
+
+
+def wrap(request):
+    """Returns the request function of a RESTClientObject instrumented"""
+
+    def instrumented_request(method, url, query_params=None, *args, **kwargs):
+        verb, resource = parse_request(method, url, query_params)
+        key = (get_scenario(), verb, resource)
+        start = time.time()
+        try:
+            response = request(method, url, query_params, *args, **kwargs)
+        except ApiException as e:
+            _record(key, time.time() - start, e.status)
+            raise e
+        stats = _record(key, time.time() - start, response.status)
+        if kwargs.get("_preload_content", True):
+            _count_bytes(stats, len(response.data or b""))
+        else:
+            _count_streamed_bytes(response, stats)
+        return response
+
+    return instrumented_request
+
+
+def wrap_async(request, api_exception=ApiException):
+    """
+    Returns the request coroutine function of an asyncio RESTClientObject
+    instrumented. The bytes of streamed responses (watches) are not counted
+    """
+
+    async def instrumented_request(
+        method,
+        url,
+        query_params=None,
+        *args,
+        **kwargs
+    ):
+        verb, resource = parse_request(method, url, query_params)
+        key = (get_scenario(), verb, resource)
+        start = time.time()
+        try:
+            response = await request(
+                method,
+                url,
+                query_params,
+                *args,
+                **kwargs
+            )
+        except api_exception as e:
+            _record(key, time.time() - start, e.status)
+            raise e
+        stats = _record(key, time.time() - start, response.status)
+        if kwargs.get("_preload_content", True):
+            _count_bytes(stats, len(response.data or b""))
+        return response
+
+    return instrumented_request
+
+
+def install(rest_client):
+    """Records every request of the RESTClientObject"""
+    rest_client.request = wrap(rest_client.request)
+
+
+def install_async(rest_client, api_exception=ApiException):
+    """Records every request of the asyncio RESTClientObject"""
+    rest_client.request = wrap_async(rest_client.request, api_exception)
+
+
+def _percentile(latencies, percentile):
+    if not latencies:
+        return 0
+    index = max(0, int(round(percentile / 100.0 * len(latencies))) - 1)
+    return latencies[min(index, len(latencies) - 1)]
+
+
+def summary():
+    """
+    Returns the API calls per scenario
+
+    Returns:
+        Dictionary mapping each scenario to a list of dictionaries with the
+        verb, resource, count, p50 and p99 latency in seconds, bytes read and
+        count per status code of the calls
+    """
+
+    summaries = {}
+    with _lock:
+        for (scenario, verb, resource), stats in sorted(_stats.items()):
+            latencies = sorted(stats.latencies)
+            summaries.setdefault(scenario, []).append({
+                "verb": verb,
+                "resource": resource,
+                "count": stats.count,
+                "p50": round(_percentile(latencies, 50), 4),
+                "p99": round(_percentile(latencies, 99), 4),
+                "bytes": stats.bytes,
+                "codes": {
+                    str(code): count for code, count in stats.codes.items()
+                },
+            })
+    return summaries
+
+
+def log_summary():
+    for scenario, calls in summary().items():
+        logging.info("Kubernetes API calls of %s:" % scenario)
+        logging.info(
+            "%-8s %-36s %8s %10s %10s %12s" % (
+                "verb", "resource", "count", "p50 (s)", "p99 (s)", "bytes"
+            )
+        )
+        for call in calls:
+            logging.info(
+                "%-8s %-36s %8s %10.4f %10.4f %12s" % (
+                    call["verb"],
+                    call["resource"],
+                    call["count"],
+                    call["p50"],
+                    call["p99"],
+                    call["bytes"],
+                )
+            )
+
+
+def write_summary(path):
+    """Writes the API calls per scenario to a JSON file"""
+    with open(path, "w") as f:
+        json.dump(summary(), f, indent=4)
+    logging.info("Kubernetes API call summary written to %s" % path)
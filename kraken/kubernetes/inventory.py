@@ -0,0 +1,247 @@
+import re
+
+import numpy as np
+
+from ..kubernetes.cache import parse_label_selector
+
+
+ZONE_LABELS = (
+    "topology.kubernetes.io/zone",
+    "failure-domain.beta.kubernetes.io/zone",
+)
+
+_COLUMNS = ("name", "namespace", "phase", "node", "zone")
+
+
+def get_zone(labels):
+    """Returns the zone of a node from its topology labels"""
+    for label in ZONE_LABELS:
+        if labels and label in labels:
+            return labels[label]
+    return None
+
+
+class Inventory:
+    """
+    Column oriented inventory of pods or nodes. Strings are interned once
+    and every column is stored as a NumPy array of string codes, labels as
+    sparse (row, value) arrays per label key, so selecting and sampling
+    targets among hundreds of thousands of objects is a few vectorized
+    operations instead of a Python loop over the API objects
+
+    Example:
+        inventory = Inventory()
+        for pod in pods:
+            inventory.add(pod.metadata.name, pod.metadata.namespace, ...)
+        mask = inventory.select(
+            label_selector="app=etcd",
+            namespace_pattern="^openshift-etcd$",
+            phase="Running"
+        )
+        targets = inventory.rows(inventory.sample(mask, 2))
+    """
+
+    def __init__(self):
+        self._codes = {}
+        self._strings = []
+        self._lists = {column: [] for column in _COLUMNS}
+        self._ready = []
+        self._label_lists = {}
+        self.uids = []
+        self._arrays = None
+
+    def __len__(self):
+        return len(self.uids)
+
+    def _intern(self, value):
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._strings)
+            self._codes[value] = code
+            self._strings.append(value)
+        return code
+
+    def add(
+        self,
+        name,
+        namespace=None,
+        labels=None,
+        phase=None,
+        node=None,
+        zone=None,
+        ready=None,
+        uid=None
+    ):
+        """Appends an object to the inventory"""
+
+        row = len(self.uids)
+        for column, value in (
+            ("name", name),
+            ("namespace", namespace),
+            ("phase", phase),
+            ("node", node),
+            ("zone", zone),
+        ):
+            self._lists[column].append(self._intern(value))
+        self._ready.append(-1 if ready is None else int(bool(ready)))
+        for key, value in (labels or {}).items():
+            rows, values = self._label_lists.setdefault(
+                self._intern(key), ([], [])
+            )
+            rows.append(row)
+            values.append(self._intern(value))
+        self.uids.append(uid)
+        self._arrays = None
+
+    def _columns(self):
+        if self._arrays is None:
+            arrays = {
+                column: np.array(values, dtype=np.int32)
+                for column, values in self._lists.items()
+            }
+            arrays["ready"] = np.array(self._ready, dtype=np.int8)
+            arrays["labels"] = {
+                key: (
+                    np.array(rows, dtype=np.int32),
+                    np.array(values, dtype=np.int32)
+                )
+                for key, (rows, values) in self._label_lists.items()
+            }
+            self._arrays = arrays
+        return self._arrays
+
+    def _lookup(self, values):
+        if isinstance(values, str):
+            values = [values]
+        return np.array(
+            [self._codes[v] for v in values if v in self._codes],
+            dtype=np.int32
+        )
+
+    def _match(self, column, pattern):
+        # The pattern is matched once per distinct value of the column
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+        values = self._columns()[column]
+        codes = np.unique(values[values >= 0])
+        matched = np.array(
+            [code for code in codes if pattern.match(self._strings[code])],
+            dtype=np.int32
+        )
+        return np.isin(values, matched)
+
+    def _label_mask(self, label_selector):
+        n = len(self)
+        mask = np.ones(n, dtype=bool)
+        labels = self._columns()["labels"]
+        for key, operator, values in parse_label_selector(label_selector):
+            rows, value_codes = labels.get(
+                self._codes.get(key, -1),
+                (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32))
+            )
+            has_key = np.zeros(n, dtype=bool)
+            has_key[rows] = True
+            if operator == "exists":
+                mask &= has_key
+            elif operator == "!exists":
+                mask &= ~has_key
+            else:
+                has_value = np.zeros(n, dtype=bool)
+                has_value[rows[np.isin(value_codes, self._lookup(values))]] = (
+                    True
+                )
+                if operator in ("=", "in"):
+                    mask &= has_value
+                else:
+                    mask &= ~has_value
+        return mask
+
+    def select(
+        self,
+        label_selector=None,
+        name_pattern=None,
+        namespace_pattern=None,
+        phase=None,
+        node=None,
+        zone=None,
+        ready=None,
+        names=None,
+        exclude_names=None
+    ):
+        """
+        Returns a boolean mask of the objects matching every given criteria
+
+        Args:
+            label_selector (string)
+                - Kubernetes label selector
+
+            name_pattern, namespace_pattern (string or re.Pattern)
+                - Regular expressions matched at the start of the name and
+                  the namespace
+
+            phase, node, zone (string or list)
+                - Accepted pod phases, node names and zones
+
+            ready (bool)
+                - Only keep the objects whose readiness is known and equal
+
+            names, exclude_names (list)
+                - Exact names to keep or to exclude
+        """
+
+        columns = self._columns()
+        mask = np.ones(len(self), dtype=bool)
+        if label_selector:
+            mask &= self._label_mask(label_selector)
+        if name_pattern is not None:
+            mask &= self._match("name", name_pattern)
+        if namespace_pattern is not None:
+            mask &= self._match("namespace", namespace_pattern)
+        for column, values in (
+            ("phase", phase),
+            ("node", node),
+            ("zone", zone),
+            ("name", names),
+        ):
+            if values is not None:
+                mask &= np.isin(columns[column], self._lookup(values))
+        if exclude_names:
+            mask &= ~np.isin(columns["name"], self._lookup(exclude_names))
+        if ready is not None:
+            mask &= columns["ready"] == int(bool(ready))
+        return mask
+
+    def sample(self, mask, count, rng=None):
+        """
+        Returns the indices of count objects picked uniformly at random among
+        the selected ones, or all of them in random order if fewer are
+        selected
+        """
+
+        rng = rng or np.random.default_rng()
+        indices = np.flatnonzero(mask)
+        if count >= len(indices):
+            return rng.permutation(indices)
+        return rng.choice(indices, size=count, replace=False)
+
+    def names(self, indices):
+        names = self._columns()["name"][indices]
+        return [self._strings[code] for code in names]
+
+    def rows(self, indices):
+        """Returns one dictionary per index with the columns of the object"""
+        columns = self._columns()
+        rows = []
+        for index in np.asarray(indices).tolist():
+            row = {
+                column: (
+                    self._strings[columns[column][index]]
+                    if columns[column][index] >= 0 else None
+                )
+                for column in _COLUMNS
+            }
+            row["uid"] = self.uids[index]
+            rows.append(row)
+        return rows
@@ -0,0 +1,16 @@
+import uuid
+
+
+# Label set on the objects created or targeted by a scenario, so that they
+# can be listed, watched and deleted in bulk with a single label selector
+RUN_LABEL = "kraken-run"
+
+
+def new_run_id():
+    """Returns a new value of the run label, unique to a scenario run"""
+    return uuid.uuid4().hex[:16]
+
+
+def run_selector(run_id):
+    """Returns the label selector of the objects of a scenario run"""
+    return "%s=%s" % (RUN_LABEL, run_id)
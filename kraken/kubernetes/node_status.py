@@ -0,0 +1,118 @@
+import logging
+import time
+
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+
+def get_ready_status(node):
+    """
+    Returns the status of the Ready condition of a V1Node: "True", "False"
+    or "Unknown", or None when the node does not report it yet
+    """
+
+    for condition in (node.status and node.status.conditions) or []:
+        if condition.type == "Ready":
+            return condition.status
+    return None
+
+
+def wait_for_nodes_status(
+    core_v1,
+    nodes,
+    status,
+    timeout,
+    resource_version=None
+):
+    """
+    Waits until the Ready condition of every node reaches the status, using
+    a single watch stream on the nodes. Every call uses its own watch, so
+    several threads can wait for different nodes at the same time
+
+    Args:
+        core_v1 (CoreV1Api)
+            - Client used to list and watch the nodes
+
+        nodes (list)
+            - Names of the nodes to wait for
+
+        status (string)
+            - Expected status of the Ready condition: "True", "False" or
+              "Unknown"
+
+        timeout (int)
+            - Number of seconds to wait for
+
+        resource_version (string)
+            - Start the watch from this resourceVersion and only consider
+              the changes after it. When not set, the current state of the
+              nodes is listed first and nodes which already have the status
+              are done right away
+
+    Returns:
+        Dictionary mapping each node to the time (as returned by time.time())
+        at which its Ready condition reached the status, or None for the
+        nodes which did not reach it before the timeout
+    """
+
+    transitions = {node: None for node in nodes}
+    pending = set(transitions)
+    if not pending:
+        return transitions
+    field_selector = None
+    if len(pending) == 1:
+        field_selector = "metadata.name=%s" % next(iter(pending))
+    start_time = time.time()
+    end_time = start_time + timeout
+    last_status = {}
+
+    def observe(node):
+        name = node.metadata.name
+        if name not in pending:
+            return
+        node_status = get_ready_status(node)
+        now = time.time()
+        if last_status.get(name) != node_status:
+            last_status[name] = node_status
+            logging.info(
+                "Status of node %s: %s (after %.1fs)"
+                % (name, node_status, now - start_time)
+            )
+        if node_status == status:
+            transitions[name] = now
+            pending.discard(name)
+
+    node_watch = watch.Watch()
+    while pending and time.time() < end_time:
+        if resource_version is None:
+            ret = core_v1.list_node(field_selector=field_selector)
+            for node in ret.items:
+                observe(node)
+            resource_version = ret.metadata.resource_version
+            continue
+        try:
+            for event in node_watch.stream(
+                core_v1.list_node,
+                field_selector=field_selector,
+                resource_version=resource_version,
+                timeout_seconds=max(1, int(end_time - time.time()))
+            ):
+                if event["type"] != "DELETED":
+                    observe(event["object"])
+                if not pending:
+                    node_watch.stop()
+                    break
+            resource_version = (
+                node_watch.resource_version or resource_version
+            )
+        except ApiException as e:
+            if e.status != 410:
+                raise e
+            # The resourceVersion expired, relist the nodes still pending
+            resource_version = None
+    for name in pending:
+        logging.error(
+            "Node %s did not reach the Ready status %s in %s seconds"
+            % (name, status, timeout)
+        )
+    return transitions
@@ -0,0 +1,105 @@
+import time
+
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+
+def wait_for_pods(
+    core_v1,
+    keys,
+    is_done,
+    timeout,
+    namespace=None,
+    label_selector=None,
+    key="name"
+):
+    """
+    Waits until a condition holds for every pod of a batch, using a single
+    watch stream. The current state of the pods is listed first, then the
+    watch starts from the resourceVersion of that list so no event is
+    missed. When the resourceVersion expires, the pods still pending are
+    listed again. Every call uses its own watch, so several threads can wait
+    for different pods at the same time
+
+    Args:
+        core_v1 (CoreV1Api)
+            - Client used to list and watch the pods
+
+        keys (list)
+            - Names or UIDs of the pods to wait for
+
+        is_done (function)
+            - Called with the event type (ADDED, MODIFIED or DELETED) and the
+              V1Pod, or with DELETED and None for the pods absent from a
+              list. Returns True once the pod reached the expected state
+
+        timeout (int)
+            - Number of seconds to wait for
+
+        namespace (string)
+            - Namespace of the pods, all the namespaces when not set
+
+        label_selector (string)
+            - Only list and watch the pods with these labels
+
+        key (string)
+            - Metadata field the keys are matched on: name or uid
+
+    Returns:
+        Set of the keys of the pods that did not reach the expected state
+        before the timeout
+    """
+
+    pending = set(keys)
+    if not pending:
+        return pending
+    kwargs = {}
+    if label_selector:
+        kwargs["label_selector"] = label_selector
+    if key == "name" and len(pending) == 1:
+        kwargs["field_selector"] = "metadata.name=%s" % next(iter(pending))
+    if namespace:
+        list_func = core_v1.list_namespaced_pod
+        args = (namespace,)
+    else:
+        list_func = core_v1.list_pod_for_all_namespaces
+        args = ()
+    end_time = time.time() + timeout
+    resource_version = None
+    pod_watch = watch.Watch()
+    while pending and time.time() < end_time:
+        if resource_version is None:
+            ret = list_func(*args, **kwargs)
+            listed = {
+                getattr(pod.metadata, key): pod for pod in ret.items
+            }
+            for pod_key in list(pending):
+                pod = listed.get(pod_key)
+                if is_done("ADDED" if pod else "DELETED", pod):
+                    pending.discard(pod_key)
+            resource_version = ret.metadata.resource_version
+            continue
+        try:
+            for event in pod_watch.stream(
+                list_func,
+                *args,
+                resource_version=resource_version,
+                timeout_seconds=max(1, int(end_time - time.time())),
+                **kwargs
+            ):
+                pod = event["object"]
+                pod_key = getattr(pod.metadata, key)
+                if pod_key in pending and is_done(event["type"], pod):
+                    pending.discard(pod_key)
+                if not pending:
+                    pod_watch.stop()
+                    break
+            resource_version = (
+                pod_watch.resource_version or resource_version
+            )
+        except ApiException as e:
+            if e.status != 410:
+                raise e
+            # The resourceVersion expired, relist the pods still pending
+            resource_version = None
+    return pending
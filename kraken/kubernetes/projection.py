@@ -0,0 +1,81 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    """Parses a JSON document, using orjson when it is installed"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def get_path(obj, path):
+    """
+    Returns the value at the dotted path of a parsed JSON object, for
+    example "status.capacity.storage", or None if any part is missing
+    """
+
+    for key in path.split("."):
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+        if obj is None:
+            return None
+    return obj
+
+
+def project(obj, fields):
+    """
+    Projects a parsed JSON object on the declared fields
+
+    Args:
+        obj (dict)
+            - Parsed JSON object
+
+        fields (dict)
+            - Mapping between the name of each projected field and its
+              dotted path in the object
+
+    Returns:
+        Dictionary with one entry per declared field
+    """
+
+    return {name: get_path(obj, path) for name, path in fields.items()}
+
+
+def read_projected(api_func, fields, *args, **kwargs):
+    """
+    Calls a read function of the kubernetes client without deserializing
+    the response into OpenAPI models and projects the object on the fields
+
+    Example:
+        read_projected(
+            cli.read_namespaced_pod,
+            {"name": "metadata.name", "nodeName": "spec.nodeName"},
+            name="etcd-0",
+            namespace="openshift-etcd"
+        )
+    """
+
+    response = api_func(*args, _preload_content=False, **kwargs)
+    return project(loads(response.data), fields)
+
+
+def list_projected(api_func, fields, *args, **kwargs):
+    """
+    Calls a list function of the kubernetes client without deserializing
+    the response into OpenAPI models and projects every item on the fields
+
+    Returns:
+        List of dictionaries, one per item
+    """
+
+    response = api_func(*args, _preload_content=False, **kwargs)
+    return [
+        project(item, fields)
+        for item in loads(response.data).get("items") or []
+    ]
@@ -0,0 +1,257 @@
+import struct
+
+from ..kubernetes.resources import ObjectMetadata, OwnerReference
+
+
+# Every protobuf encoded object sent by the API server is wrapped in a
+# runtime.Unknown message prefixed with this magic number
+MAGIC = b"k8s\x00"
+
+PROTOBUF = "application/vnd.kubernetes.protobuf"
+PROTOBUF_PARTIAL_OBJECT_METADATA_LIST = (
+    PROTOBUF + ";as=PartialObjectMetadataList;g=meta.k8s.io;v=v1"
+)
+PROTOBUF_PARTIAL_OBJECT_METADATA = (
+    PROTOBUF + ";as=PartialObjectMetadata;g=meta.k8s.io;v=v1"
+)
+
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LENGTH_DELIMITED = 2
+WIRE_FIXED32 = 5
+
+# Field numbers from k8s.io/apimachinery/pkg/apis/meta/v1/generated.proto
+# and k8s.io/apimachinery/pkg/runtime/generated.proto. Only the fields read
+# by Kraken are listed, everything else is skipped.
+UNKNOWN_RAW = 2
+LIST_METADATA = 1
+LIST_ITEMS = 2
+LIST_META_RESOURCE_VERSION = 2
+LIST_META_CONTINUE = 3
+OBJECT_METADATA = 1
+OBJECT_META_NAME = 1
+OBJECT_META_NAMESPACE = 3
+OBJECT_META_RESOURCE_VERSION = 6
+OBJECT_META_LABELS = 11
+OBJECT_META_OWNER_REFERENCES = 13
+MAP_ENTRY_KEY = 1
+MAP_ENTRY_VALUE = 2
+OWNER_REFERENCE_KIND = 1
+OWNER_REFERENCE_NAME = 3
+OWNER_REFERENCE_UID = 4
+OWNER_REFERENCE_CONTROLLER = 6
+STATUS_MESSAGE = 3
+STATUS_CODE = 6
+WATCH_EVENT_TYPE = 1
+WATCH_EVENT_OBJECT = 2
+RAW_EXTENSION_RAW = 1
+
+
+def _read_varint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def iter_fields(data):
+    """
+    Generator over the fields of a protobuf message
+
+    Yields:
+        Tuples of the field number and its value: an int for varint fields,
+        a memoryview for length-delimited fields. Fixed size fields are
+        skipped
+    """
+
+    data = memoryview(data)
+    pos = 0
+    end = len(data)
+    while pos < end:
+        key, pos = _read_varint(data, pos)
+        field_number = key >> 3
+        wire_type = key & 0x7
+        if wire_type == WIRE_VARINT:
+            value, pos = _read_varint(data, pos)
+            yield field_number, value
+        elif wire_type == WIRE_LENGTH_DELIMITED:
+            length, pos = _read_varint(data, pos)
+            yield field_number, data[pos:pos + length]
+            pos += length
+        elif wire_type == WIRE_FIXED64:
+            pos += 8
+        elif wire_type == WIRE_FIXED32:
+            pos += 4
+        else:
+            raise Exception(
+                "Unsupported protobuf wire type %s" % wire_type
+            )
+
+
+def unwrap(data):
+    """
+    Strips the magic number and the runtime.Unknown envelope and returns
+    the raw bytes of the wrapped object. Data without the magic number is
+    returned as is
+    """
+
+    data = memoryview(data)
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        return data
+    for field_number, value in iter_fields(data[len(MAGIC):]):
+        if field_number == UNKNOWN_RAW:
+            return value
+    return memoryview(b"")
+
+
+def _string(value):
+    return bytes(value).decode("utf-8")
+
+
+def decode_object_meta(data):
+    """Decodes an ObjectMeta message into an ObjectMetadata data class"""
+
+    name = None
+    namespace = None
+    resource_version = None
+    labels = {}
+    owner_references = []
+    for field_number, value in iter_fields(data):
+        if field_number == OBJECT_META_NAME:
+            name = _string(value)
+        elif field_number == OBJECT_META_NAMESPACE:
+            namespace = _string(value)
+        elif field_number == OBJECT_META_RESOURCE_VERSION:
+            resource_version = _string(value)
+        elif field_number == OBJECT_META_LABELS:
+            key = ""
+            label_value = ""
+            for entry_field, entry_value in iter_fields(value):
+                if entry_field == MAP_ENTRY_KEY:
+                    key = _string(entry_value)
+                elif entry_field == MAP_ENTRY_VALUE:
+                    label_value = _string(entry_value)
+            labels[key] = label_value
+        elif field_number == OBJECT_META_OWNER_REFERENCES:
+            owner = {"kind": None, "name": None, "uid": None}
+            controller = False
+            for owner_field, owner_value in iter_fields(value):
+                if owner_field == OWNER_REFERENCE_KIND:
+                    owner["kind"] = _string(owner_value)
+                elif owner_field == OWNER_REFERENCE_NAME:
+                    owner["name"] = _string(owner_value)
+                elif owner_field == OWNER_REFERENCE_UID:
+                    owner["uid"] = _string(owner_value)
+                elif owner_field == OWNER_REFERENCE_CONTROLLER:
+                    controller = bool(owner_value)
+            owner_references.append(
+                OwnerReference(controller=controller, **owner)
+            )
+    return ObjectMetadata(
+        name=name,
+        namespace=namespace,
+        labels=labels,
+        ownerReferences=owner_references,
+        resourceVersion=resource_version
+    )
+
+
+def decode_object_metadata(data):
+    """
+    Decodes the metadata of any Kubernetes object (Pod, Node,
+    PartialObjectMetadata, ...), all of which store their ObjectMeta in
+    field 1
+    """
+
+    for field_number, value in iter_fields(data):
+        if field_number == OBJECT_METADATA:
+            return decode_object_meta(value)
+    return decode_object_meta(b"")
+
+
+def decode_list_metadata(data):
+    """
+    Decodes a protobuf encoded list (PodList, NodeList,
+    PartialObjectMetadataList, ...) as returned by the API server
+
+    Returns:
+        Tuple of the list of ObjectMetadata of the items, the
+        resourceVersion of the list and its continue token
+    """
+
+    items = []
+    resource_version = None
+    _continue = None
+    for field_number, value in iter_fields(unwrap(data)):
+        if field_number == LIST_METADATA:
+            for list_field, list_value in iter_fields(value):
+                if list_field == LIST_META_RESOURCE_VERSION:
+                    resource_version = _string(list_value)
+                elif list_field == LIST_META_CONTINUE:
+                    _continue = _string(list_value)
+        elif field_number == LIST_ITEMS:
+            items.append(decode_object_metadata(value))
+    return items, resource_version, _continue
+
+
+def decode_watch_event(data):
+    """
+    Decodes a protobuf encoded WatchEvent frame
+
+    Returns:
+        Tuple of the event type and the raw bytes of the object
+    """
+
+    event_type = None
+    raw_object = memoryview(b"")
+    for field_number, value in iter_fields(unwrap(data)):
+        if field_number == WATCH_EVENT_TYPE:
+            event_type = _string(value)
+        elif field_number == WATCH_EVENT_OBJECT:
+            for raw_field, raw_value in iter_fields(value):
+                if raw_field == RAW_EXTENSION_RAW:
+                    raw_object = unwrap(raw_value)
+    return event_type, raw_object
+
+
+def decode_status(data):
+    """
+    Decodes a Status message, as sent in ERROR watch events
+
+    Returns:
+        Tuple of the status code and message
+    """
+
+    code = None
+    message = ""
+    for field_number, value in iter_fields(unwrap(data)):
+        if field_number == STATUS_CODE:
+            code = value
+        elif field_number == STATUS_MESSAGE:
+            message = _string(value)
+    return code, message
+
+
+def iter_frames(response):
+    """
+    Generator over the length-delimited frames of a protobuf watch stream:
+    each frame is prefixed with its length as a 4 bytes big-endian integer
+    """
+
+    while True:
+        header = response.read(4)
+        if not header or len(header) < 4:
+            return
+        (length,) = struct.unpack(">I", header)
+        frame = b""
+        while len(frame) < length:
+            chunk = response.read(length - len(frame))
+            if not chunk:
+                return
+            frame += chunk
+        yield frame
@@ -0,0 +1,214 @@
+import logging
+import os
+import socket
+import threading
+
+from kubernetes import client, config
+from urllib3.connection import HTTPConnection
+
+from ..kubernetes import http2, instrumentation, throttle
+
+
+# Size of the urllib3 connection pool of every client, i.e. how many
+# connections to the API server can be kept open and reused in parallel
+pool_maxsize = 20
+# Enable TCP keep-alive probes on the pooled connections, so idle
+# connections survive long scenarios instead of being silently dropped
+keep_alive = True
+# Requests per second allowed by the client side rate limiter shared by all
+# the clients, and the number of requests which can be sent in a burst.
+# A qps of 0 disables the rate limiter
+qps = 50
+burst = 100
+# HTTP version used to talk to the API server, "http1" (urllib3) or "http2"
+# (httpx, multiplexing every request and watch over a single connection)
+transport = "http1"
+# Maximum number of requests in flight at the same time on the event loop of
+# the asyncio clients, see kraken.kubernetes.async_client
+max_in_flight = 200
+
+_clients = {}
+_governor = None
+_lock = threading.Lock()
+_exec_local = threading.local()
+
+
+class SharedApiClient(client.ApiClient):
+    """
+    ApiClient shared by every module of the run. Leaving a with block does
+    not close it, the registry closes the clients at the end of the run
+    """
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def close(self):
+        pass
+
+    def shutdown(self):
+        super().close()
+        if isinstance(self.rest_client, http2.Http2RESTClient):
+            self.rest_client.close()
+        else:
+            self.rest_client.pool_manager.clear()
+
+
+def configure(
+    maxsize=None,
+    tcp_keep_alive=None,
+    max_qps=None,
+    max_burst=None,
+    http_transport=None,
+    max_async_requests=None
+):
+    """
+    Sets the connection pool size, TCP keep-alive, rate limits and HTTP
+    transport of the clients created from now on, and the number of requests
+    in flight of the asyncio clients
+    """
+
+    global pool_maxsize
+    global keep_alive
+    global qps
+    global burst
+    global transport
+    global max_in_flight
+    global _governor
+    if maxsize is not None:
+        pool_maxsize = int(maxsize)
+    if tcp_keep_alive is not None:
+        keep_alive = bool(tcp_keep_alive)
+    if max_qps is not None:
+        qps = float(max_qps)
+    if max_burst is not None:
+        burst = int(max_burst)
+    if http_transport is not None:
+        if http_transport not in ("http1", "http2"):
+            logging.error(
+                "Unsupported HTTP transport %s, using http1" % http_transport
+            )
+            http_transport = "http1"
+        transport = http_transport
+    if max_async_requests is not None:
+        max_in_flight = int(max_async_requests)
+    if max_qps is not None or max_burst is not None:
+        _governor = None
+
+
+def get_governor():
+    """Returns the rate limiter shared by every client of the registry"""
+
+    global _governor
+    if _governor is None:
+        _governor = throttle.Governor(qps, burst)
+    return _governor
+
+
+def _socket_options():
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30))
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10))
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 6))
+    return options
+
+
+def _key(kubeconfig_path, context):
+    if kubeconfig_path is None:
+        kubeconfig_path = config.KUBE_CONFIG_DEFAULT_LOCATION
+    return (
+        os.path.abspath(os.path.expanduser(kubeconfig_path)),
+        context
+    )
+
+
+def _create_api_client(kubeconfig_path, context):
+    kubeconfig = config.kube_config.KubeConfigMerger(kubeconfig_path)
+    if kubeconfig.config is None:
+        raise Exception(
+            "Invalid kube-config file: %s. "
+            "No configuration found." % kubeconfig_path
+        )
+    loader = config.kube_config.KubeConfigLoader(
+        config_dict=kubeconfig.config,
+        active_context=context,
+    )
+    client_config = client.Configuration()
+    loader.load_and_set(client_config)
+    client_config.connection_pool_maxsize = pool_maxsize
+    api_client = SharedApiClient(configuration=client_config)
+    use_http2 = (
+        transport == "http2" and http2.install(api_client, pool_maxsize)
+    )
+    if keep_alive and not use_http2:
+        api_client.rest_client.pool_manager.connection_pool_kw[
+            "socket_options"
+        ] = _socket_options()
+    instrumentation.install(api_client.rest_client)
+    throttle.install(api_client.rest_client, get_governor())
+    return api_client
+
+
+def get_api_client(kubeconfig_path=None, context=None):
+    """
+    Returns the ApiClient of the given kubeconfig and context. The kubeconfig
+    is parsed and the connection pool is created only once per run, every
+    later call returns the same client
+
+    Args:
+        kubeconfig_path (string)
+            - Path to the kubeconfig, defaults to ~/.kube/config
+
+        context (string)
+            - Kubeconfig context, defaults to the current context
+
+    Returns:
+        SharedApiClient object
+    """
+
+    key = _key(kubeconfig_path, context)
+    with _lock:
+        api_client = _clients.get(key)
+        if api_client is None:
+            logging.debug(
+                "Creating kubernetes client for %s (context %s)" % key
+            )
+            api_client = _create_api_client(key[0], context)
+            _clients[key] = api_client
+        return api_client
+
+
+def get_exec_api(api_client):
+    """
+    Returns the CoreV1Api of the calling thread to exec in pods with, over a
+    dedicated ApiClient with the configuration of the given one.
+    kubernetes.stream swaps the request method of the ApiClient for the
+    duration of an exec without a lock, so the execs must not go through a
+    client shared with the other threads
+    """
+
+    apis = getattr(_exec_local, "apis", None)
+    if apis is None:
+        apis = _exec_local.apis = {}
+    shared_client, exec_api = apis.get(id(api_client), (None, None))
+    if shared_client is not api_client:
+        exec_api = client.CoreV1Api(
+            client.ApiClient(api_client.configuration)
+        )
+        apis[id(api_client)] = (api_client, exec_api)
+    return exec_api
+
+
+def close_all():
+    """
+    Closes the connection pools of every client of the registry and reports
+    the time spent rate limited
+    """
+
+    with _lock:
+        for api_client in _clients.values():
+            api_client.shutdown()
+        _clients.clear()
+        if _governor is not None:
+            throttle.log_summary(_governor)
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List
 
 
 @dataclass(frozen=True, order=False)
@@ -46,6 +46,37 @@ class Pod:
     volumes: List[Volume]
 
 
+@dataclass(frozen=True, order=False)
+class OwnerReference:
+    """Data class to hold information regarding the owner of an object"""
+    kind: str
+    name: str
+    uid: str
+    controller: bool = False
+
+
+@dataclass(frozen=True, order=False)
+class ObjectMetadata:
+    """Data class to hold the metadata returned by a metadata-only listing"""
+    name: str
+    namespace: str
+    labels: Dict[str, str]
+    ownerReferences: List[OwnerReference]
+    resourceVersion: str
+
+
+@dataclass(frozen=True, order=False)
+class ExecResult:
+    """Data class to hold the result of a command executed in a container"""
+    pod: str
+    namespace: str
+    container: str
+    success: bool
+    output: str
+    error: str
+    duration: float
+
+
 @dataclass(frozen=True, order=False)
 class LitmusChaosObject:
     """Data class to hold information regarding a custom object of litmus project"""
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+
+from kubernetes.client.rest import ApiException
+
+
+HTTP_STATUS_TOO_MANY_REQUESTS = 429
+HTTP_STATUS_SERVICE_UNAVAILABLE = 503
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at qps tokens per second and holding at most
+    burst tokens. A caller which finds the bucket empty reserves the next
+    token and sleeps until it is available, so callers are served in order
+    """
+
+    def __init__(self, qps, burst):
+        self.qps = float(qps)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Takes a token without waiting for it, returns the number of seconds
+        the caller has to wait before using it
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._last) * self.qps
+            )
+            self._last = now
+            self._tokens -= 1
+            return -self._tokens / self.qps if self._tokens < 0 else 0
+
+    def acquire(self):
+        """Takes a token, returns the number of seconds spent waiting"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class Governor:
+    """
+    Rate limits the requests of the kubernetes REST clients and retries the
+    requests rejected by the API server with 429 (or 503 with a Retry-After
+    header, as sent by API Priority and Fairness) after a jittered backoff
+    """
+
+    def __init__(
+        self,
+        qps=50,
+        burst=100,
+        max_retries=5,
+        base_backoff=0.5,
+        max_backoff=30
+    ):
+        self.bucket = TokenBucket(qps, burst) if qps and qps > 0 else None
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled_requests = 0
+        self.throttled_time = 0.0
+        self.rejected_requests = 0
+        self.backoff_time = 0.0
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Returns the number of seconds to wait before retrying: the
+        Retry-After of the server plus up to one second of jitter, or an
+        exponential backoff with full jitter when the server did not send it
+        """
+
+        if retry_after is not None:
+            return min(self.max_backoff, retry_after) + random.uniform(0, 1)
+        return random.uniform(
+            0,
+            min(self.max_backoff, self.base_backoff * 2 ** attempt)
+        )
+
+    def _reserve_token(self):
+        if self.bucket is None:
+            wait = 0
+        else:
+            wait = self.bucket.reserve()
+        with self._lock:
+            self.requests += 1
+            if wait > 0:
+                self.throttled_requests += 1
+                self.throttled_time += wait
+        return wait
+
+    def _retry_delay(self, method, url, e, attempt):
+        # Returns the backoff before retrying the rejected request, or None
+        # if the request must not be retried
+        retry_after = _retry_after(e)
+        if (
+            e.status != HTTP_STATUS_TOO_MANY_REQUESTS
+            and not (
+                e.status == HTTP_STATUS_SERVICE_UNAVAILABLE
+                and retry_after is not None
+            )
+        ) or attempt >= self.max_retries:
+            return None
+        delay = self.backoff(attempt, retry_after)
+        logging.warning(
+            "API server rejected %s %s with %s, retrying in "
+            "%.1f seconds" % (method, url, e.status, delay)
+        )
+        with self._lock:
+            self.rejected_requests += 1
+            self.backoff_time += delay
+        return delay
+
+    def wrap(self, request):
+        """Returns the request function of a RESTClientObject governed"""
+
+        def governed_request(method, url, *args, **kwargs):
+            attempt = 0
+            while True:
+                wait = self._reserve_token()
+                if wait > 0:
+                    time.sleep(wait)
+                try:
+                    return request(method, url, *args, **kwargs)
+                except ApiException as e:
+                    delay = self._retry_delay(method, url, e, attempt)
+                    if delay is None:
+                        raise e
+                    time.sleep(delay)
+                    attempt += 1
+
+        return governed_request
+
+    def wrap_async(self, request, api_exception=ApiException):
+        """
+        Returns the request coroutine function of an asyncio
+        RESTClientObject governed. Waiting for a token or a backoff suspends
+        the request instead of blocking the event loop. api_exception is the
+        exception class raised by the asyncio client for HTTP errors
+        """
+
+        async def governed_request(method, url, *args, **kwargs):
+            attempt = 0
+            while True:
+                wait = self._reserve_token()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                try:
+                    return await request(method, url, *args, **kwargs)
+                except api_exception as e:
+                    delay = self._retry_delay(method, url, e, attempt)
+                    if delay is None:
+                        raise e
+                    await asyncio.sleep(delay)
+                    attempt += 1
+
+        return governed_request
+
+    def summary(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttled_requests": self.throttled_requests,
+                "throttled_seconds": round(self.throttled_time, 3),
+                "rejected_requests": self.rejected_requests,
+                "backoff_seconds": round(self.backoff_time, 3),
+            }
+
+
+def _retry_after(e):
+    headers = e.headers or {}
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def install(rest_client, governor):
+    """Routes every request of the RESTClientObject through the governor"""
+    rest_client.request = governor.wrap(rest_client.request)
+
+
+def install_async(rest_client, governor, api_exception=ApiException):
+    """
+    Routes every request of the asyncio RESTClientObject through the
+    governor
+    """
+
+    rest_client.request = governor.wrap_async(
+        rest_client.request,
+        api_exception
+    )
+
+
+def log_summary(governor):
+    summary = governor.summary()
+    logging.info(
+        "Kubernetes API requests: %s, delayed by the client rate limiter: "
+        "%s (%.1f seconds), rejected by the API server: %s (%.1f seconds "
+        "of backoff)" % (
+            summary["requests"],
+            summary["throttled_requests"],
+            summary["throttled_seconds"],
+            summary["rejected_requests"],
+            summary["backoff_seconds"],
+        )
+    )
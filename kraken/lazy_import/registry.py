@@ -0,0 +1,103 @@
+import importlib
+import sys
+import threading
+
+
+def _resolve(path):
+    module_name, _, attribute = path.partition(":")
+    value = importlib.import_module(module_name)
+    for name in filter(None, attribute.split(".")):
+        value = getattr(value, name)
+    return value
+
+
+class Registry:
+    """
+    Maps names, e.g. scenario or cloud types, to "module" or
+    "module:attribute" paths which are only imported when the name is first
+    used, so a run does not import the scenarios and the cloud SDKs it does
+    not use
+    """
+
+    def __init__(self, kind, paths=None):
+        self.kind = kind
+        self._paths = dict(paths or {})
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, path):
+        with self._lock:
+            self._paths[name] = path
+            self._loaded.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self._paths
+
+    def names(self):
+        return sorted(self._paths)
+
+    def loaded(self):
+        """Returns the names which were imported"""
+        with self._lock:
+            return sorted(self._loaded)
+
+    def get(self, name):
+        """
+        Returns the module or the attribute registered under the name,
+        importing it on the first call
+
+        Raises:
+            Exception if the name is not registered
+        """
+
+        if name not in self._paths:
+            raise Exception(
+                "Unsupported %s %s, supported ones are: %s"
+                % (self.kind, name, ", ".join(self.names()))
+            )
+        with self._lock:
+            if name in self._loaded:
+                return self._loaded[name]
+        # The import system serializes the concurrent imports of a module
+        value = _resolve(self._paths[name])
+        with self._lock:
+            self._loaded[name] = value
+        return value
+
+
+class LazyModule:
+    """
+    Stands for a module which is imported on the first access to one of its
+    attributes
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        # Only called for the attributes which are not set on the proxy
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+    def __repr__(self):
+        return "<lazy module %s>" % self._name
+
+
+def module(name):
+    """Returns the module if it was already imported, a LazyModule if not"""
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def is_loaded(lazy_module):
+    """
+    Returns whether a module returned by module() was imported, through the
+    proxy or by another import
+    """
+
+    if isinstance(lazy_module, LazyModule):
+        return lazy_module._name in sys.modules
+    return True
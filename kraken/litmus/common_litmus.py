@@ -6,6 +6,7 @@ import sys
 import requests
 import yaml
 import kraken.cerberus.setup as cerberus
+import kraken.recovery.gate as recovery
 
 
 # Inject litmus scenarios defined in the config
@@ -46,7 +47,7 @@ def run(scenarios_list, config, litmus_uninstall, wait_duration, litmus_namespac
             if litmus_uninstall:
                 delete_chaos(litmus_namespace)
             logging.info("Waiting for the specified duration: %s" % wait_duration)
-            time.sleep(wait_duration)
+            recovery.wait(wait_duration)
             end_time = int(time.time())
             cerberus.get_status(config, start_time, end_time)
         except Exception as e:
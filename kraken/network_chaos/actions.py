@@ -7,7 +7,10 @@ import random
 from jinja2 import Environment, FileSystemLoader
 import kraken.cerberus.setup as cerberus
 import kraken.kubernetes.client as kubecli
+import kraken.kubernetes.labels as labels
 import kraken.node_actions.common_node_functions as common_node_functions
+import kraken.scenario_plan.cache as scenario_plan
+import kraken.recovery.gate as recovery
 
 
 # Reads the scenario config and introduces traffic variations in Node's host network interface.
@@ -15,80 +18,82 @@ def run(scenarios_list, config, wait_duration):
     failed_post_scenarios = ""
     logging.info("Runing the Network Chaos tests")
     for net_config in scenarios_list:
-        with open(net_config, "r") as file:
-            param_lst = ["latency", "loss", "bandwidth"]
-            test_config = yaml.safe_load(file)
-            test_dict = test_config["network_chaos"]
-            test_duration = int(test_dict.get("duration", 300))
-            test_interface = test_dict.get("interfaces", [])
-            test_node = test_dict.get("node_name", "")
-            test_node_label = test_dict.get("label_selector", "node-role.kubernetes.io/master")
-            test_execution = test_dict.get("execution", "serial")
-            test_instance_count = test_dict.get("instance_count", 1)
-            test_egress = test_dict.get("egress", {"bandwidth": "100mbit"})
-            if test_node:
-                node_name_list = test_node.split(",")
-            else:
-                node_name_list = [test_node]
-            nodelst = []
-            for single_node_name in node_name_list:
-                nodelst.extend(common_node_functions.get_node(single_node_name, test_node_label, test_instance_count))
-            file_loader = FileSystemLoader(os.path.abspath(os.path.dirname(__file__)))
-            env = Environment(loader=file_loader)
-            pod_template = env.get_template("pod.j2")
-            test_interface = verify_interface(test_interface, nodelst, pod_template)
-            joblst = []
-            egress_lst = [i for i in param_lst if i in test_egress]
-            chaos_config = {
-                "network_chaos": {
-                    "duration": test_duration,
-                    "interfaces": test_interface,
-                    "node_name": ",".join(nodelst),
-                    "execution": test_execution,
-                    "instance_count": test_instance_count,
-                    "egress": test_egress,
-                }
+        test_config = scenario_plan.load(net_config)
+        param_lst = ["latency", "loss", "bandwidth"]
+        test_dict = test_config["network_chaos"]
+        test_duration = int(test_dict.get("duration", 300))
+        test_interface = test_dict.get("interfaces", [])
+        test_node = test_dict.get("node_name", "")
+        test_node_label = test_dict.get("label_selector", "node-role.kubernetes.io/master")
+        test_execution = test_dict.get("execution", "serial")
+        test_instance_count = test_dict.get("instance_count", 1)
+        test_egress = test_dict.get("egress", {"bandwidth": "100mbit"})
+        if test_node:
+            node_name_list = test_node.split(",")
+        else:
+            node_name_list = [test_node]
+        nodelst = []
+        for single_node_name in node_name_list:
+            nodelst.extend(common_node_functions.get_node(single_node_name, test_node_label, test_instance_count))
+        file_loader = FileSystemLoader(os.path.abspath(os.path.dirname(__file__)))
+        env = Environment(loader=file_loader)
+        pod_template = env.get_template("pod.j2")
+        test_interface = verify_interface(test_interface, nodelst, pod_template)
+        joblst = []
+        run_id = labels.new_run_id()
+        egress_lst = [i for i in param_lst if i in test_egress]
+        chaos_config = {
+            "network_chaos": {
+                "duration": test_duration,
+                "interfaces": test_interface,
+                "node_name": ",".join(nodelst),
+                "execution": test_execution,
+                "instance_count": test_instance_count,
+                "egress": test_egress,
             }
-            logging.info("Executing network chaos with config \n %s" % yaml.dump(chaos_config))
-            job_template = env.get_template("job.j2")
-            try:
-                for i in egress_lst:
-                    for node in nodelst:
-                        exec_cmd = get_egress_cmd(
-                            test_execution, test_interface, i, test_dict["egress"], duration=test_duration
-                        )
-                        logging.info("Executing %s on node %s" % (exec_cmd, node))
-                        job_body = yaml.safe_load(
-                            job_template.render(jobname=i + str(hash(node))[:5], nodename=node, cmd=exec_cmd)
+        }
+        logging.info("Executing network chaos with config \n %s" % yaml.dump(chaos_config))
+        job_template = env.get_template("job.j2")
+        try:
+            for i in egress_lst:
+                for node in nodelst:
+                    exec_cmd = get_egress_cmd(
+                        test_execution, test_interface, i, test_dict["egress"], duration=test_duration
+                    )
+                    logging.info("Executing %s on node %s" % (exec_cmd, node))
+                    job_body = yaml.safe_load(
+                        job_template.render(
+                            jobname=i + str(hash(node))[:5], nodename=node, cmd=exec_cmd, runid=run_id
                         )
-                        joblst.append(job_body["metadata"]["name"])
-                        api_response = kubecli.create_job(job_body)
-                        if api_response is None:
-                            raise Exception("Error creating job")
-                    if test_execution == "serial":
-                        logging.info("Waiting for serial job to finish")
-                        start_time = int(time.time())
-                        wait_for_job(joblst[:], test_duration + 300)
-                        logging.info("Waiting for wait_duration %s" % wait_duration)
-                        time.sleep(wait_duration)
-                        end_time = int(time.time())
-                        cerberus.publish_kraken_status(config, failed_post_scenarios, start_time, end_time)
-                    if test_execution == "parallel":
-                        break
-                if test_execution == "parallel":
-                    logging.info("Waiting for parallel job to finish")
+                    )
+                    joblst.append(job_body["metadata"]["name"])
+                    api_response = kubecli.create_job(job_body)
+                    if api_response is None:
+                        raise Exception("Error creating job")
+                if test_execution == "serial":
+                    logging.info("Waiting for serial job to finish")
                     start_time = int(time.time())
                     wait_for_job(joblst[:], test_duration + 300)
                     logging.info("Waiting for wait_duration %s" % wait_duration)
-                    time.sleep(wait_duration)
+                    recovery.wait(wait_duration)
                     end_time = int(time.time())
                     cerberus.publish_kraken_status(config, failed_post_scenarios, start_time, end_time)
-            except Exception as e:
-                logging.error("Network Chaos exiting due to Exception %s" % e)
-                sys.exit(1)
-            finally:
-                logging.info("Deleting jobs")
-                delete_job(joblst[:])
+                if test_execution == "parallel":
+                    break
+            if test_execution == "parallel":
+                logging.info("Waiting for parallel job to finish")
+                start_time = int(time.time())
+                wait_for_job(joblst[:], test_duration + 300)
+                logging.info("Waiting for wait_duration %s" % wait_duration)
+                recovery.wait(wait_duration)
+                end_time = int(time.time())
+                cerberus.publish_kraken_status(config, failed_post_scenarios, start_time, end_time)
+        except Exception as e:
+            logging.error("Network Chaos exiting due to Exception %s" % e)
+            sys.exit(1)
+        finally:
+            logging.info("Deleting jobs")
+            delete_job(run_id)
 
 
 def verify_interface(test_interface, nodelst, template):
@@ -140,20 +145,20 @@ def wait_for_job(joblst, timeout=300):
             time.sleep(5)
 
 
-def delete_job(joblst):
-    for jobname in joblst:
-        try:
-            api_response = kubecli.get_job_status(jobname, namespace="default")
-            if api_response.status.failed is not None:
-                pod_name = get_job_pods(api_response)
+def delete_job(run_id):
+    label_selector = labels.run_selector(run_id)
+    try:
+        for job in kubecli.list_jobs(label_selector, namespace="default").items:
+            if job.status.failed is not None:
+                pod_name = get_job_pods(job)
                 pod_stat = kubecli.read_pod(name=pod_name, namespace="default")
                 logging.error(pod_stat.status.container_statuses)
                 pod_log_response = kubecli.get_pod_log(name=pod_name, namespace="default")
                 pod_log = pod_log_response.data.decode("utf-8")
                 logging.error(pod_log)
-        except Exception:
-            logging.warn("Exception in getting job status")
-        api_response = kubecli.delete_job(name=jobname, namespace="default")
+    except Exception:
+        logging.warn("Exception in getting job status")
+    kubecli.delete_jobs(label_selector, namespace="default")
 
 
 def get_egress_cmd(execution, test_interface, mod, vallst, duration=30):
@@ -5,6 +5,9 @@ import kraken.node_actions.common_node_functions as nodeaction
 
 
 class abstract_node_scenarios:
+    # Whether the action can be injected on several nodes at the same time,
+    # only set by the cloud types whose clients were checked to be thread safe
+    thread_safe = False
 
     # Node scenario to start the node
     def node_start_scenario(self, instance_kill_count, node, timeout):
@@ -9,8 +9,9 @@ from kraken.node_actions.abstract_node_scenarios import abstract_node_scenarios
 
 class AWS:
     def __init__(self):
+        # boto3 clients are thread safe unlike the resources, so the waits
+        # use the waiters of the client
         self.boto_client = boto3.client("ec2")
-        self.boto_instance = boto3.resource("ec2").Instance("id")
 
     # Get the instance ID of the node
     def get_instance_id(self, node):
@@ -66,7 +67,7 @@ class AWS:
     # Wait until the node instance is running
     def wait_until_running(self, instance_id, timeout=600):
         try:
-            self.boto_instance.wait_until_running(InstanceIds=[instance_id])
+            self.boto_client.get_waiter("instance_running").wait(InstanceIds=[instance_id])
             return True
         except Exception as e:
             logging.error("Failed to get status waiting for %s to be running %s" % (instance_id, e))
@@ -75,7 +76,7 @@ class AWS:
     # Wait until the node instance is stopped
     def wait_until_stopped(self, instance_id, timeout=600):
         try:
-            self.boto_instance.wait_until_stopped(InstanceIds=[instance_id])
+            self.boto_client.get_waiter("instance_stopped").wait(InstanceIds=[instance_id])
             return True
         except Exception as e:
             logging.error("Failed to get status waiting for %s to be stopped %s" % (instance_id, e))
@@ -84,7 +85,7 @@ class AWS:
     # Wait until the node instance is terminated
     def wait_until_terminated(self, instance_id, timeout=600):
         try:
-            self.boto_instance.wait_until_terminated(InstanceIds=[instance_id])
+            self.boto_client.get_waiter("instance_terminated").wait(InstanceIds=[instance_id])
             return True
         except Exception as e:
             logging.error("Failed to get status waiting for %s to be terminated %s" % (instance_id, e))
@@ -152,6 +153,8 @@ class AWS:
 
 
 class aws_node_scenarios(abstract_node_scenarios):
+    thread_safe = True
+
     def __init__(self):
         self.aws = AWS()
 
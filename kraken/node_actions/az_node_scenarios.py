@@ -123,6 +123,9 @@ class Azure:
 
 
 class azure_node_scenarios(abstract_node_scenarios):
+    # The clients of the Azure SDK are thread safe
+    thread_safe = True
+
     def __init__(self):
         logging.info("init in azure")
         self.azure = Azure()
@@ -1,50 +1,101 @@
 import time
-import random
 import logging
+import threading
+from contextlib import contextmanager
 import paramiko
 import kraken.kubernetes.client as kubecli
 import kraken.invoke.command as runcommand
 
 node_general = False
+_deferred = threading.local()
 
 
 # Pick a random node with specified label selector
 def get_node(node_name, label_selector, instance_kill_count):
-    if node_name in kubecli.list_killable_nodes():
+    nodes = kubecli.get_node_inventory()
+    killable = nodes.select(ready=True, exclude_names=[kubecli.kraken_node_name])
+    if node_name and (killable & nodes.select(names=[node_name])).any():
         return [node_name]
     elif node_name:
         logging.info("Node with provided node_name does not exist or the node might " "be in NotReady state.")
-    nodes = kubecli.list_killable_nodes(label_selector)
-    if not nodes:
+    killable &= nodes.select(label_selector=label_selector)
+    if not killable.any():
         raise Exception("Ready nodes with the provided label selector do not exist")
-    logging.info("Ready nodes with the label selector %s: %s" % (label_selector, nodes))
-    number_of_nodes = len(nodes)
-    if instance_kill_count == number_of_nodes:
-        return nodes
-    nodes_to_return = []
-    for i in range(instance_kill_count):
-        node_to_add = nodes[random.randint(0, len(nodes) - 1)]
-        nodes_to_return.append(node_to_add)
-        nodes.remove(node_to_add)
-    return nodes_to_return
-
-
-# Wait until the node status becomes Ready
+    logging.info(
+        "Ready nodes with the label selector %s: %s" % (label_selector, nodes.names(killable.nonzero()[0]))
+    )
+    return nodes.names(nodes.sample(killable, instance_kill_count))
+
+
+# Wait until the status of the node(s) becomes Ready
 def wait_for_ready_status(node, timeout):
-    resource_version = kubecli.get_node_resource_version(node)
-    kubecli.watch_node_status(node, "True", timeout, resource_version)
+    return wait_for_status(node, "True", timeout)
 
 
-# Wait until the node status becomes Not Ready
+# Wait until the status of the node(s) becomes Not Ready
 def wait_for_not_ready_status(node, timeout):
-    resource_version = kubecli.get_node_resource_version(node)
-    kubecli.watch_node_status(node, "False", timeout, resource_version)
+    return wait_for_status(node, "False", timeout)
 
 
-# Wait until the node status becomes Unknown
+# Wait until the status of the node(s) becomes Unknown
 def wait_for_unknown_status(node, timeout):
-    resource_version = kubecli.get_node_resource_version(node)
-    kubecli.watch_node_status(node, "Unknown", timeout, resource_version)
+    return wait_for_status(node, "Unknown", timeout)
+
+
+# Wait over a single watch until the Ready condition of a node or a list of
+# nodes changes to the status, returns the transition time of each node
+def wait_for_status(nodes, status, timeout):
+    waits = getattr(_deferred, "waits", None)
+    if waits is not None:
+        nodes = [nodes] if isinstance(nodes, str) else list(nodes)
+        waits.extend((node, status, timeout) for node in nodes)
+        return {node: None for node in nodes}
+    if isinstance(nodes, str):
+        resource_version = kubecli.get_node_resource_version(nodes)
+        nodes = [nodes]
+    else:
+        resource_version = kubecli.get_node_list_resource_version()
+    return kubecli.watch_nodes_status(nodes, status, timeout, resource_version)
+
+
+# Record the waits for the node status of the node scenarios run by the
+# calling thread instead of waiting, so that an action can be injected on
+# all the nodes before waiting for them at once with wait_for_deferred
+@contextmanager
+def deferred_waits():
+    _deferred.waits = []
+    try:
+        yield _deferred.waits
+    finally:
+        _deferred.waits = None
+
+
+# Wait for the statuses recorded by deferred_waits, one watch per status for
+# all the nodes. Every node goes through its statuses in the recorded order,
+# the first ones are watched from the resource version taken before the
+# injection so that the transitions which already happened are seen
+def wait_for_deferred(waits, resource_version):
+    sequences = {}
+    for node, status, timeout in waits:
+        sequence = sequences.setdefault(node, [])
+        if not sequence or sequence[-1][0] != status:
+            sequence.append((status, timeout))
+    transitions = {}
+    step = 0
+    while True:
+        pending = {}
+        for node, sequence in sequences.items():
+            if len(sequence) > step:
+                status, timeout = sequence[step]
+                nodes, max_timeout = pending.get(status, ([], 0))
+                pending[status] = (nodes + [node], max(max_timeout, timeout))
+        if not pending:
+            return transitions
+        for status, (nodes, timeout) in pending.items():
+            transitions.update(
+                kubecli.watch_nodes_status(nodes, status, timeout, resource_version if step == 0 else None)
+            )
+        step += 1
 
 
 # Get the ip of the cluster node
@@ -8,6 +8,9 @@ class GENERAL:
 
 
 class general_node_scenarios(abstract_node_scenarios):
+    # The actions only run oc debug processes
+    thread_safe = True
+
     def __init__(self):
         self.general = GENERAL()
 
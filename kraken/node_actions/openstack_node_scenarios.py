@@ -88,6 +88,9 @@ class OPENSTACKCLOUD:
 
 
 class openstack_node_scenarios(abstract_node_scenarios):
+    # Every call runs its own openstack CLI process
+    thread_safe = True
+
     def __init__(self):
         self.openstackcloud = OPENSTACKCLOUD()
 
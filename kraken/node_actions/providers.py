@@ -0,0 +1,36 @@
+from kraken.lazy_import.registry import Registry
+
+# Node scenarios of every cloud type, the SDK of a cloud is only imported
+# when one of its scenarios runs
+NODE_SCENARIOS = Registry(
+    "cloud type",
+    {
+        "generic": "kraken.node_actions.general_cloud_node_scenarios:"
+        "general_node_scenarios",
+        "aws": "kraken.node_actions.aws_node_scenarios:aws_node_scenarios",
+        "gcp": "kraken.node_actions.gcp_node_scenarios:gcp_node_scenarios",
+        "openstack": "kraken.node_actions.openstack_node_scenarios:"
+        "openstack_node_scenarios",
+        "azure": "kraken.node_actions.az_node_scenarios:azure_node_scenarios",
+        "az": "kraken.node_actions.az_node_scenarios:azure_node_scenarios",
+        "alibaba": "kraken.node_actions.alibaba_node_scenarios:"
+        "alibaba_node_scenarios",
+        "alicloud": "kraken.node_actions.alibaba_node_scenarios:"
+        "alibaba_node_scenarios",
+        "bm": "kraken.node_actions.bm_node_scenarios:bm_node_scenarios",
+    }
+)
+
+# Clients of the cloud APIs used by the cluster shut down and zone outage
+# scenarios
+CLOUD_CLIENTS = Registry(
+    "cloud type",
+    {
+        "aws": "kraken.node_actions.aws_node_scenarios:AWS",
+        "gcp": "kraken.node_actions.gcp_node_scenarios:GCP",
+        "openstack": "kraken.node_actions.openstack_node_scenarios:"
+        "OPENSTACKCLOUD",
+        "azure": "kraken.node_actions.az_node_scenarios:Azure",
+        "az": "kraken.node_actions.az_node_scenarios:Azure",
+    }
+)
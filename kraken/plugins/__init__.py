@@ -1,11 +1,13 @@
+import copy
 import dataclasses
 import json
 import logging
 from os.path import abspath
-from typing import List, Dict
+from typing import Any, List, Dict, Tuple
 
 from arcaflow_plugin_sdk import schema, serialization, jsonschema
 import kraken.plugins.vmware.vmware_plugin as vmware_plugin
+import kraken.scenario_plan.cache as scenario_plan
 from kraken.plugins.pod_plugin import kill_pods, wait_for_pods
 from kraken.plugins.run_python_plugin import run_python_file
 from kraken.plugins.network.ingress_shaping import network_chaos
@@ -39,17 +41,17 @@ class Plugins:
                 )
             self.steps_by_id[step.schema.id] = step
 
-    def run(self, file: str, kubeconfig_path: str):
+    def compile(self, file: str) -> List[Tuple[PluginStep, Any]]:
         """
-        Run executes a series of steps
+        Compile loads and validates a scenario file into the list of its steps and their unserialized inputs
         """
         data = serialization.load_from_file(abspath(file))
         if not isinstance(data, list):
             raise Exception(
                 "Invalid scenario configuration file: {} expected list, found {}".format(file, type(data).__name__)
             )
-        i = 0
-        for entry in data:
+        steps = []
+        for i, entry in enumerate(data):
             if not isinstance(entry, dict):
                 raise Exception(
                     "Invalid scenario configuration file: {} expected a list of dict's, found {} on step {}".format(
@@ -83,7 +85,16 @@ class Plugins:
                     )
                 )
             step = self.steps_by_id[entry["id"]]
-            unserialized_input = step.schema.input.unserialize(entry["config"])
+            steps.append((step, step.schema.input.unserialize(entry["config"])))
+        return steps
+
+    def run(self, file: str, kubeconfig_path: str):
+        """
+        Run executes a series of steps. The scenario file is compiled on the first run and again only when it changes.
+        """
+        for i, (step, compiled_input) in enumerate(scenario_plan.get(file, self.compile, "plugin_scenarios")):
+            # The compiled input is shared by the runs, only modify a copy
+            unserialized_input = copy.copy(compiled_input)
             if "kubeconfig_path" in step.schema.input.properties:
                 unserialized_input.kubeconfig_path = kubeconfig_path
             output_id, output_data = step.schema(unserialized_input)
@@ -92,7 +103,6 @@ class Plugins:
                 raise Exception(
                     "Step {} in {} ({}) failed".format(i, file, step.schema.id)
                 )
-            i = i + 1
 
     def json_schema(self):
         """
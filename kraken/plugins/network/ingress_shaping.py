@@ -8,6 +8,7 @@ import re
 from traceback import format_exc
 from jinja2 import Environment, FileSystemLoader
 from . import kubernetes_functions as kube_helper
+from kraken.kubernetes import labels
 from . import cerberus
 import typing
 from arcaflow_plugin_sdk import validation, plugin
@@ -395,7 +396,8 @@ def apply_ingress_filter(
     batch_cli: BatchV1Api,
     cli: CoreV1Api,
     create_interfaces: bool = True,
-    param_selector: str = 'all'
+    param_selector: str = 'all',
+    run_id: str = ''
 ) -> str:
 
     """
@@ -432,6 +434,10 @@ def apply_ingress_filter(
             - Used to specify what kind of filter to apply. Useful during
               serial execution mode. Default value is 'all'
 
+        run_id (string)
+            - Value of the run label set on the job, used to delete the
+              jobs of the scenario in bulk
+
     Returns:
         The name of the job created that executes the commands on a node
         for ingress chaos scenario
@@ -452,7 +458,8 @@ def apply_ingress_filter(
         job_template.render(
             jobname=str(hash(node))[:5],
             nodename=node,
-            cmd=exec_cmd
+            cmd=exec_cmd,
+            runid=run_id
         )
     )
     api_response = kube_helper.create_job(batch_cli, job_body)
@@ -648,10 +655,11 @@ def wait_for_job(
 def delete_jobs(
     cli: CoreV1Api,
     batch_cli: BatchV1Api,
-    job_list: typing.List[str]
+    run_id: str
 ):
     """
-    Function that deletes jobs
+    Function that deletes the jobs of a scenario run with a single request,
+    after logging the status and output of the failed ones
 
     Args:
         cli (CoreV1Api)
@@ -660,19 +668,20 @@ def delete_jobs(
         batch_cli (BatchV1Api)
             - Object to interact with Kubernetes Python client's BatchV1 API
 
-        job_list (List of strings)
-            - The list of jobs to delete
+        run_id (string)
+            - Value of the run label set on the jobs to delete
     """
 
-    for job_name in job_list:
-        try:
-            api_response = kube_helper.get_job_status(
-                batch_cli,
-                job_name,
-                namespace="default"
-            )
-            if api_response.status.failed is not None:
-                pod_name = get_job_pods(cli, api_response)
+    label_selector = labels.run_selector(run_id)
+    try:
+        job_list = kube_helper.list_jobs(
+            batch_cli,
+            label_selector,
+            namespace="default"
+        )
+        for job in job_list.items:
+            if job.status.failed is not None:
+                pod_name = get_job_pods(cli, job)
                 pod_stat = kube_helper.read_pod(
                     cli,
                     name=pod_name,
@@ -686,13 +695,9 @@ def delete_jobs(
                 )
                 pod_log = pod_log_response.data.decode("utf-8")
                 logging.error(pod_log)
-        except Exception as e:
-            logging.warn("Exception in getting job status: %s" % str(e))
-        api_response = kube_helper.delete_job(
-            batch_cli,
-            name=job_name,
-            namespace="default"
-        )
+    except Exception as e:
+        logging.warn("Exception in getting job status: %s" % str(e))
+    kube_helper.delete_jobs(batch_cli, label_selector, namespace="default")
 
 
 def get_ingress_cmd(
@@ -833,6 +838,7 @@ def network_chaos(cfg: NetworkScenarioConfig) -> typing.Tuple[
                     format_exc()
                 )
     job_list = []
+    run_id = labels.new_run_id()
     publish = False
     if cfg.kraken_config:
         failed_post_scenarios = ""
@@ -859,7 +865,8 @@ def network_chaos(cfg: NetworkScenarioConfig) -> typing.Tuple[
                         pod_module_template,
                         job_template,
                         batch_cli,
-                        cli
+                        cli,
+                        run_id=run_id
                     )
                 )
             logging.info("Waiting for parallel job to finish")
@@ -888,14 +895,15 @@ def network_chaos(cfg: NetworkScenarioConfig) -> typing.Tuple[
                             batch_cli,
                             cli,
                             create_interfaces=create_interfaces,
-                            param_selector=param
+                            param_selector=param,
+                            run_id=run_id
                         )
                     )
                 logging.info("Waiting for serial job to finish")
                 start_time = int(time.time())
                 wait_for_job(batch_cli, job_list[:], cfg.wait_duration)
                 logging.info("Deleting jobs")
-                delete_jobs(cli, batch_cli, job_list[:])
+                delete_jobs(cli, batch_cli, run_id)
                 job_list = []
                 logging.info(
                     "Waiting for wait_duration : %ss" % cfg.wait_duration
@@ -934,4 +942,4 @@ def network_chaos(cfg: NetworkScenarioConfig) -> typing.Tuple[
             pod_module_template
         )
         logging.info("Deleting jobs(if any)")
-        delete_jobs(cli, batch_cli, job_list[:])
+        delete_jobs(cli, batch_cli, run_id)
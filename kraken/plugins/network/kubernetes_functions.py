@@ -1,8 +1,8 @@
-from kubernetes import config, client
+from kubernetes import client
 from kubernetes.client.rest import ApiException
 from kubernetes.stream import stream
+from kraken.kubernetes import pod_status, registry
 import sys
-import time
 import logging
 import random
 
@@ -11,11 +11,9 @@ def setup_kubernetes(kubeconfig_path):
     Sets up the Kubernetes client
     """
 
-    if kubeconfig_path is None:
-        kubeconfig_path = config.KUBE_CONFIG_DEFAULT_LOCATION
-    config.load_kube_config(kubeconfig_path)
-    cli = client.CoreV1Api()
-    batch_cli = client.BatchV1Api()
+    api_client = registry.get_api_client(kubeconfig_path)
+    cli = client.CoreV1Api(api_client)
+    batch_cli = client.BatchV1Api(api_client)
 
     return cli, batch_cli
 
@@ -45,21 +43,64 @@ def create_job(batch_cli, body, namespace="default"):
         raise
 
 
-def delete_pod(cli, name, namespace):
+def watch_pods(cli, names, namespace, is_done, timeout=120):
+    """
+    Function that waits over a single watch stream until is_done(event_type, pod)
+    returned True for every pod of the batch. Returns the pods that did not reach
+    the expected state before the timeout
+    """
+
+    return pod_status.wait_for_pods(cli, names, is_done, timeout, namespace=namespace)
+
+
+def wait_for_pods_running(cli, names, namespace, timeout=120):
+    """
+    Function that waits until all the pods are Running
+    """
+
+    return watch_pods(
+        cli,
+        names,
+        namespace,
+        lambda event_type, pod: pod is not None and event_type != "DELETED" and pod.status.phase == "Running",
+        timeout
+    )
+
+
+def wait_for_pods_deleted(cli, names, namespace, timeout=120):
+    """
+    Function that waits until all the pods are deleted
+    """
+
+    return watch_pods(cli, names, namespace, lambda event_type, pod: event_type == "DELETED", timeout)
+
+
+def delete_pods(cli, names, namespace, timeout=120):
+    """
+    Function that deletes a batch of pods and waits until deletion is complete
+    """
+
+    for name in names:
+        try:
+            cli.delete_namespaced_pod(name=name, namespace=namespace)
+        except ApiException as e:
+            if e.status == 404:
+                logging.info("Pod %s already deleted" % name)
+            else:
+                logging.error("Failed to delete pod %s" % e)
+                raise e
+    remaining = wait_for_pods_deleted(cli, names, namespace, timeout)
+    if remaining:
+        logging.error("Pods %s still exist after %ss" % (", ".join(sorted(remaining)), timeout))
+    return remaining
+
+
+def delete_pod(cli, name, namespace, timeout=120):
     """
     Function that deletes a pod and waits until deletion is complete
     """
 
-    try:
-        cli.delete_namespaced_pod(name=name, namespace=namespace)
-        while cli.read_namespaced_pod(name=name, namespace=namespace):
-            time.sleep(1)
-    except ApiException as e:
-        if e.status == 404:
-            logging.info("Pod deleted")
-        else:
-            logging.error("Failed to delete pod %s" % e)
-            raise e
+    delete_pods(cli, [name], namespace, timeout)
 
 
 def create_pod(cli, body, namespace, timeout=120):
@@ -70,14 +111,9 @@ def create_pod(cli, body, namespace, timeout=120):
     try:
         pod_stat = None
         pod_stat = cli.create_namespaced_pod(body=body, namespace=namespace)
-        end_time = time.time() + timeout
-        while True:
+        if wait_for_pods_running(cli, [body["metadata"]["name"]], namespace, timeout):
             pod_stat = cli.read_namespaced_pod(name=body["metadata"]["name"], namespace=namespace)
-            if pod_stat.status.phase == "Running":
-                break
-            if time.time() > end_time:
-                raise Exception("Starting pod failed")
-            time.sleep(1)
+            raise Exception("Starting pod failed")
     except Exception as e:
         logging.error("Pod creation failed %s" % e)
         if pod_stat:
@@ -92,10 +128,12 @@ def exec_cmd_in_pod(cli, command, pod_name, namespace, container=None):
     """
 
     exec_command = command
+    # The exec goes through a client of its own, see registry.get_exec_api
+    exec_api = registry.get_exec_api(cli.api_client)
     try:
         if container:
             ret = stream(
-                cli.connect_get_namespaced_pod_exec,
+                exec_api.connect_get_namespaced_pod_exec,
                 pod_name,
                 namespace,
                 container=container,
@@ -107,7 +145,7 @@ def exec_cmd_in_pod(cli, command, pod_name, namespace, container=None):
             )
         else:
             ret = stream(
-                cli.connect_get_namespaced_pod_exec,
+                exec_api.connect_get_namespaced_pod_exec,
                 pod_name,
                 namespace,
                 command=exec_command,
@@ -233,6 +271,35 @@ def delete_job(batch_cli, name, namespace="default"):
         sys.exit(1)
 
 
+def delete_jobs(batch_cli, label_selector, namespace="default"):
+    """
+    Deletes all the jobs matching the label selector, and their pods, with a single delete collection request
+    """
+
+    try:
+        batch_cli.delete_collection_namespaced_job(
+            namespace,
+            label_selector=label_selector,
+            propagation_policy="Foreground",
+            grace_period_seconds=0,
+        )
+        logging.debug("Jobs matching %s deleted in namespace %s" % (label_selector, namespace))
+    except ApiException as api:
+        logging.warn(
+            "Exception when calling \
+                       BatchV1Api->delete_collection_namespaced_job: %s"
+            % api
+        )
+
+
+def list_jobs(batch_cli, label_selector, namespace="default"):
+    """
+    Returns the jobs matching the label selector in a given namespace
+    """
+
+    return batch_cli.list_namespaced_job(namespace, label_selector=label_selector)
+
+
 def list_ready_nodes(cli, label_selector=None):
     """
     Returns a list of ready nodes
@@ -4,53 +4,72 @@ import sys
 import time
 import typing
 from dataclasses import dataclass, field
-import random
 from datetime import datetime
 from traceback import format_exc
 
-from kubernetes import config, client
-from kubernetes.client import V1PodList, V1Pod, ApiException, V1DeleteOptions
+from kubernetes import client
+from kubernetes.client import V1PodList, V1Pod
 from arcaflow_plugin_sdk import validation, plugin, schema
 
+from kraken.kubernetes import inventory, labels, pod_status, registry
+
 
 def setup_kubernetes(kubeconfig_path):
-    if kubeconfig_path is None:
-        kubeconfig_path = config.KUBE_CONFIG_DEFAULT_LOCATION
-    kubeconfig = config.kube_config.KubeConfigMerger(kubeconfig_path)
-
-    if kubeconfig.config is None:
-        raise Exception(
-            'Invalid kube-config file: %s. '
-            'No configuration found.' % kubeconfig_path
-        )
-    loader = config.kube_config.KubeConfigLoader(
-        config_dict=kubeconfig.config,
-    )
-    client_config = client.Configuration()
-    loader.load_and_set(client_config)
-    return client.ApiClient(configuration=client_config)
+    return registry.get_api_client(kubeconfig_path)
+
 
+PARTIAL_OBJECT_METADATA_LIST = "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1"
 
-def _find_pods(core_v1, label_selector, name_pattern, namespace_pattern):
-    pods: typing.List[V1Pod] = []
+
+def _iter_pods(core_v1, label_selector, page_size=500):
+    """
+    Lists the pods page by page, following the continue token, and yields them. The pods are listed in metadata-only
+    mode, so the returned objects only have their metadata set.
+    """
     _continue = None
-    finished = False
-    while not finished:
-        pod_response: V1PodList = core_v1.list_pod_for_all_namespaces(
-            watch=False,
-            label_selector=label_selector
+    while True:
+        query_params = [("limit", page_size)]
+        if label_selector:
+            query_params.append(("labelSelector", label_selector))
+        if _continue:
+            query_params.append(("continue", _continue))
+        pod_response: V1PodList = core_v1.api_client.call_api(
+            "/api/v1/pods",
+            "GET",
+            query_params=query_params,
+            header_params={"Accept": PARTIAL_OBJECT_METADATA_LIST},
+            response_type="V1PodList",
+            auth_settings=["BearerToken"],
+            _return_http_data_only=True,
         )
-        for pod in pod_response.items:
-            pod: V1Pod
-            if (name_pattern is None or name_pattern.match(pod.metadata.name)) and \
-                    namespace_pattern.match(pod.metadata.namespace):
-                pods.append(pod)
+        yield from pod_response.items
         _continue = pod_response.metadata._continue
-        if _continue is None:
-            finished = True
+        if not _continue:
+            break
+
+
+def _pod_inventory(core_v1, label_selector) -> inventory.Inventory:
+    """
+    Loads the pods matching the label selector into a columnar inventory, so the name and namespace patterns are
+    evaluated once per distinct value instead of once per pod.
+    """
+    pods = inventory.Inventory()
+    for pod in _iter_pods(core_v1, label_selector):
+        pod: V1Pod
+        pods.add(pod.metadata.name, pod.metadata.namespace, uid=pod.metadata.uid)
     return pods
 
 
+def _select_pods(pods: inventory.Inventory, name_pattern, namespace_pattern):
+    return pods.select(name_pattern=name_pattern, namespace_pattern=namespace_pattern)
+
+
+def _find_pods(core_v1, label_selector, name_pattern, namespace_pattern) -> typing.List[typing.Dict]:
+    pods = _pod_inventory(core_v1, label_selector)
+    mask = _select_pods(pods, name_pattern, namespace_pattern)
+    return pods.rows(mask.nonzero()[0])
+
+
 @dataclass
 class Pod:
     namespace: str
@@ -127,7 +146,8 @@ class KillPodConfig:
 
     backoff: int = field(default=1, metadata={
         "name": "Backoff",
-        "description": "How many seconds to wait between checks for the target pod status."
+        "description": "Deprecated and ignored, the pods are watched instead of checked at an interval. Kept so "
+                       "that the existing configurations stay valid."
     })
 
 
@@ -143,46 +163,36 @@ def kill_pods(cfg: KillPodConfig) -> typing.Tuple[str, typing.Union[PodKillSucce
             core_v1 = client.CoreV1Api(cli)
 
             # region Select target pods
-            pods = _find_pods(core_v1, cfg.label_selector, cfg.name_pattern, cfg.namespace_pattern)
-            if len(pods) < cfg.kill:
+            pods = _pod_inventory(core_v1, cfg.label_selector)
+            mask = _select_pods(pods, cfg.name_pattern, cfg.namespace_pattern)
+            found = int(mask.sum())
+            if found < cfg.kill:
                 return "error", PodErrorOutput(
-                    "Not enough pods match the criteria, expected {} but found only {} pods".format(cfg.kill, len(pods))
+                    "Not enough pods match the criteria, expected {} but found only {} pods".format(cfg.kill, found)
                 )
-            random.shuffle(pods)
             # endregion
 
             # region Remove pods
+            run_id = labels.new_run_id()
+            targets = pods.rows(pods.sample(mask, cfg.kill))
+            _delete_pods(core_v1, targets, run_id)
             killed_pods: typing.Dict[int, Pod] = {}
-            watch_pods: typing.List[Pod] = []
-            for i in range(cfg.kill):
-                pod = pods[i]
-                core_v1.delete_namespaced_pod(pod.metadata.name, pod.metadata.namespace, body=V1DeleteOptions(
-                    grace_period_seconds=0,
-                ))
-                p = Pod(
-                    pod.metadata.namespace,
-                    pod.metadata.name
+            for pod in targets:
+                killed_pods[int(time.time_ns())] = Pod(
+                    pod["namespace"],
+                    pod["name"]
                 )
-                killed_pods[int(time.time_ns())] = p
-                watch_pods.append(p)
             # endregion
 
             # region Wait for pods to be removed
-            start_time = time.time()
-            while len(watch_pods) > 0:
-                time.sleep(cfg.backoff)
-                new_watch_pods: typing.List[Pod] = []
-                for p in watch_pods:
-                    try:
-                        read_pod = core_v1.read_namespaced_pod(p.name, p.namespace)
-                        new_watch_pods.append(p)
-                    except ApiException as e:
-                        if e.status != 404:
-                            raise
-                watch_pods = new_watch_pods
-                current_time = time.time()
-                if current_time - start_time > cfg.timeout:
-                    return "error", PodErrorOutput("Timeout while waiting for pods to be removed.")
+            remaining = _wait_for_pods_deleted(
+                core_v1,
+                {pod["uid"] for pod in targets},
+                run_id,
+                cfg.timeout
+            )
+            if remaining:
+                return "error", PodErrorOutput("Timeout while waiting for pods to be removed.")
             return "success", PodKillSuccessOutput(killed_pods)
             # endregion
     except Exception:
@@ -191,6 +201,42 @@ def kill_pods(cfg: KillPodConfig) -> typing.Tuple[str, typing.Union[PodKillSucce
         )
 
 
+def _delete_pods(core_v1, pods, run_id):
+    """
+    Tags the pods with the run label, then deletes them with a single delete collection request per namespace.
+    """
+    namespaces = set()
+    for pod in pods:
+        core_v1.patch_namespaced_pod(
+            pod["name"],
+            pod["namespace"],
+            {"metadata": {"labels": {labels.RUN_LABEL: run_id}}}
+        )
+        namespaces.add(pod["namespace"])
+    for namespace in sorted(namespaces):
+        core_v1.delete_collection_namespaced_pod(
+            namespace,
+            label_selector=labels.run_selector(run_id),
+            grace_period_seconds=0
+        )
+
+
+def _wait_for_pods_deleted(core_v1, uids, run_id, timeout):
+    """
+    Waits over a single watch on the pods of the run until the pods with the given UIDs are deleted. Pods recreated
+    with the same name by their controller do not carry the run label, so they are not tracked. Returns the UIDs of
+    the pods still present after the timeout.
+    """
+    return pod_status.wait_for_pods(
+        core_v1,
+        uids,
+        lambda event_type, pod: event_type == "DELETED",
+        timeout,
+        label_selector=labels.run_selector(run_id),
+        key="uid"
+    )
+
+
 @dataclass
 class WaitForPodsConfig:
     """
@@ -245,7 +291,7 @@ def wait_for_pods(cfg: WaitForPodsConfig) -> typing.Tuple[str, typing.Union[PodW
                 pods = _find_pods(core_v1, cfg.label_selector, cfg.name_pattern, cfg.namespace_pattern)
                 if len(pods) >= cfg.count:
                     return "success", \
-                           PodWaitSuccessOutput(list(map(lambda p: Pod(p.metadata.namespace, p.metadata.name), pods)))
+                           PodWaitSuccessOutput(list(map(lambda p: Pod(p["namespace"], p["name"]), pods)))
 
                 time.sleep(cfg.backoff)
 
@@ -1,9 +1,10 @@
-from kubernetes import config, client
 from kubernetes.client.rest import ApiException
 import logging
 import random
 from enum import Enum
 
+from kraken.kubernetes import node_status, registry
+
 
 class Actions(Enum):
     """
@@ -21,20 +22,7 @@ def setup_kubernetes(kubeconfig_path):
     Sets up the Kubernetes client
     """
 
-    if kubeconfig_path is None:
-        kubeconfig_path = config.KUBE_CONFIG_DEFAULT_LOCATION
-    kubeconfig = config.kube_config.KubeConfigMerger(kubeconfig_path)
-
-    if kubeconfig.config is None:
-        raise Exception(
-            "Invalid kube-config file: %s. " "No configuration found." % kubeconfig_path
-        )
-    loader = config.kube_config.KubeConfigLoader(
-        config_dict=kubeconfig.config,
-    )
-    client_config = client.Configuration()
-    loader.load_and_set(client_config)
-    return client.ApiClient(configuration=client_config)
+    return registry.get_api_client(kubeconfig_path)
 
 
 def list_killable_nodes(core_v1, label_selector=None):
@@ -133,47 +121,33 @@ def get_node_list(cfg, action, core_v1):
     return list(scenario_nodes)
 
 
-def watch_node_status(node, status, timeout, watch_resource, core_v1):
-    """
-    Monitor the status of a node for change
-    """
-    count = timeout
-    for event in watch_resource.stream(
-        core_v1.list_node,
-        field_selector=f"metadata.name={node}",
-        timeout_seconds=timeout,
-    ):
-        conditions = [
-            status
-            for status in event["object"].status.conditions
-            if status.type == "Ready"
-        ]
-        if conditions[0].status == status:
-            watch_resource.stop()
-            break
-        else:
-            count -= 1
-            logging.info("Status of node " + node + ": " + str(conditions[0].status))
-        if not count:
-            watch_resource.stop()
+def watch_node_status(nodes, status, timeout, core_v1):
+    """
+    Monitor the status of one or several nodes over a single watch until
+    their Ready condition reaches the status. Returns the time at which each
+    node reached it, None for the nodes which did not reach it in time
+    """
+    if isinstance(nodes, str):
+        nodes = [nodes]
+    return node_status.wait_for_nodes_status(core_v1, nodes, status, timeout)
 
 
-def wait_for_ready_status(node, timeout, watch_resource, core_v1):
+def wait_for_ready_status(nodes, timeout, core_v1):
     """
     Wait until the node status becomes Ready
     """
-    watch_node_status(node, "True", timeout, watch_resource, core_v1)
+    return watch_node_status(nodes, "True", timeout, core_v1)
 
 
-def wait_for_not_ready_status(node, timeout, watch_resource, core_v1):
+def wait_for_not_ready_status(nodes, timeout, core_v1):
     """
     Wait until the node status becomes Not Ready
     """
-    watch_node_status(node, "False", timeout, watch_resource, core_v1)
+    return watch_node_status(nodes, "False", timeout, core_v1)
 
 
-def wait_for_unknown_status(node, timeout, watch_resource, core_v1):
+def wait_for_unknown_status(nodes, timeout, core_v1):
     """
     Wait until the node status becomes Unknown
     """
-    watch_node_status(node, "Unknown", timeout, watch_resource, core_v1)
+    return watch_node_status(nodes, "Unknown", timeout, core_v1)
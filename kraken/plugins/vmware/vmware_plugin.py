@@ -14,7 +14,7 @@ from com.vmware.vapi.std.errors_client import (AlreadyInDesiredState,
                                                NotAllowedInCurrentState)
 from com.vmware.vcenter.vm_client import Power
 from com.vmware.vcenter_client import VM, ResourcePool
-from kubernetes import client, watch
+from kubernetes import client
 from vmware.vapi.vsphere.client import create_vsphere_client
 
 from kraken.plugins.vmware import kubernetes_functions as kube_helper
@@ -533,6 +533,23 @@ class NodeScenarioConfig:
     )
 
 
+def _add_node(nodes, transitions, name):
+    """
+    Adds the node to the output keyed by the time in nanoseconds at which it
+    reached the expected status, or the current time when it was not
+    tracked. The key is bumped while it is taken, so nodes reaching the
+    status at the same time are all kept
+    """
+    timestamp = transitions.get(name)
+    if timestamp is None:
+        key = time.time_ns()
+    else:
+        key = int(timestamp * 1e9)
+    while key in nodes:
+        key += 1
+    nodes[key] = Node(name=name)
+
+
 @plugin.step(
     id="node_start_scenario",
     name="Start the node",
@@ -551,41 +568,44 @@ def node_start(
     with kube_helper.setup_kubernetes(None) as cli:
         vsphere = vSphere(verify=cfg.verify_session)
         core_v1 = client.CoreV1Api(cli)
-        watch_resource = watch.Watch()
         node_list = kube_helper.get_node_list(
             cfg,
             kube_helper.Actions.START,
             core_v1
         )
         nodes_started = {}
-        for name in node_list:
-            try:
-                for _ in range(cfg.runs):
-                    logging.info("Starting node_start_scenario injection")
+        try:
+            for _ in range(cfg.runs):
+                logging.info("Starting node_start_scenario injection")
+                started = []
+                for name in node_list:
                     logging.info("Starting the node %s ", name)
-                    vm_started = vsphere.start_instances(name)
-                    if vm_started:
-                        vsphere.wait_until_running(name, cfg.timeout)
-                        if not cfg.skip_openshift_checks:
-                            kube_helper.wait_for_ready_status(
-                                name, cfg.timeout, watch_resource, core_v1
-                            )
-                        nodes_started[int(time.time_ns())] = Node(name=name)
+                    if vsphere.start_instances(name):
+                        started.append(name)
+                for name in started:
+                    vsphere.wait_until_running(name, cfg.timeout)
                     logging.info(
                         "Node with instance ID: %s is in running state", name
                     )
-                    logging.info(
-                        "node_start_scenario has been successfully injected!"
+                transitions = {}
+                if started and not cfg.skip_openshift_checks:
+                    transitions = kube_helper.wait_for_ready_status(
+                        started, cfg.timeout, core_v1
                     )
-            except Exception as e:
-                logging.error("Failed to start node instance. Test Failed")
-                logging.error(
-                    "node_start_scenario injection failed! "
-                    "Error was: %s", str(e)
-                )
-                return "error", NodeScenarioErrorOutput(
-                    format_exc(), kube_helper.Actions.START
+                for name in started:
+                    _add_node(nodes_started, transitions, name)
+                logging.info(
+                    "node_start_scenario has been successfully injected!"
                 )
+        except Exception as e:
+            logging.error("Failed to start node instance. Test Failed")
+            logging.error(
+                "node_start_scenario injection failed! "
+                "Error was: %s", str(e)
+            )
+            return "error", NodeScenarioErrorOutput(
+                format_exc(), kube_helper.Actions.START
+            )
 
     return "success", NodeScenarioSuccessOutput(
         nodes_started, kube_helper.Actions.START
@@ -610,41 +630,44 @@ def node_stop(
     with kube_helper.setup_kubernetes(None) as cli:
         vsphere = vSphere(verify=cfg.verify_session)
         core_v1 = client.CoreV1Api(cli)
-        watch_resource = watch.Watch()
         node_list = kube_helper.get_node_list(
             cfg,
             kube_helper.Actions.STOP,
             core_v1
         )
         nodes_stopped = {}
-        for name in node_list:
-            try:
-                for _ in range(cfg.runs):
-                    logging.info("Starting node_stop_scenario injection")
+        try:
+            for _ in range(cfg.runs):
+                logging.info("Starting node_stop_scenario injection")
+                stopped = []
+                for name in node_list:
                     logging.info("Stopping the node %s ", name)
-                    vm_stopped = vsphere.stop_instances(name)
-                    if vm_stopped:
-                        vsphere.wait_until_stopped(name, cfg.timeout)
-                        if not cfg.skip_openshift_checks:
-                            kube_helper.wait_for_ready_status(
-                                name, cfg.timeout, watch_resource, core_v1
-                            )
-                        nodes_stopped[int(time.time_ns())] = Node(name=name)
+                    if vsphere.stop_instances(name):
+                        stopped.append(name)
+                for name in stopped:
+                    vsphere.wait_until_stopped(name, cfg.timeout)
                     logging.info(
                         "Node with instance ID: %s is in stopped state", name
                     )
-                    logging.info(
-                        "node_stop_scenario has been successfully injected!"
+                transitions = {}
+                if stopped and not cfg.skip_openshift_checks:
+                    transitions = kube_helper.wait_for_unknown_status(
+                        stopped, cfg.timeout, core_v1
                     )
-            except Exception as e:
-                logging.error("Failed to stop node instance. Test Failed")
-                logging.error(
-                    "node_stop_scenario injection failed! "
-                    "Error was: %s", str(e)
-                )
-                return "error", NodeScenarioErrorOutput(
-                    format_exc(), kube_helper.Actions.STOP
+                for name in stopped:
+                    _add_node(nodes_stopped, transitions, name)
+                logging.info(
+                    "node_stop_scenario has been successfully injected!"
                 )
+        except Exception as e:
+            logging.error("Failed to stop node instance. Test Failed")
+            logging.error(
+                "node_stop_scenario injection failed! "
+                "Error was: %s", str(e)
+            )
+            return "error", NodeScenarioErrorOutput(
+                format_exc(), kube_helper.Actions.STOP
+            )
 
         return "success", NodeScenarioSuccessOutput(
             nodes_stopped, kube_helper.Actions.STOP
@@ -669,43 +692,44 @@ def node_reboot(
     with kube_helper.setup_kubernetes(None) as cli:
         vsphere = vSphere(verify=cfg.verify_session)
         core_v1 = client.CoreV1Api(cli)
-        watch_resource = watch.Watch()
         node_list = kube_helper.get_node_list(
             cfg,
             kube_helper.Actions.REBOOT,
             core_v1
         )
         nodes_rebooted = {}
-        for name in node_list:
-            try:
-                for _ in range(cfg.runs):
-                    logging.info("Starting node_reboot_scenario injection")
+        try:
+            for _ in range(cfg.runs):
+                logging.info("Starting node_reboot_scenario injection")
+                for name in node_list:
                     logging.info("Rebooting the node %s ", name)
                     vsphere.reboot_instances(name)
-                    if not cfg.skip_openshift_checks:
-                        kube_helper.wait_for_unknown_status(
-                            name, cfg.timeout, watch_resource, core_v1
-                        )
-                        kube_helper.wait_for_ready_status(
-                            name, cfg.timeout, watch_resource, core_v1
-                        )
-                    nodes_rebooted[int(time.time_ns())] = Node(name=name)
+                transitions = {}
+                if node_list and not cfg.skip_openshift_checks:
+                    kube_helper.wait_for_unknown_status(
+                        node_list, cfg.timeout, core_v1
+                    )
+                    transitions = kube_helper.wait_for_ready_status(
+                        node_list, cfg.timeout, core_v1
+                    )
+                for name in node_list:
+                    _add_node(nodes_rebooted, transitions, name)
                     logging.info(
                         "Node with instance ID: %s has rebooted "
                         "successfully", name
                     )
-                    logging.info(
-                        "node_reboot_scenario has been successfully injected!"
-                    )
-            except Exception as e:
-                logging.error("Failed to reboot node instance. Test Failed")
-                logging.error(
-                    "node_reboot_scenario injection failed! "
-                    "Error was: %s", str(e)
-                )
-                return "error", NodeScenarioErrorOutput(
-                    format_exc(), kube_helper.Actions.REBOOT
+                logging.info(
+                    "node_reboot_scenario has been successfully injected!"
                 )
+        except Exception as e:
+            logging.error("Failed to reboot node instance. Test Failed")
+            logging.error(
+                "node_reboot_scenario injection failed! "
+                "Error was: %s", str(e)
+            )
+            return "error", NodeScenarioErrorOutput(
+                format_exc(), kube_helper.Actions.REBOOT
+            )
 
     return "success", NodeScenarioSuccessOutput(
         nodes_rebooted, kube_helper.Actions.REBOOT
@@ -747,7 +771,7 @@ def node_terminate(
                     )
                     vsphere.release_instances(name)
                     vsphere.wait_until_released(name, cfg.timeout)
-                    nodes_terminated[int(time.time_ns())] = Node(name=name)
+                    _add_node(nodes_terminated, {}, name)
                     logging.info(
                         "Node with instance ID: %s has been released", name
                     )
@@ -6,8 +6,9 @@ from kraken.plugins import pod_plugin
 import kraken.cerberus.setup as cerberus
 import kraken.post_actions.actions as post_actions
 import kraken.kubernetes.client as kubecli
+import kraken.scenario_plan.cache as scenario_plan
+import kraken.recovery.gate as recovery
 import time
-import yaml
 import sys
 import random
 
@@ -49,7 +50,7 @@ def run(kubeconfig_path, scenarios_list, config, failed_post_scenarios, wait_dur
 
         logging.info("Scenario: %s has been successfully injected!" % (pod_scenario[0]))
         logging.info("Waiting for the specified duration: %s" % (wait_duration))
-        time.sleep(wait_duration)
+        recovery.wait(wait_duration)
 
         try:
             failed_post_scenarios = post_actions.check_recovery(
@@ -73,35 +74,34 @@ def container_run(kubeconfig_path, scenarios_list, config, failed_post_scenarios
             pre_action_output = post_actions.run(kubeconfig_path, container_scenario_config[1])
         else:
             pre_action_output = ""
-        with open(container_scenario_config[0], "r") as f:
-            cont_scenario_config = yaml.full_load(f)
-            for cont_scenario in cont_scenario_config["scenarios"]:
-                # capture start time
-                start_time = int(time.time())
-                killed_containers = container_killing_in_pod(cont_scenario)
-
-                if len(container_scenario_config) > 1:
-                    try:
-                        failed_post_scenarios = post_actions.check_recovery(
-                            kubeconfig_path, container_scenario_config, failed_post_scenarios, pre_action_output
-                        )
-                    except Exception as e:
-                        logging.error("Failed to run post action checks: %s" % e)
-                        sys.exit(1)
-                else:
-                    failed_post_scenarios = check_failed_containers(
-                        killed_containers, cont_scenario.get("retry_wait", 120)
+        cont_scenario_config = scenario_plan.load(container_scenario_config[0])
+        for cont_scenario in cont_scenario_config["scenarios"]:
+            # capture start time
+            start_time = int(time.time())
+            killed_containers = container_killing_in_pod(cont_scenario)
+
+            if len(container_scenario_config) > 1:
+                try:
+                    failed_post_scenarios = post_actions.check_recovery(
+                        kubeconfig_path, container_scenario_config, failed_post_scenarios, pre_action_output
                     )
+                except Exception as e:
+                    logging.error("Failed to run post action checks: %s" % e)
+                    sys.exit(1)
+            else:
+                failed_post_scenarios = check_failed_containers(
+                    killed_containers, cont_scenario.get("retry_wait", 120)
+                )
 
-                logging.info("Waiting for the specified duration: %s" % (wait_duration))
-                time.sleep(wait_duration)
+            logging.info("Waiting for the specified duration: %s" % (wait_duration))
+            recovery.wait(wait_duration)
 
-                # capture end time
-                end_time = int(time.time())
+            # capture end time
+            end_time = int(time.time())
 
-                # publish cerberus status
-                cerberus.publish_kraken_status(config, failed_post_scenarios, start_time, end_time)
-                logging.info("")
+            # publish cerberus status
+            cerberus.publish_kraken_status(config, failed_post_scenarios, start_time, end_time)
+            logging.info("")
 
 
 def container_killing_in_pod(cont_scenario):
@@ -128,18 +128,14 @@ def container_killing_in_pod(cont_scenario):
             logging.error("Scenario " + scenario_name + " failed")
             sys.exit(1)
         pods = pod_names
-    # get container and pod name
+    # Target selection only needs pod names and namespaces, the containers
+    # are looked up for the selected pods only
     container_pod_list = []
     for pod in pods:
         if type(pod) == list:
-            pod_output = kubecli.get_pod_info(pod[0], pod[1])
-            container_names = [container.name for container in pod_output.containers]
-
-            container_pod_list.append([pod[0], pod[1], container_names])
+            container_pod_list.append([pod[0], pod[1]])
         else:
-            pod_output = kubecli.get_pod_info(pod, namespace)
-            container_names = [container.name for container in pod_output.containers]
-            container_pod_list.append([pod, namespace, container_names])
+            container_pod_list.append([pod, namespace])
 
     killed_count = 0
     killed_container_list = []
@@ -149,18 +145,29 @@ def container_killing_in_pod(cont_scenario):
             logging.error("Scenario " + scenario_name + " failed")
             sys.exit(1)
         selected_container_pod = container_pod_list[random.randint(0, len(container_pod_list) - 1)]
-        for c_name in selected_container_pod[2]:
+        pod_output = kubecli.get_pod_info(selected_container_pod[0], selected_container_pod[1])
+        for c_name in [container.name for container in pod_output.containers]:
             if container_name != "":
                 if c_name == container_name:
                     killed_container_list.append([selected_container_pod[0], selected_container_pod[1], c_name])
-                    retry_container_killing(kill_action, selected_container_pod[0], selected_container_pod[1], c_name)
                     break
             else:
                 killed_container_list.append([selected_container_pod[0], selected_container_pod[1], c_name])
-                retry_container_killing(kill_action, selected_container_pod[0], selected_container_pod[1], c_name)
                 break
         container_pod_list.remove(selected_container_pod)
         killed_count += 1
+
+    # Kill all the selected containers concurrently
+    for killed_container in killed_container_list:
+        logging.info(
+            "Killing container %s in pod %s (ns %s)"
+            % (str(killed_container[2]), str(killed_container[0]), str(killed_container[1]))
+        )
+    results = kubecli.exec_cmd_in_pods(kill_action, [tuple(container) for container in killed_container_list])
+    for result in results:
+        # Blank response means it is done, retry the others
+        if result.output:
+            retry_container_killing(kill_action, result.pod, result.namespace, result.container)
     logging.info("Scenario " + scenario_name + " successfully injected")
     return killed_container_list
 
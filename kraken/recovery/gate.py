@@ -0,0 +1,200 @@
+import logging
+import threading
+import time
+
+import kraken.kubernetes.client as kubecli
+import kraken.kubernetes.instrumentation as api_instrumentation
+
+# sleep waits the whole duration after a scenario like before, gate waits
+# until the conditions hold with the duration as upper bound
+MODES = ("sleep", "gate")
+CONDITIONS = ("nodes_ready", "workloads_available", "namespaces_active")
+# Number of consecutive checks the conditions have to hold on, so a fault
+# the controllers did not report yet is not taken for a recovery
+CONSECUTIVE_CHECKS = 2
+
+mode = "sleep"
+conditions = list(CONDITIONS)
+poll_interval = 5
+
+_records = []
+_lock = threading.Lock()
+
+
+def configure(
+    recovery_mode="sleep",
+    recovery_conditions=None,
+    recovery_poll_interval=5
+):
+    """
+    Configures how the scenarios wait for the cluster to recover
+
+    Args:
+        recovery_mode (string)
+            - sleep or gate
+
+        recovery_conditions (list)
+            - Conditions the gate waits for, all of them when not set:
+              nodes_ready: every node is Ready
+              workloads_available: the deployments, statefulsets and
+              daemonsets of the targeted namespaces, or of the cluster when
+              the scenario does not target namespaces, are available
+              namespaces_active: the targeted namespaces, or all of them,
+              are Active
+
+        recovery_poll_interval (int)
+            - Seconds between two checks of the conditions
+    """
+
+    global mode, conditions, poll_interval
+    if recovery_mode not in MODES:
+        logging.error(
+            "Unsupported recovery mode %s, using sleep" % recovery_mode
+        )
+        recovery_mode = "sleep"
+    if recovery_conditions is None:
+        recovery_conditions = list(CONDITIONS)
+    unknown = [c for c in recovery_conditions if c not in CONDITIONS]
+    if unknown:
+        logging.error(
+            "Ignoring unknown recovery conditions: %s" % ", ".join(unknown)
+        )
+    mode = recovery_mode
+    conditions = [c for c in recovery_conditions if c not in unknown]
+    poll_interval = max(1, int(recovery_poll_interval))
+
+
+def _namespaces(namespaces):
+    # An empty name, e.g. of a scenario without namespace, targets the
+    # cluster like no namespaces
+    if isinstance(namespaces, str):
+        namespaces = [namespaces]
+    return [name for name in namespaces or [] if name] or None
+
+
+def check(namespaces=None):
+    """
+    Returns what does not satisfy the configured conditions yet, an empty
+    list when the cluster recovered. The objects are listed from the API
+    server, not from the cluster cache which keeps serving the last objects
+    it saw while its watches fail. An error of the API server, e.g. while
+    the control plane restarts, counts as not recovered
+    """
+
+    namespaces = _namespaces(namespaces)
+    failing = []
+    try:
+        if "nodes_ready" in conditions:
+            _, not_ready = kubecli.sweep_node_health(consistent=True)
+            failing.extend("node/%s" % node for node in not_ready)
+        if "namespaces_active" in conditions:
+            _, not_active = kubecli.sweep_namespace_status(
+                namespaces,
+                consistent=True
+            )
+            failing.extend("namespace/%s" % name for name in not_active)
+        if "workloads_available" in conditions:
+            for namespace in namespaces or [None]:
+                _, unavailable = kubecli.sweep_workload_availability(
+                    namespace
+                )
+                failing.extend(unavailable)
+    except Exception as e:
+        failing.append("error: %s" % e)
+    return failing
+
+
+def wait(wait_duration, namespaces=None, scenario=None):
+    """
+    Waits for the cluster to recover after a scenario. In sleep mode it
+    sleeps wait_duration, in gate mode it returns as soon as the conditions
+    held on CONSECUTIVE_CHECKS consecutive checks and at the latest after
+    wait_duration. The time to recover is the time until then
+
+    Args:
+        wait_duration (int)
+            - Seconds to wait, the upper bound in gate mode
+
+        namespaces (list)
+            - Namespaces targeted by the scenario, where the workloads and
+              the namespaces are checked
+
+        scenario (string)
+            - Name recorded with the time to recover, defaults to the
+              scenario type running in the calling thread
+
+    Returns:
+        Seconds waited
+    """
+
+    if mode != "gate":
+        time.sleep(wait_duration)
+        return wait_duration
+    scenario = scenario or api_instrumentation.get_scenario()
+    start_time = time.time()
+    deadline = start_time + wait_duration
+    logging.info(
+        "Waiting up to %s seconds for the cluster to recover: %s"
+        % (wait_duration, ", ".join(conditions))
+    )
+    passed = 0
+    while True:
+        failing = check(namespaces)
+        elapsed = time.time() - start_time
+        passed = 0 if failing else passed + 1
+        if passed >= CONSECUTIVE_CHECKS:
+            logging.info(
+                "%s recovered in %.1f seconds" % (scenario, elapsed)
+            )
+            break
+        remaining = deadline - time.time()
+        if remaining <= 0 and failing:
+            logging.warning(
+                "%s did not recover in %s seconds, still failing: %s"
+                % (scenario, wait_duration, ", ".join(failing[:10]))
+            )
+            break
+        if remaining <= 0:
+            logging.info(
+                "%s recovered at the upper bound of %s seconds"
+                % (scenario, wait_duration)
+            )
+            break
+        time.sleep(min(poll_interval, remaining))
+    with _lock:
+        _records.append({
+            "scenario": scenario,
+            "recovered": not failing,
+            "time_to_recover": None if failing else round(elapsed, 1),
+            "wait_duration": wait_duration,
+            "failing": failing,
+        })
+    return elapsed
+
+
+def records():
+    """Returns the recoveries recorded by the gate"""
+    with _lock:
+        return [dict(record) for record in _records]
+
+
+def log_summary():
+    recoveries = records()
+    if not recoveries:
+        return
+    logging.info("Time to recover of the scenarios:")
+    logging.info("%-36s %12s %12s" % ("scenario", "recovery (s)", "bound (s)"))
+    for record in recoveries:
+        logging.info(
+            "%-36s %12s %12s" % (
+                record["scenario"],
+                record["time_to_recover"]
+                if record["recovered"] else "not recovered",
+                record["wait_duration"],
+            )
+        )
+
+
+def clear():
+    with _lock:
+        del _records[:]
@@ -0,0 +1,251 @@
+import dataclasses
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+# Keys of a chaos_scenarios entry which are not a scenario type
+RESERVED_KEYS = ("name", "group", "after")
+# Group of the entries which do not set one, so a config without groups
+# runs its scenarios one after the other like before
+DEFAULT_GROUP = "default"
+
+
+@dataclasses.dataclass
+class ScenarioEntry:
+    """An entry of chaos_scenarios with its scheduling constraints"""
+    name: str
+    scenario_type: str
+    scenarios_list: list
+    group: str
+    after: List[str]
+    dependencies: List[str] = dataclasses.field(default_factory=list)
+
+
+def parse_scenarios(chaos_scenarios) -> List[ScenarioEntry]:
+    """
+    Parses the chaos_scenarios of the config into a dependency graph. Besides
+    the scenario type, every entry can set:
+
+        name: unique name of the entry, defaults to <scenario type>-<index>
+        group: entries of the same group run one after the other in the
+            order of the config, different groups run in parallel. Entries
+            without group belong to the "default" group
+        after: names of entries or groups which must be completed before
+            the entry starts
+
+    Example:
+        chaos_scenarios:
+            -   name: etcd
+                group: control-plane
+                plugin_scenarios:
+                    - scenarios/openshift/etcd.yml
+            -   group: workers
+                node_scenarios:
+                    - scenarios/openshift/node_scenarios_example.yml
+            -   after: [control-plane, workers]
+                zone_outages:
+                    - scenarios/openshift/zone_outage.yaml
+
+    Returns:
+        List of ScenarioEntry objects in the order of the config
+
+    Raises:
+        Exception if an entry is invalid, references an unknown entry or
+        group, or if the dependencies form a cycle
+    """
+
+    entries: List[ScenarioEntry] = []
+    by_name: Dict[str, ScenarioEntry] = {}
+    groups: Dict[str, List[ScenarioEntry]] = {}
+    for index, scenario in enumerate(chaos_scenarios or []):
+        scenario_types = [key for key in scenario if key not in RESERVED_KEYS]
+        if len(scenario_types) != 1:
+            raise Exception(
+                "Entry %s of chaos_scenarios must have exactly one scenario "
+                "type, found %s" % (index, ", ".join(scenario_types) or "none")
+            )
+        scenario_type = scenario_types[0]
+        name = str(scenario.get("name") or "%s-%s" % (scenario_type, index))
+        if name in by_name:
+            raise Exception("Duplicate chaos_scenarios entry name: %s" % name)
+        after = scenario.get("after") or []
+        if isinstance(after, str):
+            after = [after]
+        entry = ScenarioEntry(
+            name=name,
+            scenario_type=scenario_type,
+            scenarios_list=scenario[scenario_type],
+            group=str(scenario.get("group") or DEFAULT_GROUP),
+            after=[str(reference) for reference in after],
+        )
+        group = groups.setdefault(entry.group, [])
+        if group:
+            entry.dependencies.append(group[-1].name)
+        group.append(entry)
+        entries.append(entry)
+        by_name[name] = entry
+
+    for entry in entries:
+        for reference in entry.after:
+            if reference in by_name:
+                dependencies = [by_name[reference]]
+            elif reference in groups:
+                dependencies = groups[reference]
+            else:
+                raise Exception(
+                    "Entry %s of chaos_scenarios runs after %s, which is "
+                    "neither an entry nor a group" % (entry.name, reference)
+                )
+            for dependency in dependencies:
+                if dependency is entry:
+                    raise Exception(
+                        "Entry %s of chaos_scenarios cannot run after "
+                        "itself" % entry.name
+                    )
+                if dependency.name not in entry.dependencies:
+                    entry.dependencies.append(dependency.name)
+    _check_cycles(entries)
+    return entries
+
+
+def _check_cycles(entries: List[ScenarioEntry]):
+    remaining = {entry.name: set(entry.dependencies) for entry in entries}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise Exception(
+                "The dependencies of the chaos_scenarios entries form a "
+                "cycle between: %s" % ", ".join(sorted(remaining))
+            )
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def _merge(lists) -> list:
+    merged = []
+    for items in lists:
+        for item in items or []:
+            if item not in merged:
+                merged.append(item)
+    return merged
+
+
+def run_scenarios(
+    entries: List[ScenarioEntry],
+    run_entry: Callable[[ScenarioEntry, list], list],
+    max_parallel: int = 1,
+    can_start: Optional[Callable[[], bool]] = None,
+    failed_post_scenarios: Optional[list] = None,
+) -> list:
+    """
+    Runs the entries as soon as their dependencies are completed, at most
+    max_parallel at a time. Entries are started in the order of the config
+    among the ones which are ready
+
+    Args:
+        entries (list)
+            - ScenarioEntry objects returned by parse_scenarios
+
+        run_entry (function)
+            - Called with the entry and the failed post scenarios of its
+              dependencies, returns the failed post scenarios after running
+              it
+
+        max_parallel (int)
+            - Maximum number of entries running at the same time
+
+        can_start (function)
+            - Called before starting every entry, returning False stops
+              starting new entries, the running ones are waited for
+
+        failed_post_scenarios (list)
+            - Failed post scenarios passed to the entries without
+              dependencies
+
+    Returns:
+        Failed post scenarios of the last entries run, i.e. the ones no
+        other completed entry depends on
+
+    Raises:
+        The first exception raised by an entry, once the running entries
+        are completed. The entries depending on it are not started.
+        An exception raised in the calling thread while it waits, e.g. the
+        SystemExit of a SIGTERM handler, is raised right away without
+        waiting for the running entries, the entries not started yet are
+        cancelled
+    """
+
+    max_parallel = max(1, int(max_parallel))
+    initial = list(failed_post_scenarios or [])
+    outputs: Dict[str, list] = {}
+    pending = list(entries)
+    running = {}
+    stopped = False
+    error = None
+    executor = ThreadPoolExecutor(max_workers=max_parallel)
+    try:
+        while pending or running:
+            for entry in list(pending):
+                if stopped or len(running) >= max_parallel:
+                    break
+                if not all(dep in outputs for dep in entry.dependencies):
+                    continue
+                if can_start and not can_start():
+                    stopped = True
+                    break
+                if entry.dependencies:
+                    inputs = _merge(outputs[dep] for dep in entry.dependencies)
+                else:
+                    inputs = list(initial)
+                logging.info(
+                    "Starting %s (%s, group %s)"
+                    % (entry.name, entry.scenario_type, entry.group)
+                )
+                future = executor.submit(_timed, run_entry, entry, inputs)
+                running[future] = entry
+                pending.remove(entry)
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                entry = running.pop(future)
+                try:
+                    outputs[entry.name] = future.result() or []
+                except BaseException as e:
+                    logging.error("%s failed: %s" % (entry.name, e))
+                    error = error or e
+                    stopped = True
+    except BaseException:
+        # SIGTERM raises SystemExit in the main thread while it waits for the
+        # entries: do not block until the running ones end like a with
+        # block would, and cancel the ones which did not start
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    if error is not None:
+        raise error
+    for entry in pending:
+        logging.info("%s was not started" % entry.name)
+    depended_on = set()
+    for entry in entries:
+        if entry.name in outputs:
+            depended_on.update(entry.dependencies)
+    return _merge(
+        outputs[entry.name]
+        for entry in entries
+        if entry.name in outputs and entry.name not in depended_on
+    )
+
+
+def _timed(run_entry, entry, inputs):
+    start_time = time.time()
+    try:
+        return run_entry(entry, inputs)
+    finally:
+        logging.info(
+            "%s completed in %.1f seconds"
+            % (entry.name, time.time() - start_time)
+        )
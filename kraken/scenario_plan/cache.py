@@ -0,0 +1,175 @@
+import copy
+import hashlib
+import logging
+import os
+import threading
+
+import yaml
+
+# Extensions of the scenario files parsed as YAML, the other files of the
+# scenarios (e.g. post action scripts) are only checked for existence
+YAML_EXTENSIONS = (".yml", ".yaml")
+
+_entries = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+class _Entry:
+    """Compiled artifact of a file and the signature it was compiled from"""
+
+    def __init__(self, signature, digest, value):
+        self.signature = signature
+        self.digest = digest
+        self.value = value
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def get(path, compiler, name=None):
+    """
+    Returns the artifact compiled from a file, compiling it only when the
+    file changed since the last call. A file is considered unchanged when
+    its mtime and size did not change, or when its content hash did not
+    change (e.g. the file was only touched)
+
+    Args:
+        path (string)
+            - Path of the file
+
+        compiler (function)
+            - Called with the absolute path of the file, returns the
+              compiled artifact. It must not be modified by the callers
+
+        name (string)
+            - Name of the compiler, defaults to its qualified name. The same
+              file can be compiled by several compilers
+
+    Returns:
+        The compiled artifact
+    """
+
+    path = os.path.abspath(path)
+    key = (path, name or compiler.__qualname__)
+    signature = _signature(path)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry.signature == signature:
+            _stats["hits"] += 1
+            return entry.value
+    digest = _digest(path)
+    if entry is not None and entry.digest == digest:
+        with _lock:
+            entry.signature = signature
+            _stats["hits"] += 1
+        return entry.value
+    if entry is not None:
+        logging.info("Scenario file %s changed, compiling it again" % path)
+    value = compiler(path)
+    with _lock:
+        _entries[key] = _Entry(signature, digest, value)
+        _stats["misses"] += 1
+    return value
+
+
+def _load_yaml(path):
+    with open(path, "r") as f:
+        return yaml.full_load(f)
+
+
+def load(path):
+    """
+    Returns the parsed content of a YAML scenario file. The file is parsed
+    once and then only when it changes, every call returns its own copy so
+    the callers can modify it
+    """
+
+    return copy.deepcopy(get(path, _load_yaml, "yaml"))
+
+
+def _files(scenarios_list):
+    # Only the first element of a [scenario, post action] pair is a scenario
+    # file, the post action can also be a shell command or empty
+    for item in scenarios_list or []:
+        if isinstance(item, (list, tuple)):
+            item = item[0] if item else None
+        if isinstance(item, str):
+            yield item
+
+
+def _freeze(value):
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def compile_plan(entries, compilers=None):
+    """
+    Parses and validates the scenario files of the chaos_scenarios entries,
+    but not their post actions, up front so the scenarios read them from the
+    cache during the run and an invalid file fails the run before any chaos
+    is injected. The scenarios_list of every entry is frozen into tuples
+
+    Args:
+        entries (list)
+            - ScenarioEntry objects, see kraken.scenario_groups.executor
+
+        compilers (dict)
+            - Maps a scenario type to a function compiling and validating
+              one of its files, called through get() with the scenario type
+              as name, or to None to only check that its files exist. The
+              YAML files of the other scenario types are parsed
+
+    Raises:
+        Exception if a scenario file is missing or invalid
+    """
+
+    compilers = compilers or {}
+    for entry in entries:
+        entry.scenarios_list = _freeze(entry.scenarios_list)
+        compiler = compilers.get(entry.scenario_type, _load_yaml)
+        for path in _files(entry.scenarios_list):
+            if "://" in path:
+                # Remote files, e.g. litmus experiments, are fetched later
+                continue
+            if not os.path.isfile(path):
+                raise Exception(
+                    "Scenario file %s of %s does not exist"
+                    % (path, entry.name)
+                )
+            try:
+                if compiler is _load_yaml:
+                    if path.endswith(YAML_EXTENSIONS):
+                        get(path, _load_yaml, "yaml")
+                elif compiler is not None:
+                    get(path, compiler, entry.scenario_type)
+            except Exception as e:
+                raise Exception(
+                    "Invalid scenario file %s of %s: %s"
+                    % (path, entry.name, e)
+                )
+    logging.info(
+        "Compiled %s scenario files of %s chaos_scenarios entries"
+        % (len(_entries), len(entries))
+    )
+
+
+def stats():
+    """Returns the number of cache hits and misses"""
+    with _lock:
+        return dict(_stats)
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+        _stats["hits"] = 0
+        _stats["misses"] = 0
@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 
 import sys
-import yaml
 import logging
 import time
 from multiprocessing.pool import ThreadPool
@@ -9,10 +8,9 @@ from multiprocessing.pool import ThreadPool
 from ..cerberus import setup as cerberus
 from ..kubernetes import client as kubecli
 from ..post_actions import actions as post_actions
-from ..node_actions.aws_node_scenarios import AWS
-from ..node_actions.openstack_node_scenarios import OPENSTACKCLOUD
-from ..node_actions.az_node_scenarios import Azure
-from ..node_actions.gcp_node_scenarios import GCP
+from ..scenario_plan import cache as scenario_plan
+from ..recovery import gate as recovery
+from ..node_actions import providers
 
 
 def multiprocess_nodes(cloud_object_function, nodes):
@@ -45,14 +43,8 @@ def cluster_shut_down(shut_down_config):
     shut_down_duration = shut_down_config["shut_down_duration"]
     cloud_type = shut_down_config["cloud_type"]
     timeout = shut_down_config["timeout"]
-    if cloud_type.lower() == "aws":
-        cloud_object = AWS()
-    elif cloud_type.lower() == "gcp":
-        cloud_object = GCP()
-    elif cloud_type.lower() == "openstack":
-        cloud_object = OPENSTACKCLOUD()
-    elif cloud_type.lower() in ["azure", "az"]:
-        cloud_object = Azure()
+    if cloud_type.lower() in providers.CLOUD_CLIENTS:
+        cloud_object = providers.CLOUD_CLIENTS.get(cloud_type.lower())()
     else:
         logging.error(
             "Cloud type %s is not currently supported for cluster shut down" %
@@ -119,9 +111,9 @@ def cluster_shut_down(shut_down_config):
                     restarted_nodes.remove(node)
             not_running_nodes = restarted_nodes.copy()
         logging.info(
-            "Waiting for 150s to allow cluster component initialization"
+            "Waiting up to 150s to allow cluster component initialization"
         )
-        time.sleep(150)
+        recovery.wait(150)
 
         logging.info("Successfully injected cluster_shut_down scenario!")
 
@@ -133,23 +125,22 @@ def run(scenarios_list, config, wait_duration):
             pre_action_output = post_actions.run("", shut_down_config[1])
         else:
             pre_action_output = ""
-        with open(shut_down_config[0], "r") as f:
-            shut_down_config_yaml = yaml.full_load(f)
-            shut_down_config_scenario = \
-                shut_down_config_yaml["cluster_shut_down_scenario"]
-            start_time = int(time.time())
-            cluster_shut_down(shut_down_config_scenario)
-            logging.info(
-                "Waiting for the specified duration: %s" % (wait_duration)
-            )
-            time.sleep(wait_duration)
-            failed_post_scenarios = post_actions.check_recovery(
-                "", shut_down_config, failed_post_scenarios, pre_action_output
-            )
-            end_time = int(time.time())
-            cerberus.publish_kraken_status(
-                config,
-                failed_post_scenarios,
-                start_time,
-                end_time
-            )
+        shut_down_config_yaml = scenario_plan.load(shut_down_config[0])
+        shut_down_config_scenario = \
+            shut_down_config_yaml["cluster_shut_down_scenario"]
+        start_time = int(time.time())
+        cluster_shut_down(shut_down_config_scenario)
+        logging.info(
+            "Waiting for the specified duration: %s" % (wait_duration)
+        )
+        recovery.wait(wait_duration)
+        failed_post_scenarios = post_actions.check_recovery(
+            "", shut_down_config, failed_post_scenarios, pre_action_output
+        )
+        end_time = int(time.time())
+        cerberus.publish_kraken_status(
+            config,
+            failed_post_scenarios,
+            start_time,
+            end_time
+        )
@@ -3,12 +3,13 @@ import time
 import logging
 import re
 import sys
-import yaml
 import random
 
 from ..cerberus import setup as cerberus
 from ..kubernetes import client as kubecli
 from ..invoke import command as runcommand
+from ..scenario_plan import cache as scenario_plan
+from ..recovery import gate as recovery
 
 
 def pod_exec(pod_name, command, namespace, container_name):
@@ -128,54 +129,30 @@ def skew_time(scenario):
                 "please check"
             )
             sys.exit(1)
-        pod_counter = 0
+        # Every entry is a [pod name, namespace] pair at this point
         for pod in pod_names:
-            if len(pod) > 1:
-                selected_container_name = get_container_name(
-                    pod[0],
-                    pod[1],
-                    container_name
-                )
-                pod_exec_response = pod_exec(
-                    pod[0],
-                    skew_command,
-                    pod[1],
-                    selected_container_name
-                )
-                if pod_exec_response is False:
-                    logging.error(
-                        "Couldn't reset time on container %s "
-                        "in pod %s in namespace %s"
-                        % (selected_container_name, pod[0], pod[1])
-                    )
-                    sys.exit(1)
-                pod_names[pod_counter].append(selected_container_name)
-            else:
-                selected_container_name = get_container_name(
-                    pod,
-                    scenario["namespace"],
-                    container_name
-                )
-                pod_exec_response = pod_exec(
-                    pod,
-                    skew_command,
-                    scenario["namespace"],
-                    selected_container_name
+            pod.append(get_container_name(pod[0], pod[1], container_name))
+        results = kubecli.exec_cmd_in_pods(
+            skew_command,
+            [(pod[0], pod[1], pod[2]) for pod in pod_names]
+        )
+        for pod, result in zip(pod_names, results):
+            response = result.output
+            if (
+                not response or
+                "unauthorized" in response.lower() or
+                "authorization" in response.lower()
+            ):
+                # Retry the containers the command did not go through
+                response = pod_exec(pod[0], skew_command, pod[1], pod[2])
+            if response is False:
+                logging.error(
+                    "Couldn't reset time on container %s "
+                    "in pod %s in namespace %s"
+                    % (pod[2], pod[0], pod[1])
                 )
-                if pod_exec_response is False:
-                    logging.error(
-                        "Couldn't reset time on container "
-                        "%s in pod %s in namespace %s"
-                        % (
-                            selected_container_name,
-                            pod,
-                            scenario["namespace"]
-                        )
-                    )
-                    sys.exit(1)
-                pod_names[pod_counter].append(selected_container_name)
+                sys.exit(1)
             logging.info("Reset date/time on pod " + str(pod[0]))
-            pod_counter += 1
         return "pod", pod_names
 
 
@@ -249,64 +226,61 @@ def check_date_time(object_type, names):
                     "Date in node " + str(node_name) + " reset properly"
                 )
     elif object_type == "pod":
-        for pod_name in names:
-            first_date_time = datetime.datetime.utcnow()
-            counter = 0
-            pod_datetime_string = pod_exec(
-                pod_name[0],
+        first_date_time = datetime.datetime.utcnow()
+        pending = list(names)
+        counter = 0
+        while pending:
+            results = kubecli.exec_cmd_in_pods(
                 skew_command,
-                pod_name[1],
-                pod_name[2]
+                [tuple(pod_name[:3]) for pod_name in pending]
             )
-            pod_datetime = string_to_date(pod_datetime_string)
-            while not (
-                first_date_time < pod_datetime < datetime.datetime.utcnow()
-            ):
-                time.sleep(10)
-                logging.info(
-                    "Date/time on pod %s still not reset, "
-                    "waiting 10 seconds and retrying" % pod_name[0]
-                )
-                pod_datetime = pod_exec(
-                    pod_name[0],
-                    skew_command,
-                    pod_name[1],
-                    pod_name[2]
-                )
-                pod_datetime = string_to_date(pod_datetime)
-                counter += 1
-                if counter > max_retries:
+            not_reset_yet = []
+            for pod_name, result in zip(pending, results):
+                pod_datetime = string_to_date(result.output)
+                if first_date_time < pod_datetime < datetime.datetime.utcnow():
+                    logging.info(
+                        "Date in pod " + str(pod_name[0]) + " reset properly"
+                    )
+                else:
+                    not_reset_yet.append(pod_name)
+            pending = not_reset_yet
+            if not pending:
+                break
+            counter += 1
+            if counter > max_retries:
+                for pod_name in pending:
                     logging.error(
                         "Date and time in pod %s didn't reset properly" %
                         pod_name[0]
                     )
                     not_reset.append(pod_name[0])
-                    break
-            if counter < max_retries:
-                logging.info(
-                    "Date in pod " + str(pod_name[0]) + " reset properly"
-                )
+                break
+            logging.info(
+                "Date/time on pods %s still not reset, "
+                "waiting 10 seconds and retrying"
+                % [pod_name[0] for pod_name in pending]
+            )
+            time.sleep(10)
     return not_reset
 
 
 def run(scenarios_list, config, wait_duration):
     for time_scenario_config in scenarios_list:
-        with open(time_scenario_config, "r") as f:
-            scenario_config = yaml.full_load(f)
-            for time_scenario in scenario_config["time_scenarios"]:
-                start_time = int(time.time())
-                object_type, object_names = skew_time(time_scenario)
-                not_reset = check_date_time(object_type, object_names)
-                if len(not_reset) > 0:
-                    logging.info("Object times were not reset")
-                logging.info(
-                    "Waiting for the specified duration: %s" % (wait_duration)
-                )
-                time.sleep(wait_duration)
-                end_time = int(time.time())
-                cerberus.publish_kraken_status(
-                    config,
-                    not_reset,
-                    start_time,
-                    end_time
-                )
+        scenario_config = scenario_plan.load(time_scenario_config)
+        for time_scenario in scenario_config["time_scenarios"]:
+            start_time = int(time.time())
+            object_type, object_names = skew_time(time_scenario)
+            not_reset = check_date_time(object_type, object_names)
+            if len(not_reset) > 0:
+                logging.info("Object times were not reset")
+            logging.info(
+                "Waiting for the specified duration: %s" % (wait_duration)
+            )
+            recovery.wait(wait_duration)
+            end_time = int(time.time())
+            cerberus.publish_kraken_status(
+                config,
+                not_reset,
+                start_time,
+                end_time
+            )
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 
+import atexit
 import os
+import signal
 import sys
 import yaml
 import logging
@@ -9,20 +11,13 @@ import pyfiglet
 import uuid
 import time
 import kraken.kubernetes.client as kubecli
-import kraken.litmus.common_litmus as common_litmus
-import kraken.time_actions.common_time_functions as time_actions
-import kraken.performance_dashboards.setup as performance_dashboards
-import kraken.pod_scenarios.setup as pod_scenarios
-import kraken.namespace_actions.common_namespace_functions as namespace_actions
-import kraken.shut_down.common_shut_down_func as shut_down
-import kraken.node_actions.run as nodeaction
-import kraken.kube_burner.client as kube_burner
-import kraken.zone_outage.actions as zone_outages
-import kraken.application_outage.actions as application_outage
-import kraken.pvc.pvc_scenario as pvc_scenario
-import kraken.network_chaos.actions as network_chaos
+import kraken.kubernetes.registry as kube_registry
+import kraken.kubernetes.instrumentation as api_instrumentation
+import kraken.lazy_import.registry as lazy_import
+import kraken.recovery.gate as recovery
+import kraken.scenario_groups.executor as scenario_groups
+import kraken.scenario_plan.cache as scenario_plan
 import server as server
-from kraken import plugins
 
 KUBE_BURNER_URL = (
     "https://github.com/cloud-bulldozer/kube-burner/"
@@ -30,6 +25,38 @@ KUBE_BURNER_URL = (
 )
 KUBE_BURNER_VERSION = "0.9.1"
 
+# Module running every scenario type, imported when the first entry of the
+# type runs so that the startup does not import the scenarios and the cloud
+# SDKs a config does not use
+SCENARIO_HANDLERS = lazy_import.Registry(
+    "scenario type",
+    {
+        "plugin_scenarios": "kraken.plugins",
+        "container_scenarios": "kraken.pod_scenarios.setup",
+        "node_scenarios": "kraken.node_actions.run",
+        "time_scenarios": "kraken.time_actions.common_time_functions",
+        "litmus_scenarios": "kraken.litmus.common_litmus",
+        "cluster_shut_down_scenarios": "kraken.shut_down.common_shut_down_func",
+        "namespace_scenarios":
+            "kraken.namespace_actions.common_namespace_functions",
+        "zone_outages": "kraken.zone_outage.actions",
+        "application_outages": "kraken.application_outage.actions",
+        "pvc_scenarios": "kraken.pvc.pvc_scenario",
+        "network_chaos": "kraken.network_chaos.actions",
+    }
+)
+kube_burner = lazy_import.module("kraken.kube_burner.client")
+# Only imported by the scenarios using the asyncio clients
+async_kubecli = lazy_import.module("kraken.kubernetes.async_client")
+performance_dashboards = lazy_import.module(
+    "kraken.performance_dashboards.setup"
+)
+
+
+def compile_plugin_scenario(path):
+    plugins = SCENARIO_HANDLERS.get("plugin_scenarios")
+    return plugins.PLUGINS.compile(path)
+
 
 # Main function
 def main(cfg):
@@ -50,6 +77,26 @@ def main(cfg):
         )
         port = config["kraken"].get("port", "8081")
         run_signal = config["kraken"].get("signal_state", "RUN")
+        cache_cluster_objects = config["kraken"].get(
+            "cache_cluster_objects", True
+        )
+        wire_format = config["kraken"].get("wire_format", "json")
+        cache_snapshot_path = config["kraken"].get(
+            "cache_snapshot_path", "kraken_cache_snapshot.json"
+        )
+        connection_pool_size = config["kraken"].get(
+            "connection_pool_size", 20
+        )
+        connection_keep_alive = config["kraken"].get(
+            "connection_keep_alive", True
+        )
+        api_qps = config["kraken"].get("api_qps", 50)
+        api_burst = config["kraken"].get("api_burst", 100)
+        api_max_in_flight = config["kraken"].get("api_max_in_flight", 200)
+        api_transport = config["kraken"].get("api_transport", "http1")
+        api_metrics_path = config["kraken"].get(
+            "api_metrics_path", "kraken_api_metrics.json"
+        )
         litmus_install = config["kraken"].get("litmus_install", True)
         litmus_version = config["kraken"].get("litmus_version", "v1.9.1")
         litmus_uninstall = config["kraken"].get("litmus_uninstall", False)
@@ -59,6 +106,16 @@ def main(cfg):
         wait_duration = config["tunings"].get("wait_duration", 60)
         iterations = config["tunings"].get("iterations", 1)
         daemon_mode = config["tunings"].get("daemon_mode", False)
+        max_parallel_scenarios = config["tunings"].get(
+            "max_parallel_scenarios", 4
+        )
+        recovery_mode = config["tunings"].get("recovery_mode", "sleep")
+        recovery_conditions = config["tunings"].get(
+            "recovery_conditions", None
+        )
+        recovery_poll_interval = config["tunings"].get(
+            "recovery_poll_interval", 5
+        )
         deploy_performance_dashboards = config["performance_monitoring"].get(
             "deploy_dashboards", False
         )
@@ -100,9 +157,59 @@ def main(cfg):
                 kubeconfig_path
             )
             sys.exit(1)
+        # Validate the groups and dependencies of the scenarios and compile
+        # their files
+        try:
+            scenario_entries = scenario_groups.parse_scenarios(
+                chaos_scenarios
+            )
+            # Parse and validate every scenario file once, the iterations
+            # read them from the plan cache
+            scenario_plan.compile_plan(
+                scenario_entries,
+                {
+                    "plugin_scenarios": compile_plugin_scenario,
+                    "litmus_scenarios": None,
+                }
+            )
+        except Exception as e:
+            logging.error("Invalid chaos_scenarios: %s" % e)
+            sys.exit(1)
+
         logging.info("Initializing client to talk to the Kubernetes cluster")
         os.environ["KUBECONFIG"] = str(kubeconfig_path)
-        kubecli.initialize_clients(kubeconfig_path)
+        kube_registry.configure(
+            connection_pool_size,
+            connection_keep_alive,
+            api_qps,
+            api_burst,
+            api_transport,
+            api_max_in_flight
+        )
+        # In daemon mode, persist the cluster cache on shutdown so that a
+        # restarted Kraken resumes its watches instead of listing again
+        if not (daemon_mode and cache_cluster_objects):
+            cache_snapshot_path = None
+        kubecli.initialize_clients(
+            kubeconfig_path,
+            cache_cluster_objects,
+            wire_format,
+            cache_snapshot_path
+        )
+        recovery.configure(
+            recovery_mode,
+            recovery_conditions,
+            recovery_poll_interval
+        )
+        if cache_snapshot_path:
+            atexit.register(kubecli.save_cache_snapshot, cache_snapshot_path)
+            # Exit through sys.exit so the snapshot is saved, with the
+            # status of a process killed by the signal so that the
+            # interrupted run is not reported as a success
+            signal.signal(
+                signal.SIGTERM,
+                lambda signum, frame: sys.exit(128 + signum)
+            )
 
         # find node kraken might be running on
         kubecli.find_kraken_node()
@@ -175,177 +282,200 @@ def main(cfg):
         # Capture the start time
         start_time = int(time.time())
         litmus_installed = False
-
-        # Loop to run the chaos starts here
-        while int(iteration) < iterations and run_signal != "STOP":
-            # Inject chaos scenarios specified in the config
-            logging.info("Executing scenarios for iteration " + str(iteration))
-            if chaos_scenarios:
-                for scenario in chaos_scenarios:
-                    if publish_running_status:
-                        run_signal = server.get_status(address)
-                    if run_signal == "PAUSE":
-                        while publish_running_status and run_signal == "PAUSE":
-                            logging.info(
-                                "Pausing Kraken run, waiting for %s seconds"
-                                " and will re-poll signal"
-                                % str(wait_duration)
-                            )
-                            time.sleep(wait_duration)
-                            run_signal = server.get_status(address)
-                    if run_signal == "STOP":
-                        logging.info("Received STOP signal; ending Kraken run")
-                        break
-                    scenario_type = list(scenario.keys())[0]
-                    scenarios_list = scenario[scenario_type]
-                    if scenarios_list:
-                        # Inject pod chaos scenarios specified in the config
-                        if scenario_type == "pod_scenarios":
-                            logging.error(
-                                "Pod scenarios have been removed, please use "
-                                "plugin_scenarios with the "
-                                "kill-pods configuration instead."
+        litmus_namespace = "litmus"
+
+        def check_run_signal():
+            nonlocal run_signal
+            if publish_running_status:
+                # The server updates the shared state, no need to query it
+                run_signal = server.run_state.get()
+            while publish_running_status and run_signal == "PAUSE":
+                logging.info(
+                    "Pausing Kraken run until the signal is set to RUN or "
+                    "STOP, will report again in %s seconds"
+                    % str(wait_duration)
+                )
+                run_signal = server.run_state.wait_while(
+                    "PAUSE",
+                    wait_duration or None
+                )
+            if run_signal == "STOP":
+                logging.info("Received STOP signal; ending Kraken run")
+                return False
+            return True
+
+        def run_scenario(entry, failed_post_scenarios):
+            nonlocal litmus_installed
+            scenario_type = entry.scenario_type
+            scenarios_list = entry.scenarios_list
+            api_instrumentation.set_scenario(scenario_type)
+            if scenarios_list:
+                if scenario_type in SCENARIO_HANDLERS:
+                    handler = SCENARIO_HANDLERS.get(scenario_type)
+                # Inject pod chaos scenarios specified in the config
+                if scenario_type == "pod_scenarios":
+                    logging.error(
+                        "Pod scenarios have been removed, please use "
+                        "plugin_scenarios with the "
+                        "kill-pods configuration instead."
+                    )
+                    sys.exit(1)
+                elif scenario_type == "plugin_scenarios":
+                    failed_post_scenarios = handler.run(
+                        scenarios_list,
+                        kubeconfig_path,
+                        failed_post_scenarios
+                    )
+                elif scenario_type == "container_scenarios":
+                    logging.info("Running container scenarios")
+                    failed_post_scenarios = \
+                        handler.container_run(
+                            kubeconfig_path,
+                            scenarios_list,
+                            config,
+                            failed_post_scenarios,
+                            wait_duration
+                        )
+
+                # Inject node chaos scenarios specified in the config
+                elif scenario_type == "node_scenarios":
+                    logging.info("Running node scenarios")
+                    handler.run(
+                        scenarios_list,
+                        config,
+                        wait_duration
+                    )
+
+                # Inject time skew chaos scenarios specified
+                # in the config
+                elif scenario_type == "time_scenarios":
+                    if distribution == "openshift":
+                        logging.info("Running time skew scenarios")
+                        handler.run(
+                            scenarios_list,
+                            config,
+                            wait_duration
+                        )
+                    else:
+                        logging.error(
+                            "Litmus scenarios are currently "
+                            "supported only on openshift"
+                        )
+                        sys.exit(1)
+
+                # Inject litmus based chaos scenarios
+                elif scenario_type == "litmus_scenarios":
+                    if distribution == "openshift":
+                        logging.info("Running litmus scenarios")
+                        if litmus_install:
+                            # Remove Litmus resources
+                            # before running the scenarios
+                            handler.delete_chaos(
+                                litmus_namespace
                             )
-                            sys.exit(1)
-                        elif scenario_type == "plugin_scenarios":
-                            failed_post_scenarios = plugins.run(
-                                scenarios_list,
-                                kubeconfig_path,
-                                failed_post_scenarios
+                            handler.delete_chaos_experiments(
+                                litmus_namespace
                             )
-                        elif scenario_type == "container_scenarios":
-                            logging.info("Running container scenarios")
-                            failed_post_scenarios = \
-                                pod_scenarios.container_run(
-                                    kubeconfig_path,
-                                    scenarios_list,
-                                    config,
-                                    failed_post_scenarios,
-                                    wait_duration
-                                )
-
-                        # Inject node chaos scenarios specified in the config
-                        elif scenario_type == "node_scenarios":
-                            logging.info("Running node scenarios")
-                            nodeaction.run(
-                                scenarios_list,
-                                config,
-                                wait_duration
-                            )
-
-                        # Inject time skew chaos scenarios specified
-                        # in the config
-                        elif scenario_type == "time_scenarios":
-                            if distribution == "openshift":
-                                logging.info("Running time skew scenarios")
-                                time_actions.run(
-                                    scenarios_list,
-                                    config,
-                                    wait_duration
+                            if litmus_uninstall_before_run:
+                                handler.uninstall_litmus(
+                                    litmus_version,
+                                    litmus_namespace
                                 )
-                            else:
-                                logging.error(
-                                    "Litmus scenarios are currently "
-                                    "supported only on openshift"
-                                )
-                                sys.exit(1)
-
-                        # Inject litmus based chaos scenarios
-                        elif scenario_type == "litmus_scenarios":
-                            if distribution == "openshift":
-                                logging.info("Running litmus scenarios")
-                                litmus_namespace = "litmus"
-                                if litmus_install:
-                                    # Remove Litmus resources
-                                    # before running the scenarios
-                                    common_litmus.delete_chaos(
-                                        litmus_namespace
-                                    )
-                                    common_litmus.delete_chaos_experiments(
-                                        litmus_namespace
-                                    )
-                                    if litmus_uninstall_before_run:
-                                        common_litmus.uninstall_litmus(
-                                            litmus_version,
-                                            litmus_namespace
-                                        )
-                                    common_litmus.install_litmus(
-                                        litmus_version,
-                                        litmus_namespace
-                                    )
-                                    common_litmus.deploy_all_experiments(
-                                        litmus_version,
-                                        litmus_namespace
-                                    )
-                                litmus_installed = True
-                                common_litmus.run(
-                                    scenarios_list,
-                                    config,
-                                    litmus_uninstall,
-                                    wait_duration,
-                                    litmus_namespace,
-                                )
-                            else:
-                                logging.error(
-                                    "Litmus scenarios are currently "
-                                    "only supported on openshift"
-                                )
-                                sys.exit(1)
-
-                        # Inject cluster shutdown scenarios
-                        elif scenario_type == "cluster_shut_down_scenarios":
-                            shut_down.run(
-                                scenarios_list,
-                                config,
-                                wait_duration
-                            )
-
-                        # Inject namespace chaos scenarios
-                        elif scenario_type == "namespace_scenarios":
-                            logging.info("Running namespace scenarios")
-                            namespace_actions.run(
-                                scenarios_list,
-                                config,
-                                wait_duration,
-                                failed_post_scenarios,
-                                kubeconfig_path
-                            )
-
-                        # Inject zone failures
-                        elif scenario_type == "zone_outages":
-                            logging.info("Inject zone outages")
-                            zone_outages.run(
-                                scenarios_list,
-                                config,
-                                wait_duration
-                            )
-
-                        # Application outages
-                        elif scenario_type == "application_outages":
-                            logging.info("Injecting application outage")
-                            application_outage.run(
-                                scenarios_list,
-                                config,
-                                wait_duration
+                            handler.install_litmus(
+                                litmus_version,
+                                litmus_namespace
                             )
-
-                        # PVC scenarios
-                        elif scenario_type == "pvc_scenarios":
-                            logging.info("Running PVC scenario")
-                            pvc_scenario.run(scenarios_list, config)
-
-                        # Network scenarios
-                        elif scenario_type == "network_chaos":
-                            logging.info("Running Network Chaos")
-                            network_chaos.run(
-                                scenarios_list,
-                                config,
-                                wait_duration
+                            handler.deploy_all_experiments(
+                                litmus_version,
+                                litmus_namespace
                             )
+                        litmus_installed = True
+                        handler.run(
+                            scenarios_list,
+                            config,
+                            litmus_uninstall,
+                            wait_duration,
+                            litmus_namespace,
+                        )
+                    else:
+                        logging.error(
+                            "Litmus scenarios are currently "
+                            "only supported on openshift"
+                        )
+                        sys.exit(1)
+
+                # Inject cluster shutdown scenarios
+                elif scenario_type == "cluster_shut_down_scenarios":
+                    handler.run(
+                        scenarios_list,
+                        config,
+                        wait_duration
+                    )
+
+                # Inject namespace chaos scenarios
+                elif scenario_type == "namespace_scenarios":
+                    logging.info("Running namespace scenarios")
+                    handler.run(
+                        scenarios_list,
+                        config,
+                        wait_duration,
+                        failed_post_scenarios,
+                        kubeconfig_path
+                    )
+
+                # Inject zone failures
+                elif scenario_type == "zone_outages":
+                    logging.info("Inject zone outages")
+                    handler.run(
+                        scenarios_list,
+                        config,
+                        wait_duration
+                    )
+
+                # Application outages
+                elif scenario_type == "application_outages":
+                    logging.info("Injecting application outage")
+                    handler.run(
+                        scenarios_list,
+                        config,
+                        wait_duration
+                    )
+
+                # PVC scenarios
+                elif scenario_type == "pvc_scenarios":
+                    logging.info("Running PVC scenario")
+                    handler.run(scenarios_list, config)
+
+                # Network scenarios
+                elif scenario_type == "network_chaos":
+                    logging.info("Running Network Chaos")
+                    handler.run(
+                        scenarios_list,
+                        config,
+                        wait_duration
+                    )
+            return failed_post_scenarios
 
+        # Loop to run the chaos starts here
+        while int(iteration) < iterations and run_signal != "STOP":
+            # Inject chaos scenarios specified in the config
+            logging.info("Executing scenarios for iteration " + str(iteration))
+            if scenario_entries:
+                failed_post_scenarios = scenario_groups.run_scenarios(
+                    scenario_entries,
+                    run_scenario,
+                    max_parallel_scenarios,
+                    check_run_signal,
+                    failed_post_scenarios
+                )
             iteration += 1
             logging.info("")
 
+        logging.info(
+            "Scenario files read from the plan cache: %(hits)s, "
+            "compiled: %(misses)s" % scenario_plan.stats()
+        )
+
         # Capture the end time
         end_time = int(time.time())
 
@@ -382,10 +512,20 @@ def main(cfg):
                 sys.exit(1)
 
         if litmus_uninstall and litmus_installed:
+            common_litmus = SCENARIO_HANDLERS.get("litmus_scenarios")
             common_litmus.delete_chaos(litmus_namespace)
             common_litmus.delete_chaos_experiments(litmus_namespace)
             common_litmus.uninstall_litmus(litmus_version, litmus_namespace)
 
+        if lazy_import.is_loaded(async_kubecli):
+            async_kubecli.close()
+        kube_registry.close_all()
+        api_instrumentation.set_scenario("kraken")
+        api_instrumentation.log_summary()
+        recovery.log_summary()
+        if api_metrics_path:
+            api_instrumentation.write_summary(api_metrics_path)
+
         if failed_post_scenarios:
             logging.error(
                 "Post scenarios are still failing at the end of all iterations"
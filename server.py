@@ -1,10 +1,44 @@
 import sys
 import logging
 import _thread
+import threading
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from http.client import HTTPConnection
 
-server_status = ""
+
+class RunState:
+    """
+    Run signal shared by the http server and the run loop. The changes made
+    through the endpoints wake up the run loop, which reads the signal
+    without a round trip to its own server
+    """
+
+    def __init__(self, status=""):
+        self._status = status
+        self._condition = threading.Condition()
+
+    def get(self):
+        with self._condition:
+            return self._status
+
+    def set(self, status):
+        with self._condition:
+            self._status = status
+            self._condition.notify_all()
+
+    def wait_while(self, status, timeout=None):
+        """
+        Blocks until the signal is no longer the given status or the timeout
+        in seconds expires, returns the current signal
+        """
+
+        with self._condition:
+            self._condition.wait_for(lambda: self._status != status, timeout)
+            return self._status
+
+
+run_state = RunState()
+
 
 class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
     """
@@ -20,7 +54,7 @@ class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
     def do_status(self):
         self.send_response(200)
         self.end_headers()
-        self.wfile.write(bytes(server_status, encoding='utf8'))
+        self.wfile.write(bytes(run_state.get(), encoding='utf8'))
         SimpleHTTPRequestHandler.requests_served += 1
 
     def do_POST(self):
@@ -34,24 +68,20 @@ class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
     def set_run(self):
         self.send_response(200)
         self.end_headers()
-        global server_status
-        server_status = 'RUN'
+        run_state.set('RUN')
 
     def set_stop(self):
         self.send_response(200)
         self.end_headers()
-        global server_status
-        server_status = 'STOP'
+        run_state.set('STOP')
 
     def set_pause(self):
         self.send_response(200)
         self.end_headers()
-        global server_status
-        server_status = 'PAUSE'
+        run_state.set('PAUSE')
 
 def publish_kraken_status(status):
-    global server_status
-    server_status = status
+    run_state.set(status)
 
 def start_server(address, status):
     server = address[0]
@@ -72,6 +102,10 @@ def start_server(address, status):
 
 
 def get_status(address):
+    """
+    Reads the signal of a kraken server over http, the run loop of this
+    process reads run_state instead
+    """
     server = address[0]
     port = address[1]
     httpc = HTTPConnection(server, port)
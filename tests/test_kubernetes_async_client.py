@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+from kraken.kubernetes import async_client
+
+
+def pod(name):
+    return SimpleNamespace(metadata=SimpleNamespace(name=name))
+
+
+def pod_list(names, resource_version="1", _continue=None):
+    return SimpleNamespace(
+        items=[pod(name) for name in names],
+        metadata=SimpleNamespace(resource_version=resource_version, _continue=_continue),
+    )
+
+
+class FakeCoreV1Api:
+    def __init__(self, lists):
+        self.lists = list(lists)
+        self.calls = []
+
+    async def list_namespaced_pod(self, namespace, **kwargs):
+        self.calls.append(kwargs)
+        return self.lists.pop(0)
+
+
+class PagedCoreV1Api(FakeCoreV1Api):
+    async def list_namespaced_pod(self, namespace, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(0)
+        if kwargs["_continue"] is None:
+            return pod_list(["a"], _continue="next")
+        return pod_list(["b"])
+
+
+class FakeWatch:
+    """Every stream yields the next events of FakeWatch.streams, raising the exceptions"""
+
+    streams = []
+
+    def __init__(self):
+        self.resource_version = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def stop(self):
+        pass
+
+    async def stream(self, func, *args, **kwargs):
+        for event in FakeWatch.streams.pop(0):
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+
+class AsyncClientTest(unittest.TestCase):
+    def setUp(self):
+        # A client is set so that the kubeconfig is never loaded
+        async_client.api_client = mock.Mock()
+        self.addCleanup(self.close)
+
+    def close(self):
+        async_client.api_client = None
+        async_client.cli = None
+        async_client.max_in_flight = None
+        async_client.close()
+
+    def test_gather_is_bounded(self):
+        async_client.configure(max_requests=3)
+        lock = threading.Lock()
+        active = [0, 0]
+
+        async def work(i):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            await asyncio.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            if i == 4:
+                raise ValueError("failed")
+            return i
+
+        results = async_client.run(async_client.gather([work(i) for i in range(10)]))
+        self.assertEqual(active[1], 3)
+        self.assertIsInstance(results[4], ValueError)
+        self.assertEqual([r for r in results if not isinstance(r, Exception)], [0, 1, 2, 3, 5, 6, 7, 8, 9])
+
+    def test_watch_pods_relists_on_410(self):
+        async_client.cli = FakeCoreV1Api([pod_list(["a", "b"]), pod_list(["a"])])
+        FakeWatch.streams = [[{"type": "DELETED", "object": pod("a")}, async_client.ApiException(status=410)]]
+        with mock.patch.object(async_client.watch, "Watch", FakeWatch):
+            remaining = async_client.watch_pods_sync(
+                ["a", "b"], "default", lambda event_type, obj: event_type == "DELETED", timeout=10
+            )
+        # b is gone from the list after the relist, a was deleted before
+        self.assertEqual(remaining, set())
+        self.assertEqual(len(async_client.cli.calls), 2)
+
+    def test_sync_wrappers_from_threads(self):
+        async_client.cli = PagedCoreV1Api([])
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: async_client.list_pods_sync("default", page_size=1), range(4)))
+        for pods in results:
+            self.assertEqual([p.metadata.name for p in pods], ["a", "b"])
+        self.assertEqual(async_client.cli.calls[0]["limit"], 1)
+
+        async def connect_get_namespaced_pod_exec(name, namespace, **kwargs):
+            if name == "broken":
+                raise Exception("container not found")
+            return "ran %s" % kwargs["command"][-1]
+
+        exec_api = SimpleNamespace(connect_get_namespaced_pod_exec=connect_get_namespaced_pod_exec)
+        with mock.patch.object(async_client.client, "CoreV1Api", return_value=exec_api):
+            results = async_client.exec_cmd_in_pods_sync(
+                "true", [("a", "default", None), ("broken", "default", "c")]
+            )
+        self.assertEqual([r.success for r in results], [True, False])
+        self.assertEqual(results[0].output, "ran true")
+        self.assertEqual(results[1].error, "container not found")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from kubernetes import client
+
+from kraken.kubernetes.cache import ClusterCache, VolumeIndex, match_label_selector, parse_label_selector
+
+
+class LabelSelectorTest(unittest.TestCase):
+    def test_equality(self):
+        requirements = parse_label_selector("app=etcd,tier!=frontend")
+        self.assertTrue(match_label_selector(requirements, {"app": "etcd"}))
+        self.assertFalse(match_label_selector(requirements, {"app": "etcd", "tier": "frontend"}))
+        self.assertFalse(match_label_selector(requirements, {"tier": "backend"}))
+
+    def test_set_based(self):
+        requirements = parse_label_selector("env in (prod, qa),zone notin (a),node-role.kubernetes.io/master,!skip")
+        self.assertTrue(
+            match_label_selector(requirements, {"env": "qa", "zone": "b", "node-role.kubernetes.io/master": ""})
+        )
+        self.assertFalse(match_label_selector(requirements, {"env": "dev", "node-role.kubernetes.io/master": ""}))
+        self.assertFalse(match_label_selector(requirements, {"env": "prod", "zone": "a"}))
+        self.assertFalse(
+            match_label_selector(requirements, {"env": "prod", "node-role.kubernetes.io/master": "", "skip": "1"})
+        )
+
+    def test_empty_selector(self):
+        self.assertTrue(match_label_selector(parse_label_selector(None), None))
+        self.assertTrue(match_label_selector(parse_label_selector(""), {"app": "etcd"}))
+
+
+class VolumeIndexTest(unittest.TestCase):
+    def test_claim_consumers(self):
+        index = VolumeIndex()
+        index.set_claim("default", "data", "1Gi", "pv-1")
+        index.set_pod("default", "web-1", ["data"])
+        index.set_pod("default", "web-0", ["data", "logs"])
+        index.set_pod("other", "web-0", ["data"])
+        self.assertEqual(index.pods_for_claim("default", "data"), ["web-0", "web-1"])
+        self.assertEqual(index.claim("default", "data"), {"capacity": "1Gi", "volumeName": "pv-1"})
+        self.assertEqual(index.claim_for_volume("pv-1"), ("default", "data"))
+
+        index.set_pod("default", "web-0", ["logs"])
+        index.delete_pod("default", "web-1")
+        self.assertEqual(index.pods_for_claim("default", "data"), [])
+        self.assertEqual(index.pods_for_claim("default", "logs"), ["web-0"])
+
+        index.delete_claim("default", "data")
+        self.assertIsNone(index.claim("default", "data"))
+        self.assertIsNone(index.claim_for_volume("pv-1"))
+
+
+class SnapshotTest(unittest.TestCase):
+    def cluster_cache(self):
+        list_func = lambda **kwargs: None  # noqa: E731
+        cli = SimpleNamespace(
+            api_client=client.ApiClient(),
+            list_node=list_func,
+            list_pod_for_all_namespaces=list_func,
+            list_namespace=list_func,
+            list_persistent_volume_claim_for_all_namespaces=list_func,
+        )
+        return ClusterCache(cli)
+
+    def test_round_trip(self):
+        pod = client.V1Pod(
+            metadata=client.V1ObjectMeta(name="web-0", namespace="default", labels={"app": "web"}),
+            spec=client.V1PodSpec(
+                containers=[client.V1Container(name="web")],
+                volumes=[
+                    client.V1Volume(
+                        name="data",
+                        persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(claim_name="data"),
+                    )
+                ],
+            ),
+        )
+        cache = self.cluster_cache()
+        cache.informers["pods"].restore([pod], "42")
+        path = os.path.join(tempfile.mkdtemp(), "snapshot.json")
+        cache.save_snapshot(path)
+
+        restored = self.cluster_cache()
+        self.assertTrue(restored.load_snapshot(path))
+        self.assertTrue(restored.synced("pods"))
+        self.assertFalse(restored.synced("nodes"))
+        self.assertEqual(restored.resource_version("pods"), "42")
+        self.assertEqual([p.metadata.name for p in restored.pods("default", "app=web")], ["web-0"])
+        self.assertEqual(restored.volumes.pods_for_claim("default", "data"), ["web-0"])
+        self.assertFalse(self.cluster_cache().load_snapshot(path, max_age=-1))
+
+
+if __name__ == "__main__":
+    unittest.main()
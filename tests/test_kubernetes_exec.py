@@ -0,0 +1,52 @@
+import functools
+import random
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from kubernetes import client
+from kubernetes.stream.stream import _websocket_request
+
+import kraken.kubernetes.client as kubecli
+from kraken.kubernetes import registry
+
+
+def websocket_call(configuration, method, url, **kwargs):
+    time.sleep(random.uniform(0, 0.02))
+    return SimpleNamespace(data=url.split("/")[-2])
+
+
+class ExecCmdInPodsTest(unittest.TestCase):
+    def test_fan_out_does_not_patch_the_shared_client(self):
+        configuration = client.Configuration()
+        configuration.host = "https://api.example.com"
+        api_client = client.ApiClient(configuration)
+        request = api_client.request
+        with mock.patch.object(kubecli, "api_client", api_client, create=True), \
+                mock.patch.object(kubecli, "cli", client.CoreV1Api(api_client), create=True), \
+                mock.patch.object(kubecli, "stream", functools.partial(_websocket_request, websocket_call, None)):
+            targets = [("pod-%s" % i, "default", None) for i in range(20)]
+            results = kubecli.exec_cmd_in_pods("true", targets, max_workers=20)
+        self.assertEqual([r.output for r in results], ["pod-%s" % i for i in range(20)])
+        self.assertTrue(all(r.success for r in results))
+        self.assertEqual(api_client.request, request)
+
+    def test_exec_api_per_thread_and_client(self):
+        api_client = client.ApiClient(client.Configuration())
+        other_client = client.ApiClient(client.Configuration())
+        exec_api = registry.get_exec_api(api_client)
+        self.assertIsNot(exec_api.api_client, api_client)
+        self.assertIs(exec_api.api_client.configuration, api_client.configuration)
+        self.assertIs(registry.get_exec_api(api_client), exec_api)
+        self.assertIsNot(registry.get_exec_api(other_client), exec_api)
+        thread_apis = []
+        thread = threading.Thread(target=lambda: thread_apis.append(registry.get_exec_api(api_client)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(thread_apis[0], exec_api)
+
+
+if __name__ == "__main__":
+    unittest.main()
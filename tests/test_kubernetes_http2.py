@@ -0,0 +1,57 @@
+import json
+import unittest
+
+from kubernetes import client, watch
+from kubernetes.client.rest import ApiException
+
+from kraken.kubernetes import http2
+
+
+def handler(request):
+    if request.url.params.get("watch") == "true":
+        events = [
+            {"type": "ADDED", "object": {"metadata": {"name": "ns-%s" % i, "resourceVersion": str(i)}}}
+            for i in range(3)
+        ]
+        return http2.httpx.Response(200, content="".join(json.dumps(e) + "\n" for e in events).encode())
+    if request.url.path == "/api/v1/namespaces/missing":
+        return http2.httpx.Response(404, headers={"Retry-After": "1"}, json={"kind": "Status", "code": 404})
+    if request.method == "PATCH":
+        return http2.httpx.Response(200, json={"metadata": {"labels": json.loads(request.content)["metadata"]["labels"]}})
+    return http2.httpx.Response(200, json={"metadata": {"name": request.url.path.split("/")[-1]}})
+
+
+@unittest.skipUnless(http2.available(), "httpx[http2] is not installed")
+class Http2RESTClientTest(unittest.TestCase):
+    def setUp(self):
+        configuration = client.Configuration()
+        configuration.host = "https://api.example.com"
+        self.api_client = client.ApiClient(configuration)
+        http2.install(self.api_client)
+        self.api_client.rest_client.client = http2.httpx.Client(
+            base_url=configuration.host,
+            transport=http2.httpx.MockTransport(handler)
+        )
+        self.core_v1 = client.CoreV1Api(self.api_client)
+
+    def test_read_and_patch(self):
+        self.assertEqual(self.core_v1.read_namespace("default").metadata.name, "default")
+        patched = self.core_v1.patch_namespace("default", {"metadata": {"labels": {"a": "b"}}})
+        self.assertEqual(patched.metadata.labels, {"a": "b"})
+
+    def test_errors(self):
+        with self.assertRaises(ApiException) as e:
+            self.core_v1.read_namespace("missing")
+        self.assertEqual(e.exception.status, 404)
+        self.assertEqual(e.exception.headers.get("retry-after"), "1")
+
+    def test_watch(self):
+        names = [
+            event["object"].metadata.name
+            for event in watch.Watch().stream(self.core_v1.list_namespace, timeout_seconds=1)
+        ]
+        self.assertEqual(names, ["ns-0", "ns-1", "ns-2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from kraken.kubernetes import instrumentation
+from kraken.kubernetes.instrumentation import parse_request
+
+
+class ParseRequestTest(unittest.TestCase):
+    def test_core_resources(self):
+        host = "https://api.cluster:6443"
+        self.assertEqual(parse_request("GET", host + "/api/v1/namespaces/default/pods"), ("LIST", "pods"))
+        self.assertEqual(parse_request("GET", host + "/api/v1/namespaces/default/pods/etcd-0"), ("GET", "pods"))
+        self.assertEqual(
+            parse_request("GET", host + "/api/v1/pods", [("watch", True)]),
+            ("WATCH", "pods"),
+        )
+        self.assertEqual(parse_request("GET", host + "/api/v1/namespaces/default"), ("GET", "namespaces"))
+        self.assertEqual(parse_request("GET", host + "/api/v1/namespaces"), ("LIST", "namespaces"))
+        self.assertEqual(
+            parse_request("POST", host + "/api/v1/namespaces/default/pods/etcd-0/eviction"),
+            ("POST", "pods/eviction"),
+        )
+
+    def test_group_resources(self):
+        self.assertEqual(
+            parse_request("DELETE", "https://api.cluster:6443/apis/batch/v1/namespaces/default/jobs"),
+            ("DELETE", "jobs"),
+        )
+        self.assertEqual(parse_request("GET", "https://api.cluster:6443/version"), ("GET", "version"))
+
+
+class ScenarioTest(unittest.TestCase):
+    def test_worker_threads_of_parallel_scenarios(self):
+        barrier = threading.Barrier(2)
+
+        def scenario(name):
+            instrumentation.set_scenario(name)
+            # Both scenarios are set before the workers run
+            barrier.wait(5)
+            get_scenario = instrumentation.bind_scenario(lambda _: instrumentation.get_scenario())
+            with ThreadPoolExecutor(max_workers=2) as workers:
+                bound = list(workers.map(get_scenario, [0, 1]))
+                unbound = workers.submit(instrumentation.get_scenario).result()
+            return bound, unbound
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(scenario, ["node_scenarios", "zone_outages"]))
+        self.assertEqual(results[0], (["node_scenarios"] * 2, instrumentation.DEFAULT_SCENARIO))
+        self.assertEqual(results[1], (["zone_outages"] * 2, instrumentation.DEFAULT_SCENARIO))
+
+
+if __name__ == "__main__":
+    unittest.main()
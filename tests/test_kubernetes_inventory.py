@@ -0,0 +1,39 @@
+import re
+import unittest
+
+from kraken.kubernetes.inventory import Inventory
+
+
+class InventoryTest(unittest.TestCase):
+    def setUp(self):
+        self.inventory = Inventory()
+        self.inventory.add("etcd-0", "openshift-etcd", {"app": "etcd"}, "Running", "master-0", uid="a")
+        self.inventory.add("etcd-1", "openshift-etcd", {"app": "etcd"}, "Pending", "master-1", uid="b")
+        self.inventory.add("web-0", "default", {"app": "web", "tier": "frontend"}, "Running", "worker-0", uid="c")
+        self.inventory.add("job-0", "default", None, "Succeeded", "worker-0", uid="d")
+
+    def select(self, **kwargs):
+        return sorted(self.inventory.names(self.inventory.select(**kwargs).nonzero()[0]))
+
+    def test_label_selectors(self):
+        self.assertEqual(self.select(label_selector="app=etcd"), ["etcd-0", "etcd-1"])
+        self.assertEqual(self.select(label_selector="app!=etcd"), ["job-0", "web-0"])
+        self.assertEqual(self.select(label_selector="app in (web,db),tier"), ["web-0"])
+        self.assertEqual(self.select(label_selector="!app"), ["job-0"])
+        self.assertEqual(self.select(label_selector="missing=value"), [])
+
+    def test_patterns_and_columns(self):
+        self.assertEqual(self.select(namespace_pattern="^openshift-.*$", phase="Running"), ["etcd-0"])
+        self.assertEqual(self.select(name_pattern=re.compile("^.*-0$"), node=["worker-0"]), ["job-0", "web-0"])
+        self.assertEqual(self.select(phase=["Running", "Pending"], exclude_names=["etcd-1"]), ["etcd-0", "web-0"])
+
+    def test_sample(self):
+        mask = self.inventory.select(namespace_pattern="default")
+        rows = self.inventory.rows(self.inventory.sample(mask, 1))
+        self.assertEqual(len(rows), 1)
+        self.assertIn(rows[0]["uid"], ("c", "d"))
+        self.assertEqual(sorted(self.inventory.names(self.inventory.sample(mask, 5))), ["job-0", "web-0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
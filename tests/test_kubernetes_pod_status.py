@@ -0,0 +1,93 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from kubernetes.client.rest import ApiException
+
+from kraken.kubernetes import pod_status
+
+
+def pod(name, uid=None, phase="Running"):
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name, uid=uid or "uid-" + name),
+        status=SimpleNamespace(phase=phase),
+    )
+
+
+def pod_list(pods, resource_version="1"):
+    return SimpleNamespace(items=pods, metadata=SimpleNamespace(resource_version=resource_version))
+
+
+class FakeCoreV1Api:
+    def __init__(self, lists):
+        self.lists = list(lists)
+        self.calls = []
+
+    def list_namespaced_pod(self, namespace, **kwargs):
+        self.calls.append(("list_namespaced_pod", namespace, kwargs))
+        return self.lists.pop(0)
+
+    def list_pod_for_all_namespaces(self, **kwargs):
+        self.calls.append(("list_pod_for_all_namespaces", None, kwargs))
+        return self.lists.pop(0)
+
+
+class FakeWatch:
+    """Every stream yields the next events of FakeWatch.streams, raising the exceptions"""
+
+    streams = []
+
+    def __init__(self):
+        self.resource_version = None
+
+    def stop(self):
+        pass
+
+    def stream(self, func, *args, **kwargs):
+        for event in FakeWatch.streams.pop(0):
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+
+def is_deleted(event_type, obj):
+    return event_type == "DELETED"
+
+
+class WaitForPodsTest(unittest.TestCase):
+    def test_relists_on_410(self):
+        core_v1 = FakeCoreV1Api([pod_list([pod("a"), pod("b")]), pod_list([pod("a")], "2")])
+        FakeWatch.streams = [[ApiException(status=410)], [{"type": "DELETED", "object": pod("a")}]]
+        with mock.patch.object(pod_status.watch, "Watch", FakeWatch):
+            pending = pod_status.wait_for_pods(core_v1, ["a", "b"], is_deleted, 10, namespace="default")
+        # b is gone from the list after the relist, a is deleted afterwards
+        self.assertEqual(pending, set())
+        self.assertEqual([call[0] for call in core_v1.calls], ["list_namespaced_pod"] * 2)
+
+    def test_uids_across_namespaces(self):
+        # The pod recreated with the same name has another UID and is not tracked
+        core_v1 = FakeCoreV1Api([pod_list([pod("a"), pod("b")])])
+        FakeWatch.streams = [[
+            {"type": "ADDED", "object": pod("a", uid="uid-a2")},
+            {"type": "DELETED", "object": pod("a")},
+            {"type": "DELETED", "object": pod("b")},
+        ]]
+        with mock.patch.object(pod_status.watch, "Watch", FakeWatch):
+            pending = pod_status.wait_for_pods(
+                core_v1, ["uid-a", "uid-b", "uid-c"], is_deleted, 10, label_selector="run=1", key="uid"
+            )
+        self.assertEqual(pending, set())
+        self.assertEqual(core_v1.calls, [("list_pod_for_all_namespaces", None, {"label_selector": "run=1"})])
+
+    def test_single_pod_field_selector(self):
+        core_v1 = FakeCoreV1Api([pod_list([pod("a", phase="Running")])])
+        pending = pod_status.wait_for_pods(
+            core_v1, ["a"], lambda event_type, obj: obj is not None and obj.status.phase == "Running", 10,
+            namespace="default"
+        )
+        self.assertEqual(pending, set())
+        self.assertEqual(core_v1.calls[0][2], {"field_selector": "metadata.name=a"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import struct
+import unittest
+
+from kraken.kubernetes import protobuf
+
+
+def varint(value):
+    out = b""
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out += bytes([byte | 0x80])
+        else:
+            return out + bytes([byte])
+
+
+def field(number, value):
+    if isinstance(value, int):
+        return varint(number << 3) + varint(value)
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return varint(number << 3 | 2) + varint(len(value)) + value
+
+
+def envelope(raw):
+    return protobuf.MAGIC + field(1, field(1, "v1") + field(2, "List")) + field(2, raw)
+
+
+def object_meta(name, namespace, labels):
+    meta = field(1, name) + field(3, namespace) + field(6, "42")
+    for key, value in labels.items():
+        meta += field(11, field(1, key) + field(2, value))
+    meta += field(13, field(1, "ReplicaSet") + field(3, "etcd-rs") + field(4, "uid-1") + field(6, 1))
+    return meta
+
+
+class ProtobufDecoderTest(unittest.TestCase):
+    def test_decode_list(self):
+        pod = field(1, object_meta("etcd-0", "openshift-etcd", {"app": "etcd"})) + field(2, field(1, "spec"))
+        pod_list = field(1, field(2, "1000") + field(3, "next-page")) + field(2, pod) + field(2, pod)
+        items, resource_version, _continue = protobuf.decode_list_metadata(envelope(pod_list))
+        self.assertEqual(resource_version, "1000")
+        self.assertEqual(_continue, "next-page")
+        self.assertEqual(len(items), 2)
+        self.assertEqual(items[0].name, "etcd-0")
+        self.assertEqual(items[0].namespace, "openshift-etcd")
+        self.assertEqual(items[0].labels, {"app": "etcd"})
+        self.assertEqual(items[0].resourceVersion, "42")
+        self.assertEqual(items[0].ownerReferences[0].name, "etcd-rs")
+        self.assertTrue(items[0].ownerReferences[0].controller)
+
+    def test_decode_watch_frames(self):
+        node = field(1, object_meta("worker-0", "", {}))
+        event = envelope(field(1, "MODIFIED") + field(2, field(1, envelope(node))))
+        stream = struct.pack(">I", len(event)) + event
+
+        class Response:
+            def __init__(self, data):
+                self.data = data
+
+            def read(self, size):
+                chunk, self.data = self.data[:size], self.data[size:]
+                return chunk
+
+        frames = list(protobuf.iter_frames(Response(stream)))
+        self.assertEqual(len(frames), 1)
+        event_type, raw_object = protobuf.decode_watch_event(frames[0])
+        self.assertEqual(event_type, "MODIFIED")
+        self.assertEqual(protobuf.decode_object_metadata(raw_object).name, "worker-0")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from kubernetes.client.rest import ApiException
+
+from kraken.kubernetes.throttle import Governor, TokenBucket
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(qps=100, burst=2)
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertGreater(bucket.acquire(), 0)
+
+
+class GovernorTest(unittest.TestCase):
+    def rejected(self, status, retry_after=None):
+        e = ApiException(status=status, reason="Too Many Requests")
+        e.headers = {"Retry-After": retry_after} if retry_after else {}
+        return e
+
+    @mock.patch("kraken.kubernetes.throttle.time.sleep")
+    def test_retries_rejected_requests(self, sleep):
+        request = mock.Mock(side_effect=[self.rejected(429, "2"), self.rejected(429), "ok"])
+        governor = Governor(qps=0)
+        self.assertEqual(governor.wrap(request)("GET", "/api/v1/pods"), "ok")
+        self.assertEqual(request.call_count, 3)
+        self.assertGreaterEqual(sleep.call_args_list[0][0][0], 2)
+        summary = governor.summary()
+        self.assertEqual(summary["requests"], 3)
+        self.assertEqual(summary["rejected_requests"], 2)
+
+    @mock.patch("kraken.kubernetes.throttle.time.sleep")
+    def test_does_not_retry_other_errors(self, sleep):
+        request = mock.Mock(side_effect=[self.rejected(503), self.rejected(429)])
+        governor = Governor(qps=0)
+        with self.assertRaises(ApiException):
+            governor.wrap(request)("GET", "/api/v1/pods")
+        self.assertEqual(request.call_count, 1)
+
+    @mock.patch("kraken.kubernetes.throttle.time.sleep")
+    def test_gives_up_after_max_retries(self, sleep):
+        request = mock.Mock(side_effect=self.rejected(429))
+        governor = Governor(qps=0, max_retries=2)
+        with self.assertRaises(ApiException):
+            governor.wrap(request)("GET", "/api/v1/pods")
+        self.assertEqual(request.call_count, 3)
+
+    @mock.patch("kraken.kubernetes.throttle.asyncio.sleep")
+    def test_retries_rejected_async_requests(self, sleep):
+        request = mock.AsyncMock(side_effect=[self.rejected(429, "1"), "ok"])
+        governor = Governor(qps=0)
+        self.assertEqual(asyncio.run(governor.wrap_async(request)("GET", "/api/v1/pods")), "ok")
+        self.assertEqual(request.await_count, 2)
+        self.assertGreaterEqual(sleep.await_args_list[0][0][0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import json
+import sys
+import unittest
+
+from kraken.lazy_import.registry import LazyModule, Registry, is_loaded, module
+
+
+class RegistryTest(unittest.TestCase):
+    def test_get(self):
+        registry = Registry("format", {"json": "json", "dumps": "json:dumps", "encoder": "json:JSONEncoder.encode"})
+        self.assertIn("dumps", registry)
+        self.assertEqual(registry.loaded(), [])
+        self.assertIs(registry.get("json"), json)
+        self.assertIs(registry.get("dumps"), json.dumps)
+        self.assertIs(registry.get("encoder"), json.JSONEncoder.encode)
+        self.assertEqual(registry.loaded(), ["dumps", "encoder", "json"])
+        with self.assertRaises(Exception):
+            registry.get("yaml")
+
+    def test_import_on_first_use(self):
+        sys.modules.pop("colorsys", None)
+        registry = Registry("module", {"colorsys": "colorsys:rgb_to_hsv"})
+        lazy = LazyModule("colorsys")
+        self.assertNotIn("colorsys", sys.modules)
+        self.assertFalse(is_loaded(lazy))
+        self.assertEqual(lazy.rgb_to_hsv(1, 0, 0), (0, 1, 1))
+        self.assertIn("colorsys", sys.modules)
+        self.assertTrue(is_loaded(lazy))
+        self.assertIs(registry.get("colorsys"), sys.modules["colorsys"].rgb_to_hsv)
+        self.assertIs(module("colorsys"), sys.modules["colorsys"])
+
+
+if __name__ == "__main__":
+    unittest.main()
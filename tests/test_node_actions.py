@@ -0,0 +1,64 @@
+import threading
+import unittest
+from unittest import mock
+
+import kraken.node_actions.common_node_functions as common_node_functions
+import kraken.node_actions.run as node_run
+from kraken.node_actions.abstract_node_scenarios import abstract_node_scenarios
+
+
+class RebootNodeScenarios(abstract_node_scenarios):
+    thread_safe = True
+
+    def __init__(self):
+        self.rebooted = []
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def node_reboot_scenario(self, instance_kill_count, node, timeout):
+        with self.lock:
+            self.rebooted.append(node)
+            self.threads.add(threading.current_thread().name)
+        common_node_functions.wait_for_unknown_status(node, timeout)
+        common_node_functions.wait_for_ready_status(node, timeout)
+
+
+class InjectNodeScenarioTest(unittest.TestCase):
+    def inject(self, node_scenario_object, parallel):
+        nodes = ["node-%s" % i for i in range(4)]
+        node_scenario = {"cloud_type": "aws", "instance_count": 4, "timeout": 60}
+        if parallel is not None:
+            node_scenario["parallel"] = parallel
+        with mock.patch.object(common_node_functions, "get_node", return_value=nodes), \
+                mock.patch.object(node_run.kubecli, "get_node_list_resource_version", return_value="10"), \
+                mock.patch.object(common_node_functions.kubecli, "get_node_resource_version", return_value="5"), \
+                mock.patch.object(common_node_functions.kubecli, "watch_nodes_status", return_value={}) as watch:
+            node_run.inject_node_scenario("node_reboot_scenario", node_scenario, node_scenario_object)
+        return nodes, watch
+
+    def test_parallel_waits_once_for_all_nodes(self):
+        node_scenario_object = RebootNodeScenarios()
+        nodes, watch = self.inject(node_scenario_object, True)
+        self.assertEqual(sorted(node_scenario_object.rebooted), nodes)
+        self.assertEqual(
+            watch.call_args_list,
+            [mock.call(nodes, "Unknown", 60, "10"), mock.call(nodes, "True", 60, None)],
+        )
+
+    def test_sequential_by_default(self):
+        node_scenario_object = RebootNodeScenarios()
+        nodes, watch = self.inject(node_scenario_object, None)
+        self.assertEqual(node_scenario_object.rebooted, nodes)
+        self.assertEqual(node_scenario_object.threads, {threading.current_thread().name})
+        self.assertEqual(watch.call_count, 8)
+
+    def test_parallel_needs_a_thread_safe_cloud_type(self):
+        node_scenario_object = RebootNodeScenarios()
+        node_scenario_object.thread_safe = False
+        nodes, watch = self.inject(node_scenario_object, True)
+        self.assertEqual(node_scenario_object.rebooted, nodes)
+        self.assertEqual(watch.call_count, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from unittest import mock
+
+import kraken.kubernetes.client as kubecli
+from kraken.recovery import gate
+
+
+class RecoveryGateTest(unittest.TestCase):
+    def setUp(self):
+        gate.clear()
+        self.addCleanup(gate.configure)
+        self.addCleanup(gate.clear)
+
+    def test_sleep_mode(self):
+        gate.configure("sleep")
+        with mock.patch("time.sleep") as sleep:
+            self.assertEqual(gate.wait(30), 30)
+        sleep.assert_called_once_with(30)
+        self.assertEqual(gate.records(), [])
+
+    def test_gate_returns_once_recovered(self):
+        gate.configure("gate", ["nodes_ready", "workloads_available"], 1)
+        node_health = [(True, []), (False, ["worker-0"]), (True, []), (True, [])]
+        with mock.patch.object(kubecli, "sweep_node_health", side_effect=node_health) as nodes, \
+                mock.patch.object(kubecli, "sweep_workload_availability", return_value=(True, [])) as workloads, \
+                mock.patch("time.sleep") as sleep:
+            gate.wait(30, "app", scenario="application_outages")
+        # The first pass is not confirmed, the fault shows up on the next check
+        self.assertEqual(sleep.call_count, 3)
+        self.assertEqual(nodes.call_count, 4)
+        nodes.assert_called_with(consistent=True)
+        workloads.assert_called_with("app")
+        record = gate.records()[0]
+        self.assertTrue(record["recovered"])
+        self.assertEqual(record["scenario"], "application_outages")
+
+    def test_gate_upper_bound_and_errors(self):
+        gate.configure("gate", ["namespaces_active", "unknown"], 1)
+        with mock.patch.object(kubecli, "sweep_namespace_status", side_effect=Exception("connection refused")):
+            gate.wait(0.2, scenario="cluster_shut_down_scenarios")
+        record = gate.records()[0]
+        self.assertFalse(record["recovered"])
+        self.assertIsNone(record["time_to_recover"])
+        self.assertEqual(record["failing"], ["error: connection refused"])
+
+    def test_empty_namespace_checks_the_cluster(self):
+        gate.configure("gate", ["namespaces_active", "workloads_available"], 1)
+        with mock.patch.object(kubecli, "sweep_namespace_status", return_value=(True, [])) as namespaces, \
+                mock.patch.object(kubecli, "sweep_workload_availability", return_value=(True, [])) as workloads:
+            self.assertEqual(gate.check(""), [])
+        namespaces.assert_called_once_with(None, consistent=True)
+        workloads.assert_called_once_with(None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from kraken.scenario_groups import executor
+from kraken.scenario_groups.executor import parse_scenarios, run_scenarios
+
+
+class ParseScenariosTest(unittest.TestCase):
+    def test_default_group_is_sequential(self):
+        entries = parse_scenarios([
+            {"plugin_scenarios": ["a.yml"]},
+            {"node_scenarios": ["b.yml"]},
+        ])
+        self.assertEqual([e.name for e in entries], ["plugin_scenarios-0", "node_scenarios-1"])
+        self.assertEqual(entries[1].dependencies, ["plugin_scenarios-0"])
+
+    def test_groups_and_after(self):
+        entries = parse_scenarios([
+            {"name": "etcd", "group": "control-plane", "plugin_scenarios": []},
+            {"name": "nodes", "group": "workers", "node_scenarios": []},
+            {"name": "zone", "after": ["control-plane", "nodes"], "zone_outages": []},
+        ])
+        self.assertEqual(entries[1].dependencies, [])
+        self.assertEqual(entries[2].dependencies, ["etcd", "nodes"])
+
+    def test_invalid_entries(self):
+        for chaos_scenarios in (
+            [{"name": "a", "after": "missing", "node_scenarios": []}],
+            [{"name": "a", "node_scenarios": []}, {"name": "a", "node_scenarios": []}],
+            [{"node_scenarios": [], "zone_outages": []}],
+            [
+                {"name": "a", "group": "x", "after": "b", "node_scenarios": []},
+                {"name": "b", "group": "y", "after": "a", "node_scenarios": []},
+            ],
+        ):
+            with self.assertRaises(Exception):
+                parse_scenarios(chaos_scenarios)
+
+
+class RunScenariosTest(unittest.TestCase):
+    def test_parallel_groups_and_failed_post_scenarios(self):
+        entries = parse_scenarios([
+            {"name": "a", "group": "x", "plugin_scenarios": []},
+            {"name": "b", "group": "y", "plugin_scenarios": []},
+            {"name": "c", "after": ["a", "b"], "plugin_scenarios": []},
+        ])
+        lock = threading.Lock()
+        active = []
+        started = []
+
+        def run_entry(entry, failed):
+            with lock:
+                active.append(entry.name)
+                started.append((entry.name, len(active), list(failed)))
+            time.sleep(0.1)
+            with lock:
+                active.remove(entry.name)
+            return failed + [entry.name] if entry.name != "c" else failed
+
+        failed = run_scenarios(entries, run_entry, max_parallel=2, failed_post_scenarios=["old"])
+        self.assertEqual(sorted(s[0] for s in started[:2]), ["a", "b"])
+        self.assertEqual(max(s[1] for s in started), 2)
+        self.assertEqual(started[2], ("c", 1, ["old", "a", "b"]))
+        self.assertEqual(failed, ["old", "a", "b"])
+
+    def test_stop_and_errors(self):
+        entries = parse_scenarios([{"node_scenarios": []}, {"zone_outages": []}])
+        ran = []
+        run_scenarios(entries, lambda entry, failed: ran.append(entry.name), can_start=lambda: not ran)
+        self.assertEqual(ran, ["node_scenarios-0"])
+
+        def fail(entry, failed):
+            raise SystemExit(1)
+
+        with self.assertRaises(SystemExit):
+            run_scenarios(entries, fail)
+
+    def test_exit_while_waiting_does_not_wait_for_running_entries(self):
+        entries = parse_scenarios([{"node_scenarios": []}, {"zone_outages": []}])
+        release = threading.Event()
+        ran = []
+
+        def run_entry(entry, failed):
+            ran.append(entry.name)
+            release.wait(5)
+
+        def sigterm(*args, **kwargs):
+            # What the SIGTERM handler raises in the main thread
+            raise SystemExit(143)
+
+        self.addCleanup(release.set)
+        start_time = time.time()
+        with mock.patch.object(executor, "wait", sigterm), self.assertRaises(SystemExit):
+            run_scenarios(entries, run_entry)
+        self.assertLess(time.time() - start_time, 1)
+        self.assertEqual(ran, ["node_scenarios-0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
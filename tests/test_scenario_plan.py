@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from kraken.scenario_groups.executor import parse_scenarios
+from kraken.scenario_plan import cache as scenario_plan
+
+
+class ScenarioPlanTest(unittest.TestCase):
+    def setUp(self):
+        scenario_plan.clear()
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "scenario.yml")
+        self.write("node_scenarios:\n  - actions: [node_stop_start_scenario]\n")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, content, mtime=None):
+        with open(self.path, "w") as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(self.path, ns=(mtime, mtime))
+
+    def test_load_is_cached_until_the_file_changes(self):
+        first = scenario_plan.load(self.path)
+        first["node_scenarios"].append("modified by the caller")
+        self.assertEqual(len(scenario_plan.load(self.path)["node_scenarios"]), 1)
+        self.assertEqual(scenario_plan.stats(), {"hits": 1, "misses": 1})
+
+        # Touching the file without changing it does not parse it again
+        os.utime(self.path, ns=(10 ** 18, 10 ** 18))
+        scenario_plan.load(self.path)
+        self.assertEqual(scenario_plan.stats(), {"hits": 2, "misses": 1})
+
+        self.write("node_scenarios: []\n", mtime=2 * 10 ** 18)
+        self.assertEqual(scenario_plan.load(self.path)["node_scenarios"], [])
+        self.assertEqual(scenario_plan.stats(), {"hits": 2, "misses": 2})
+
+    def test_compile_plan(self):
+        entries = parse_scenarios([{"node_scenarios": [self.path]}])
+        scenario_plan.compile_plan(entries)
+        self.assertEqual(entries[0].scenarios_list, (self.path,))
+        self.assertEqual(scenario_plan.stats()["misses"], 1)
+
+        # The post actions are scripts or shell commands, not scenario files
+        entries = parse_scenarios([{"container_scenarios": [[self.path, "oc get pods"], [self.path, ""]]}])
+        scenario_plan.compile_plan(entries)
+        self.assertEqual(entries[0].scenarios_list, ((self.path, "oc get pods"), (self.path, "")))
+
+        self.write("node_scenarios: [\n")
+        with self.assertRaises(Exception):
+            scenario_plan.compile_plan(parse_scenarios([{"node_scenarios": [self.path]}]))
+        with self.assertRaises(Exception):
+            scenario_plan.compile_plan(parse_scenarios([{"node_scenarios": ["missing.yml"]}]))
+
+
+if __name__ == "__main__":
+    unittest.main()
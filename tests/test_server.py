@@ -0,0 +1,45 @@
+import socket
+import threading
+import time
+import unittest
+from http.client import HTTPConnection
+
+import server
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class RunStateTest(unittest.TestCase):
+    def test_wait_while(self):
+        state = server.RunState("PAUSE")
+        self.assertEqual(state.wait_while("PAUSE", 0.01), "PAUSE")
+        threading.Timer(0.05, state.set, ("RUN",)).start()
+        start = time.time()
+        self.assertEqual(state.wait_while("PAUSE", 5), "RUN")
+        self.assertLess(time.time() - start, 1)
+
+
+class ServerTest(unittest.TestCase):
+    def test_endpoints_update_run_state(self):
+        address = ("127.0.0.1", free_port())
+        server.start_server(address, "PAUSE")
+        self.addCleanup(server.httpd.shutdown)
+        self.assertEqual(server.get_status(address), "PAUSE")
+
+        def post(signal):
+            connection = HTTPConnection(*address)
+            connection.request("POST", "/" + signal)
+            connection.getresponse().read()
+            connection.close()
+
+        threading.Timer(0.05, post, ("STOP",)).start()
+        self.assertEqual(server.run_state.wait_while("PAUSE", 5), "STOP")
+        self.assertEqual(server.get_status(address), "STOP")
+
+
+if __name__ == "__main__":
+    unittest.main()
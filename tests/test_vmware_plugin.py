@@ -38,6 +38,16 @@ class NodeScenariosTest(unittest.TestCase):
             self.fail,
         )
 
+    def test_add_node_same_transition_time(self):
+        nodes = {}
+        transitions = {"node-1": 1700000000.5, "node-2": 1700000000.5}
+        vmware_plugin._add_node(nodes, transitions, "node-1")
+        vmware_plugin._add_node(nodes, transitions, "node-2")
+        self.assertEqual(
+            sorted(node.name for node in nodes.values()),
+            ["node-1", "node-2"]
+        )
+
     def test_node_start(self):
         if not self.credentials_present:
             self.skipTest(